@@ -0,0 +1,164 @@
+"""Benchmark do motor Arrow contra o pandas na transformação (e no load).
+
+Gera CSVs sintéticos (etl/devtools/synthetic.py) em uma pasta temporária e
+roda ``transformar_<report>`` de cada motor em um processo novo, medindo o
+tempo de parede e o pico de RSS do processo. Com ``--db-host``, o mesmo
+processo também carrega o resultado em modo FULL (``to_sql`` no pandas,
+``COPY`` no Arrow) em um Postgres local, nunca o do .env:
+
+    docker compose --profile bench up -d postgres
+
+Precisa do ``pyarrow`` instalado.
+
+Uso:
+    python benchmarks/bench_arrow.py --linhas 500000 --arquivos 6
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(RAIZ, 'etl'))
+
+MOTORES = {
+    'pandas': 'transformation.transformer',
+    'arrow': 'transformation.transformer_arrow',
+}
+TABELAS = {'general': 'general_reports', 'return': 'return_reports'}
+
+
+def _configurar_banco(args):
+    """Aponta o loader para o Postgres local do benchmark."""
+    os.environ['DB_HOST'] = args.db_host
+    os.environ['DB_PORT'] = str(args.db_port)
+    os.environ['DB_NAME'] = 'sigos'
+    os.environ['DB_USER'] = 'sigos'
+    os.environ['DB_PASS'] = 'sigos'
+    os.environ['DB_SSLMODE'] = 'disable'
+
+
+def executar(args):
+    """Roda um motor no processo atual e imprime os tempos em JSON."""
+    import importlib
+    import logging
+
+    logging.disable(logging.INFO)
+    modulo = importlib.import_module(MOTORES[args.executar])
+    tempos = {}
+    inicio = time.perf_counter()
+    df = getattr(modulo, f'transformar_{args.report}')(
+        'full', pasta=args.pasta
+    )
+    tempos['transform_s'] = time.perf_counter() - inicio
+    if args.db_host:
+        _configurar_banco(args)
+        from load.loader import init_database, load_df_to_postgres
+
+        init_database()
+        inicio = time.perf_counter()
+        load_df_to_postgres(
+            df, TABELAS[args.report], 'full', 'DATA_EXECUCAO', chunksize=5000
+        )
+        tempos['load_s'] = time.perf_counter() - inicio
+    print(json.dumps({'linhas': len(df), **tempos}))
+
+
+def medir(args, motor):
+    """
+    Roda um motor em um processo novo.
+
+    Args:
+        args: Argumentos da linha de comando.
+        motor: 'pandas' ou 'arrow'.
+
+    Returns:
+        Dicionário com 'parede_s', 'rss_mb' e os tempos do processo filho.
+    """
+    comando = [
+        sys.executable,
+        os.path.abspath(__file__),
+        '--executar',
+        motor,
+        '--report',
+        args.report,
+        '--pasta',
+        args.pasta,
+    ]
+    if args.db_host:
+        comando += ['--db-host', args.db_host, '--db-port', str(args.db_port)]
+    inicio = time.perf_counter()
+    proc = subprocess.Popen(
+        comando, cwd=RAIZ, stdout=subprocess.PIPE, text=True
+    )
+    saida = proc.stdout.read()
+    _, status, uso = os.wait4(proc.pid, 0)
+    parede_s = time.perf_counter() - inicio
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f'Motor {motor} falhou')
+    return {
+        'parede_s': parede_s,
+        'rss_mb': uso.ru_maxrss / 1024,
+        **json.loads(saida.strip().splitlines()[-1]),
+    }
+
+
+def main():
+    """Gera os CSVs, roda os dois motores e imprime as medianas."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--report', choices=list(TABELAS), default='general')
+    parser.add_argument('--linhas', type=int, default=200_000)
+    parser.add_argument('--dias', type=int, default=60)
+    parser.add_argument('--arquivos', type=int, default=4)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--motores', nargs='+', default=list(MOTORES))
+    parser.add_argument('--pasta')
+    parser.add_argument('--db-host')
+    parser.add_argument('--db-port', type=int, default=5433)
+    parser.add_argument('--executar', choices=list(MOTORES))
+    args = parser.parse_args()
+
+    if args.executar:
+        executar(args)
+        return
+
+    if not args.pasta:
+        from devtools.synthetic import gerar_arquivos
+
+        args.pasta = tempfile.mkdtemp(prefix='bench_arrow_')
+        gerar_arquivos(
+            args.pasta,
+            args.report,
+            args.linhas,
+            args.dias,
+            arquivos=args.arquivos,
+        )
+
+    print(
+        f'{"motor":<8} {"linhas":>9} {"parede":>9} {"transform":>10} '
+        f'{"load":>8} {"pico RSS":>10}'
+    )
+    for motor in args.motores:
+        rodadas = [medir(args, motor) for _ in range(args.repeticoes)]
+
+        def mediana(chave):
+            return statistics.median(r[chave] for r in rodadas)
+
+        load = f'{mediana("load_s"):.2f}s' if args.db_host else '-'
+        print(
+            f'{motor:<8} {rodadas[0]["linhas"]:>9} '
+            f'{mediana("parede_s"):>8.2f}s '
+            f'{mediana("transform_s"):>9.2f}s '
+            f'{load:>8} '
+            f'{mediana("rss_mb"):>7.0f} MB'
+        )
+    print(f'\nCSVs: {args.pasta}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark de login no SIGOS comparando os perfis default e lean do Chrome.
+
+Mede o tempo até o menu aparecer após o login e o pico de RSS do Chromium
+(chromedriver + processos filhos). Precisa das credenciais no .env.
+
+Uso:
+    python benchmarks/bench_browser_profile.py --runs 3
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'etl')
+)
+
+from env import carregar_env  # noqa: E402
+
+# As credenciais do .env precisam estar no ambiente antes do browser
+carregar_env()
+
+from extraction.core.browser import esperar_elemento, logar_sigos  # noqa: E402
+from extraction.core.pool import rss_navegador_mb  # noqa: E402
+
+XPATH_MENU = '/html/body/div[1]/aside[1]/div/nav/ul/li[7]/a/i'
+
+
+def _amostrar_rss(driver, parar, picos, intervalo=0.2):
+    """Amostra o RSS do navegador até ``parar`` ser sinalizado."""
+    while not parar.is_set():
+        try:
+            rss = rss_navegador_mb(driver)
+        except Exception:
+            rss = None
+        if rss is not None:
+            picos.append(rss)
+        parar.wait(intervalo)
+
+
+def medir_perfil(perfil):
+    """
+    Abre o navegador no perfil informado, loga e mede tempo e memória.
+
+    Args:
+        perfil: 'default' ou 'lean'.
+
+    Returns:
+        Tupla (segundos até o login, pico de RSS em MB).
+    """
+    inicio = time.perf_counter()
+    driver = logar_sigos(perfil=perfil)
+    parar = threading.Event()
+    picos = []
+    amostrador = threading.Thread(
+        target=_amostrar_rss, args=(driver, parar, picos), daemon=True
+    )
+    amostrador.start()
+    try:
+        esperar_elemento(driver, XPATH_MENU, tipo='clicavel', timeout=60)
+        segundos = time.perf_counter() - inicio
+        # Deixa a página assentar para capturar o pico de memória
+        time.sleep(2)
+    finally:
+        parar.set()
+        amostrador.join()
+        driver.quit()
+    return segundos, max(picos, default=float('nan'))
+
+
+def main():
+    """Roda o benchmark e imprime a tabela comparativa."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--perfis', nargs='+', default=['default', 'lean'])
+    args = parser.parse_args()
+
+    print(f"{'perfil':<10}{'login (s)':>12}{'pico RSS (MB)':>16}")
+    for perfil in args.perfis:
+        tempos, rss = [], []
+        for _ in range(args.runs):
+            segundos, pico = medir_perfil(perfil)
+            tempos.append(segundos)
+            rss.append(pico)
+        print(
+            f'{perfil:<10}{sum(tempos) / len(tempos):>12.2f}'
+            f'{max(rss):>16.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark ponta a ponta do ETL contra o SIGOS fake e um Postgres local.
+
+Sobe o SIGOS fake (etl/devtools/fake_sigos.py) em uma thread, aponta o ETL
+para ele e roda ``run_etl`` para general e return, imprimindo o tempo de
+cada etapa. Tudo roda em uma pasta temporária (downloads, state e logs), e o
+banco é sempre o Postgres local, nunca o do .env:
+
+    docker compose --profile bench up -d postgres
+
+Precisa do Chrome/chromedriver instalados (CHROME_BIN/CHROMEDRIVER_PATH).
+
+Uso:
+    python benchmarks/bench_e2e.py --dias 60 --linhas-por-dia 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(RAIZ, 'etl'))
+
+from devtools.fake_sigos import iniciar_servidor  # noqa: E402
+
+
+def _configurar_ambiente(args, url):
+    """Aponta SIGOS e banco para os serviços locais antes dos imports."""
+    os.environ['SIGOS_URL'] = url
+    os.environ['SIGOS_USUARIO'] = 'bench'
+    os.environ['SIGOS_SENHA'] = 'bench'
+    os.environ['HEADLESS'] = 'true'
+    os.environ['DB_HOST'] = args.db_host
+    os.environ['DB_PORT'] = str(args.db_port)
+    os.environ['DB_NAME'] = 'sigos'
+    os.environ['DB_USER'] = 'sigos'
+    os.environ['DB_PASS'] = 'sigos'
+    os.environ['DB_SSLMODE'] = 'disable'
+    # Cada rodada mede o pipeline inteiro, sem pular janelas repetidas
+    os.environ['PULAR_JANELAS_INALTERADAS'] = 'false'
+    os.environ['JANELA_POR_WATERMARK'] = 'false'
+
+
+def main():
+    """Roda o benchmark e imprime os tempos por etapa."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dias', type=int, default=60)
+    parser.add_argument('--linhas-por-dia', type=int, default=200)
+    parser.add_argument('--latencia', type=float, default=0.5)
+    parser.add_argument('--latencia-por-mil', type=float, default=0.05)
+    parser.add_argument('--reports', nargs='+', default=['general', 'return'])
+    parser.add_argument('--db-host', default='localhost')
+    parser.add_argument('--db-port', type=int, default=5433)
+    args = parser.parse_args()
+
+    servidor, url = iniciar_servidor(
+        linhas_por_dia=args.linhas_por_dia,
+        latencia=args.latencia,
+        latencia_por_mil=args.latencia_por_mil,
+    )
+    _configurar_ambiente(args, url)
+
+    # Os módulos do ETL resolvem downloads/state a partir do cwd
+    pasta = tempfile.mkdtemp(prefix='bench_e2e_')
+    os.makedirs(os.path.join(pasta, 'etl', 'downloads'))
+    os.chdir(pasta)
+
+    import main as etl_main  # noqa: E402
+
+    etl_main.setup_logging()
+    resultados = []
+    try:
+        for report in args.reports:
+            resultados.append(
+                etl_main.run_etl(report, 'incremental', dias=args.dias)
+            )
+    finally:
+        servidor.shutdown()
+
+    print(f'\nSIGOS fake: {url} | pasta: {pasta}')
+    print(
+        f"{'report':<10}{'linhas':>9}{'total (s)':>11}"
+        f"{'login':>8}{'form':>8}{'download':>10}"
+        f"{'extr+transf':>13}{'consol':>9}{'load':>8}"
+    )
+    for r in resultados:
+        extracao = r.get('extracao', {}).get('etapas_s', {})
+        etapas = r['etapas_s']
+        print(
+            f"{r['report']:<10}{r.get('linhas', 0):>9}"
+            f"{r.get('total_s', 0):>11.2f}"
+            f"{extracao.get('login', 0):>8.2f}"
+            f"{extracao.get('formulario', 0):>8.2f}"
+            f"{extracao.get('download', 0):>10.2f}"
+            f"{etapas.get('extract_transform', 0):>13.2f}"
+            f"{etapas.get('consolidate', 0):>9.2f}"
+            f"{etapas.get('load', 0):>8.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
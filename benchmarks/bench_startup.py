@@ -0,0 +1,125 @@
+"""Benchmark de inicialização do main.py com ``python -X importtime``.
+
+Roda cada cenário em um processo novo e mede o tempo de parede, o tempo
+gasto em imports (soma dos imports de topo do ``-X importtime``) e o pico
+de RSS do processo:
+
+- ``help``: ``python etl/main.py --help`` (o mesmo custo de subir o
+  scheduler antes do primeiro ciclo);
+- ``etapas``: importa tudo que um ciclo usa (extratores, transformer,
+  loader), o custo pago só quando um ciclo roda de fato.
+
+Uso:
+    python benchmarks/bench_startup.py --repeticoes 5 --top 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+IMPORTAR_ETAPAS = (
+    "import sys; sys.path.insert(0, 'etl'); import main; "
+    '[main._importar(c) for d in (main.EXTRATORES, main.TRANSFORMADORES, '
+    'main.CONSOLIDADORES) for c in d.values()]; '
+    'import load.loader, load.watermarks'
+)
+CENARIOS = {
+    'help': ['etl/main.py', '--help'],
+    'etapas': ['-c', IMPORTAR_ETAPAS],
+}
+
+
+def _parse_importtime(saida):
+    """
+    Lê a saída do ``-X importtime``.
+
+    Args:
+        saida: stderr do processo.
+
+    Returns:
+        Tupla (soma dos imports de topo em ms, {módulo: acumulado em ms}).
+    """
+    total_us = 0
+    modulos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        _, acumulado, nome = linha.split(':', 1)[1].split('|')
+        if not nome[1:].startswith(' '):
+            total_us += int(acumulado)
+        modulos[nome.strip()] = int(acumulado) / 1000
+    return total_us / 1000, modulos
+
+
+def medir(argumentos):
+    """
+    Roda um cenário em um processo novo.
+
+    Args:
+        argumentos: Argumentos passados ao Python depois de ``-X importtime``.
+
+    Returns:
+        Dicionário com 'parede_ms', 'imports_ms', 'rss_mb' e 'modulos'.
+    """
+    inicio = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', *argumentos],
+        cwd=RAIZ,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    saida = proc.stderr.read()
+    _, status, uso = os.wait4(proc.pid, 0)
+    parede_ms = (time.perf_counter() - inicio) * 1000
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f'{argumentos} saiu com {proc.returncode}')
+
+    imports_ms, modulos = _parse_importtime(saida)
+    return {
+        'parede_ms': parede_ms,
+        'imports_ms': imports_ms,
+        # ru_maxrss vem em KB no Linux
+        'rss_mb': uso.ru_maxrss / 1024,
+        'modulos': modulos,
+    }
+
+
+def main():
+    """Roda os cenários e imprime a mediana de cada métrica."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--cenarios', nargs='+', default=list(CENARIOS))
+    args = parser.parse_args()
+
+    print(
+        f"{'cenário':<10}{'parede (ms)':>13}{'imports (ms)':>14}{'RSS (MB)':>10}"
+    )
+    mais_lentos = {}
+    for cenario in args.cenarios:
+        medidas = [medir(CENARIOS[cenario]) for _ in range(args.repeticoes)]
+        print(
+            f'{cenario:<10}'
+            f"{statistics.median(m['parede_ms'] for m in medidas):>13.0f}"
+            f"{statistics.median(m['imports_ms'] for m in medidas):>14.0f}"
+            f"{statistics.median(m['rss_mb'] for m in medidas):>10.1f}"
+        )
+        mais_lentos[cenario] = sorted(
+            medidas[-1]['modulos'].items(), key=lambda m: -m[1]
+        )[: args.top]
+
+    for cenario, modulos in mais_lentos.items():
+        print(f'\nImports mais caros ({cenario}, acumulado):')
+        for nome, ms in modulos:
+            print(f'  {ms:>8.1f} ms  {nome}')
+
+
+if __name__ == '__main__':
+    main()
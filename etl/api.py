@@ -0,0 +1,663 @@
+"""API de leitura dos relatórios processados (somente leitura).
+
+Serve visões filtradas e agregadas de ``general_reports`` e
+``return_reports`` para analistas e ferramentas de BI, no lugar das
+consultas ad hoc nas tabelas inteiras:
+
+- ``GET /reports/<report>``: linhas paginadas por keyset
+  (``DATA_EXECUCAO``, ``ctid``), com a versão da tabela no cursor; com
+  ``formato=csv`` ou ``formato=parquet`` percorre todas as páginas e
+  transmite o resultado aos poucos;
+- ``GET /resumo/<report>``: contagens dos resumos diários, agrupadas pelas
+  colunas de ``agrupar`` (padrão: ``DATA_EXECUCAO``);
+- ``GET /versao``: versão atual de cada tabela.
+
+Filtros: ``inicio`` e ``fim`` (aaaa-mm-dd, sobre ``DATA_EXECUCAO``),
+``regional``, ``grupo``, ``equipe`` e ``status`` (vários valores separados
+por vírgula). As respostas JSON ficam em um cache LRU em memória com a
+versão da tabela na chave; o loader troca a versão a cada carga, então o
+cache se invalida sozinho. Cada página (inclusive as das exportações) é uma
+transação curta e somente leitura, que não segura o TRUNCATE do FULL nem o
+DELETE do incremental; o ``ctid`` muda quando a tabela é recarregada, então
+um cursor de outra versão é recusado.
+
+Uso:
+    python etl/api.py --porta 8080
+"""
+
+import argparse
+import base64
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from env import carregar_env
+
+carregar_env()
+
+API_PORTA = int(os.getenv('API_PORTA', '8080'))
+# Respostas JSON guardadas no cache LRU
+API_CACHE_ITENS = int(os.getenv('API_CACHE_ITENS', '256'))
+API_LIMITE_PADRAO = int(os.getenv('API_LIMITE_PADRAO', '1000'))
+API_LIMITE_MAX = int(os.getenv('API_LIMITE_MAX', '10000'))
+# Linhas por consulta nas exportações CSV/Parquet
+API_PAGINA_EXPORT = int(os.getenv('API_PAGINA_EXPORT', '5000'))
+# De quanto em quanto tempo a versão das tabelas é relida do banco
+API_VERSAO_TTL_S = float(os.getenv('API_VERSAO_TTL_S', '5'))
+# Teto de cada consulta, para a leitura nunca prender a carga
+API_TIMEOUT_MS = int(os.getenv('API_TIMEOUT_MS', '30000'))
+
+TABELAS = {'general': 'general_reports', 'return': 'return_reports'}
+FILTROS = {
+    'regional': 'REGIONAL',
+    'grupo': 'GRUPO',
+    'equipe': 'EQUIPE',
+    'status': 'STATUS',
+}
+
+logger = logging.getLogger(__name__)
+
+
+class CacheLRU:
+    """
+    Cache LRU em memória, com a tabela e a versão no início da chave.
+
+    Args:
+        max_itens: Quantidade máxima de respostas guardadas.
+    """
+
+    def __init__(self, max_itens):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        """Retorna o valor guardado (ou None) e o marca como recente."""
+        with self._lock:
+            if chave not in self._itens:
+                return None
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        """Guarda um valor, descartando o menos usado se passar do limite."""
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, tabela, versao):
+        """Descarta as respostas da tabela feitas com outra versão."""
+        with self._lock:
+            for chave in [
+                c for c in self._itens if c[0] == tabela and c[1] != versao
+            ]:
+                del self._itens[chave]
+
+    def __len__(self):
+        return len(self._itens)
+
+
+_cache = CacheLRU(API_CACHE_ITENS)
+_versoes = {}
+_versoes_lidas_em = 0.0
+_lock_versoes = threading.Lock()
+_engine = None
+
+
+def _obter_engine():
+    """Cria (uma vez) a engine usada pela API."""
+    global _engine
+    if _engine is None:
+        from load.loader import get_engine
+
+        _engine = get_engine()
+    return _engine
+
+
+@contextmanager
+def _transacao():
+    """
+    Abre uma transação somente leitura, com snapshot único e timeout.
+
+    Todas as consultas feitas dentro dela enxergam a mesma versão da tabela,
+    mesmo que uma carga seja confirmada no meio.
+
+    Yields:
+        Função ``consultar(sql, params)`` que devolve a tupla (nomes das
+        colunas, lista de linhas).
+    """
+    from sqlalchemy import text
+
+    with _obter_engine().connect() as conn:
+        conn.execute(
+            text('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+        )
+        conn.execute(text(f'SET LOCAL statement_timeout = {API_TIMEOUT_MS}'))
+
+        def consultar(sql, params):
+            resultado = conn.execute(text(sql), params)
+            return list(resultado.keys()), resultado.all()
+
+        yield consultar
+
+
+def _executar(sql, params):
+    """
+    Executa uma consulta curta, somente leitura e com timeout.
+
+    Returns:
+        Tupla (nomes das colunas, lista de linhas).
+    """
+    with _transacao() as consultar:
+        return consultar(sql, params)
+
+
+def versao_atual(tabela):
+    """
+    Retorna a versão da tabela, relendo ``etl_versoes`` no máximo a cada
+    API_VERSAO_TTL_S segundos. Uma versão nova invalida o cache da tabela.
+
+    Args:
+        tabela: Nome da tabela de relatório.
+
+    Returns:
+        Versão gravada pela última carga ('' se ainda não houver).
+    """
+    global _versoes_lidas_em
+    with _lock_versoes:
+        if time.monotonic() - _versoes_lidas_em > API_VERSAO_TTL_S:
+            _, linhas = _executar('SELECT tabela, versao FROM etl_versoes', {})
+            for nome, versao in linhas:
+                if _versoes.get(nome) != versao:
+                    _cache.invalidar(nome, versao)
+                _versoes[nome] = versao
+            _versoes_lidas_em = time.monotonic()
+        return _versoes.get(tabela, '')
+
+
+def codificar_cursor(versao, data_execucao, ctid):
+    """Monta o cursor opaco da próxima página, com a versão da tabela."""
+    bruto = json.dumps([versao, str(data_execucao), ctid]).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii')
+
+
+def decodificar_cursor(cursor):
+    """
+    Lê um cursor gerado por ``codificar_cursor``.
+
+    Returns:
+        Tupla (versão da tabela, data de execução, ctid).
+
+    Raises:
+        ValueError: Se o cursor for inválido.
+    """
+    try:
+        versao, data_execucao, ctid = json.loads(
+            base64.urlsafe_b64decode(cursor)
+        )
+        return str(versao), date.fromisoformat(data_execucao), str(ctid)
+    except Exception:
+        raise ValueError('Cursor inválido')
+
+
+def _tabela(report):
+    """Valida o report e devolve a tabela."""
+    if report not in TABELAS:
+        raise ValueError(f'Report desconhecido: {report}')
+    return TABELAS[report]
+
+
+def _condicoes(params, colunas_permitidas=None):
+    """
+    Converte os filtros da URL em condições SQL com parâmetros.
+
+    Args:
+        params: Parâmetros da URL ({nome: valor}).
+        colunas_permitidas: Colunas que aceitam filtro (None: todas).
+
+    Returns:
+        Tupla (lista de condições, parâmetros do SQL).
+
+    Raises:
+        ValueError: Se uma data ou um filtro for inválido.
+    """
+    condicoes = []
+    valores = {}
+    for nome, operador in (('inicio', '>='), ('fim', '<=')):
+        if nome in params:
+            try:
+                valores[nome] = date.fromisoformat(params[nome])
+            except ValueError:
+                raise ValueError(f'{nome} deve estar no formato aaaa-mm-dd')
+            condicoes.append(f'"DATA_EXECUCAO" {operador} :{nome}')
+    for nome, coluna in FILTROS.items():
+        if nome not in params:
+            continue
+        if colunas_permitidas is not None and coluna not in colunas_permitidas:
+            raise ValueError(f'Filtro {nome} não disponível neste resumo')
+        valores[nome] = [v.strip() for v in params[nome].split(',')]
+        condicoes.append(f'"{coluna}" = ANY(:{nome})')
+    return condicoes, valores
+
+
+def montar_consulta(
+    report, params, cursor=None, limite=API_LIMITE_PADRAO, versao=None
+):
+    """
+    Monta a consulta de uma página de linhas, paginada por keyset.
+
+    A ordem é (``DATA_EXECUCAO``, ``ctid``): a próxima página começa logo
+    depois da última linha entregue, sem OFFSET, e usa o índice de data.
+    Linhas sem ``DATA_EXECUCAO`` ficam de fora. Como o ``ctid`` só vale
+    dentro de uma versão da tabela, o cursor tem que ser da versão lida.
+
+    Args:
+        report: 'general' ou 'return'.
+        params: Filtros da URL.
+        cursor: Cursor da página anterior (None: primeira página).
+        limite: Linhas por página.
+        versao: Versão da tabela no snapshot da consulta (None: não
+            confere).
+
+    Returns:
+        Tupla (SQL, parâmetros).
+
+    Raises:
+        ValueError: Se um filtro, o limite ou o cursor for inválido, ou se
+            o cursor for de outra versão da tabela.
+    """
+    tabela = _tabela(report)
+    if limite < 1:
+        raise ValueError('limite deve ser maior que zero')
+    condicoes, valores = _condicoes(params)
+    condicoes.insert(0, '"DATA_EXECUCAO" IS NOT NULL')
+    if cursor is not None:
+        versao_cursor, data, ctid = decodificar_cursor(cursor)
+        if versao is not None and versao_cursor != versao:
+            raise ValueError(
+                'Cursor expirado: a tabela foi recarregada, recomece sem '
+                'cursor'
+            )
+        valores['cursor_data'], valores['cursor_ctid'] = data, ctid
+        condicoes.append(
+            '("DATA_EXECUCAO", ctid) > '
+            '(:cursor_data, CAST(:cursor_ctid AS tid))'
+        )
+    valores['limite'] = limite
+    sql = (
+        f'SELECT CAST(ctid AS text) AS _ctid, * FROM "{tabela}" '
+        f'WHERE {" AND ".join(condicoes)} '
+        'ORDER BY "DATA_EXECUCAO", ctid LIMIT :limite'
+    )
+    return sql, valores
+
+
+def montar_resumo(report, params):
+    """
+    Monta a consulta agregada sobre o resumo diário do report.
+
+    Args:
+        report: 'general' ou 'return'.
+        params: Filtros da URL e ``agrupar`` (colunas separadas por
+            vírgula).
+
+    Returns:
+        Tupla (SQL, parâmetros).
+
+    Raises:
+        ValueError: Se uma coluna de agrupamento não existir no resumo.
+    """
+    from load.resumos import RESUMOS
+
+    resumo, colunas = RESUMOS[_tabela(report)][0]
+    permitidas = ['DATA_EXECUCAO', *colunas]
+    agrupar = [
+        c.strip().upper()
+        for c in params.get('agrupar', 'DATA_EXECUCAO').split(',')
+    ]
+    invalidas = [c for c in agrupar if c not in permitidas]
+    if invalidas:
+        raise ValueError(
+            f'Não dá para agrupar por {", ".join(invalidas)} '
+            f'(use {", ".join(permitidas)})'
+        )
+    condicoes, valores = _condicoes(params, permitidas)
+    grupo = ', '.join(f'"{c}"' for c in agrupar)
+    where = f'WHERE {" AND ".join(condicoes)} ' if condicoes else ''
+    sql = (
+        f'SELECT {grupo}, SUM("QUANTIDADE") AS "QUANTIDADE" '
+        f'FROM "{resumo}" {where}GROUP BY {grupo} ORDER BY {grupo}'
+    )
+    return sql, valores
+
+
+def _ler_pagina(consultar, report, params, cursor, limite):
+    """Lê a versão da tabela e uma página, no snapshot de ``consultar``."""
+    tabela = _tabela(report)
+    _, linhas = consultar(
+        'SELECT versao FROM etl_versoes WHERE tabela = :tabela',
+        {'tabela': tabela},
+    )
+    versao = linhas[0][0] if linhas else ''
+    colunas, linhas = consultar(
+        *montar_consulta(report, params, cursor, limite, versao)
+    )
+    proximo = None
+    if len(linhas) == limite:
+        ultima = linhas[-1]
+        proximo = codificar_cursor(
+            versao, ultima[colunas.index('DATA_EXECUCAO')], ultima[0]
+        )
+    return {
+        'colunas': colunas[1:],
+        'linhas': [tuple(linha[1:]) for linha in linhas],
+        'proximo': proximo,
+        'versao': versao,
+    }
+
+
+def consultar_pagina(report, params, cursor=None, limite=API_LIMITE_PADRAO):
+    """
+    Busca uma página de linhas.
+
+    Returns:
+        Dicionário com 'colunas', 'linhas', o cursor 'proximo' (None na
+        última página) e a 'versao' da tabela lida.
+
+    Raises:
+        ValueError: Se o cursor for de outra versão da tabela.
+    """
+    with _transacao() as consultar:
+        return _ler_pagina(consultar, report, params, cursor, limite)
+
+
+def percorrer_paginas(report, params):
+    """
+    Gera todas as páginas de uma consulta (exportações).
+
+    Cada página é uma transação curta, então um cliente lento nunca segura
+    o TRUNCATE do FULL. Se uma carga for confirmada no meio, o cursor da
+    próxima página é de outra versão e a exportação para com ValueError,
+    em vez de duplicar ou pular linhas.
+    """
+    cursor = None
+    while True:
+        pagina = consultar_pagina(report, params, cursor, API_PAGINA_EXPORT)
+        yield pagina
+        cursor = pagina['proximo']
+        if cursor is None:
+            return
+
+
+def _com_cache(tabela, chave, consultar):
+    """Resolve uma resposta JSON pelo cache da versão atual da tabela."""
+    versao = versao_atual(tabela)
+    chave = (tabela, versao, *chave)
+    resposta = _cache.obter(chave)
+    if resposta is None:
+        resposta = consultar()
+        resposta.setdefault('versao', versao)
+        _cache.guardar(chave, resposta)
+    return resposta
+
+
+class _SaidaContada:
+    """
+    Arquivo só de escrita que conta os bytes (o Parquet pede tell()).
+
+    Depois de ``abortar``, as escritas são descartadas: o rodapé que o
+    ``ParquetWriter`` grava ao ser coletado não chega ao cliente.
+    """
+
+    def __init__(self, saida):
+        self._saida = saida
+        self._posicao = 0
+        self._abortada = False
+        self.closed = False
+
+    def write(self, dados):
+        if not self._abortada:
+            self._saida.write(dados)
+        self._posicao += len(dados)
+        return len(dados)
+
+    def abortar(self):
+        self._abortada = True
+
+    def tell(self):
+        return self._posicao
+
+    def flush(self):
+        self._saida.flush()
+
+    def close(self):
+        self.closed = True
+
+
+def _tabela_arrow(pa, colunas, linhas, schema):
+    """Converte uma página em tabela Arrow com o schema da primeira."""
+    registros = [dict(zip(colunas, linha)) for linha in linhas]
+    if schema is None:
+        inferida = pa.Table.from_pylist(registros)
+        schema = pa.schema(
+            pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+            for f in inferida.schema
+        )
+    # Colunas que só vieram nulas na primeira página viraram texto
+    for campo in schema:
+        if pa.types.is_string(campo.type):
+            for registro in registros:
+                valor = registro[campo.name]
+                if valor is not None and not isinstance(valor, str):
+                    registro[campo.name] = str(valor)
+    return pa.Table.from_pylist(registros, schema=schema), schema
+
+
+class LeituraHandler(BaseHTTPRequestHandler):
+    """Roteia as requisições GET da API de leitura."""
+
+    def log_message(self, formato, *args):
+        """Manda o log de acesso para o logging do ETL."""
+        logger.info(f'[API] {self.address_string()} {formato % args}')
+
+    def _responder_json(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False, default=str).encode(
+            'utf-8'
+        )
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        """Atende /reports, /resumo e /versao."""
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        partes = [p for p in url.path.split('/') if p]
+        try:
+            if partes == ['versao']:
+                versao_atual('')
+                self._responder_json(200, dict(_versoes))
+            elif len(partes) == 2 and partes[0] == 'reports':
+                self._reports(partes[1], params)
+            elif len(partes) == 2 and partes[0] == 'resumo':
+                self._resumo(partes[1], params)
+            else:
+                self._responder_json(404, {'erro': 'Rota não encontrada'})
+        except ValueError as e:
+            self._responder_json(400, {'erro': str(e)})
+        except Exception as e:
+            logger.exception(f'[API] Falha atendendo {self.path}: {e}')
+            self._responder_json(500, {'erro': 'Falha interna'})
+
+    def _reports(self, report, params):
+        formato = params.pop('formato', 'json')
+        if formato == 'csv':
+            self._exportar_csv(report, params)
+            return
+        if formato == 'parquet':
+            self._exportar_parquet(report, params)
+            return
+        if formato != 'json':
+            raise ValueError('formato deve ser json, csv ou parquet')
+
+        limite = min(
+            int(params.pop('limite', API_LIMITE_PADRAO)), API_LIMITE_MAX
+        )
+        cursor = params.pop('cursor', None)
+        _tabela(report)
+
+        def consultar():
+            pagina = consultar_pagina(report, params, cursor, limite)
+            return {
+                'dados': [
+                    dict(zip(pagina['colunas'], linha))
+                    for linha in pagina['linhas']
+                ],
+                'proximo': pagina['proximo'],
+                'versao': pagina['versao'],
+            }
+
+        chave = ('reports', limite, cursor, *sorted(params.items()))
+        self._responder_json(
+            200, _com_cache(TABELAS[report], chave, consultar)
+        )
+
+    def _resumo(self, report, params):
+        sql, valores = montar_resumo(report, params)
+
+        def consultar():
+            colunas, linhas = _executar(sql, valores)
+            return {'dados': [dict(zip(colunas, linha)) for linha in linhas]}
+
+        chave = ('resumo', *sorted(params.items()))
+        self._responder_json(
+            200, _com_cache(_tabela(report), chave, consultar)
+        )
+
+    def _iniciar_exportacao(self, report, params, content_type, extensao):
+        """Valida a consulta e envia os cabeçalhos da exportação."""
+        montar_consulta(report, params)
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header(
+            'Content-Disposition', f'attachment; filename="{report}{extensao}"'
+        )
+        self.send_header('X-Versao', versao_atual(TABELAS[report]))
+        # Sem Content-Length: o corpo vai sendo escrito até fechar a conexão
+        self.end_headers()
+
+    def _interromper_exportacao(self, report, erro):
+        """
+        Encerra uma exportação que falhou depois do 200 já ter saído.
+
+        Não dá mais para responder um erro JSON no meio do corpo; a conexão
+        é fechada e o cliente recebe o arquivo incompleto.
+        """
+        logger.error(f'[API] Exportação de {report} interrompida: {erro}')
+        self.close_connection = True
+
+    def _exportar_csv(self, report, params):
+        self._iniciar_exportacao(
+            report, params, 'text/csv; charset=utf-8', '.csv'
+        )
+        cabecalho = True
+        try:
+            for pagina in percorrer_paginas(report, params):
+                buffer = io.StringIO()
+                escritor = csv.writer(buffer, delimiter=';')
+                if cabecalho:
+                    escritor.writerow(pagina['colunas'])
+                    cabecalho = False
+                escritor.writerows(pagina['linhas'])
+                self.wfile.write(buffer.getvalue().encode('utf-8'))
+        except Exception as e:
+            self._interromper_exportacao(report, e)
+
+    def _exportar_parquet(self, report, params):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            self._responder_json(
+                501, {'erro': 'Parquet precisa do pacote pyarrow instalado'}
+            )
+            return
+        self._iniciar_exportacao(
+            report, params, 'application/vnd.apache.parquet', '.parquet'
+        )
+        saida = _SaidaContada(self.wfile)
+        escritor = None
+        schema = None
+        try:
+            for pagina in percorrer_paginas(report, params):
+                if not pagina['linhas']:
+                    continue
+                tabela, schema = _tabela_arrow(
+                    pa, pagina['colunas'], pagina['linhas'], schema
+                )
+                if escritor is None:
+                    escritor = pq.ParquetWriter(saida, schema)
+                escritor.write_table(tabela)
+        except Exception as e:
+            # Sem o rodapé, o Parquet incompleto não abre como se estivesse
+            # inteiro
+            saida.abortar()
+            self._interromper_exportacao(report, e)
+            return
+        if escritor is not None:
+            escritor.close()
+
+
+def iniciar_servidor(porta=API_PORTA, endereco='0.0.0.0'):
+    """
+    Sobe a API de leitura.
+
+    Args:
+        porta: Porta TCP (0 escolhe uma livre).
+        endereco: Endereço de escuta.
+
+    Returns:
+        Instância do servidor (``server_address`` tem a porta real).
+    """
+    servidor = ThreadingHTTPServer((endereco, porta), LeituraHandler)
+    logger.info(
+        f'[API] Leitura em http://{endereco}:{servidor.server_address[1]}'
+    )
+    return servidor
+
+
+def main():
+    """Sobe a API de leitura até Ctrl+C."""
+    parser = argparse.ArgumentParser(description='API de leitura ETL SIGOS')
+    parser.add_argument('--porta', type=int, default=API_PORTA)
+    parser.add_argument('--endereco', default='0.0.0.0')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
+    )
+    servidor = iniciar_servidor(args.porta, args.endereco)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        logger.info('[API] Encerrando')
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""SIGOS fake para medir extração e pipeline sem acessar o sistema real.
+
+Reproduz os XPaths usados pelo ETL (formulário de login, menu de
+relatórios, ``tp_relatorio``, ``data_inicio``/``data_fim`` e o botão de
+exportar) e devolve CSVs de ``devtools.synthetic`` com tamanho, latência e
+taxa de duplicadas configuráveis. O conteúdo é determinístico por relatório
+e dia, então exportar a mesma janela duas vezes gera o mesmo arquivo.
+
+Uso:
+    python etl/devtools/fake_sigos.py --porta 8765 --linhas-por-dia 200
+
+Depois aponte o ETL para ele com ``SIGOS_URL=http://127.0.0.1:8765/``.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+if not __package__:
+    # Rodando como script: coloca etl/ no path, como no main.py
+    sys.path.insert(
+        0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+from devtools.synthetic import gerar_csv  # noqa: E402
+
+PAGINA_LOGIN = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>SIGOS (fake)</title></head>
+<body><form method="post" action="/login"><div><div>
+  <div><h1>SIGOS</h1></div>
+  <div>
+    <div>Login</div>
+    <div>Informe usuário e senha</div>
+    <div><div>
+      <div><input name="usuario" type="text"></div>
+      <div><input name="senha" type="password"></div>
+      <div><div></div><div><button type="submit">Entrar</button></div></div>
+    </div></div>
+  </div>
+</div></div></form></body></html>
+"""
+
+# O menu de relatórios é o 7º item da barra lateral, como no SIGOS
+PAGINA_APP = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>SIGOS (fake)</title>
+<style>
+  i {{ display: inline-block; width: 16px; height: 16px; cursor: pointer; }}
+  .oculto {{ display: none; }}
+</style></head>
+<body>
+<div>
+  <aside><div><nav><ul>
+    {itens_menu}
+    <li>
+      <a><i onclick="mostrar('submenu')">R</i></a>
+      <ul id="submenu" class="oculto">
+        <li><a><i onclick="mostrar('form')">G</i></a></li>
+      </ul>
+    </li>
+  </ul></nav></div></aside>
+  <form id="form" class="oculto" method="get" action="/exportar">
+    <select id="tp_relatorio" name="tp_relatorio">
+      <option value="">Selecione</option>
+      <option value="tudo">Tudo</option>
+      <option value="retornos">Retornos</option>
+    </select>
+    <select id="periodo_todos" name="periodo_todos">
+      <option value="data_cadastro">Data de cadastro</option>
+      <option value="data_execucao">Data do serviço</option>
+    </select>
+    <div id="div_stat_retorno"><div>
+      <select name="stat_retorno">
+        <option value="T">Todos</option>
+        <option value="E">Em retorno</option>
+      </select>
+    </div></div>
+    <select id="periodo_ret" name="periodo_ret">
+      <option value="data_cadastro">Data de cadastro</option>
+      <option value="data_execucao">Data do serviço</option>
+    </select>
+    <input id="data_inicio" name="data_inicio" type="text">
+    <input id="data_fim" name="data_fim" type="text">
+    <button id="btn-salvar-form" type="submit">Exportar</button>
+  </form>
+</div>
+<script>
+  function mostrar(id) {{
+    document.getElementById(id).classList.remove('oculto');
+  }}
+</script>
+</body></html>
+"""
+
+
+def criar_handler(
+    linhas_por_dia, latencia, latencia_por_mil, taxa_duplicadas=0.02
+):
+    """
+    Monta a classe de handler HTTP com a configuração do servidor.
+
+    Args:
+        linhas_por_dia: Linhas geradas por dia exportado.
+        latencia: Segundos fixos de espera antes de cada export.
+        latencia_por_mil: Segundos extras a cada mil linhas exportadas.
+        taxa_duplicadas: Fração das linhas com chave repetida.
+
+    Returns:
+        Subclasse de BaseHTTPRequestHandler.
+    """
+
+    class FakeSigosHandler(BaseHTTPRequestHandler):
+        """Responde as páginas e exports do SIGOS fake."""
+
+        def log_message(self, formato, *args):
+            """Silencia o log de acesso padrão do http.server."""
+
+        def _responder(self, status, corpo, tipo, cabecalhos=None):
+            self.send_response(status)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(corpo)))
+            for chave, valor in (cabecalhos or {}).items():
+                self.send_header(chave, valor)
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def _logado(self):
+            return 'sessao=fake' in (self.headers.get('Cookie') or '')
+
+        def do_GET(self):
+            """Serve login, tela principal e exports."""
+            url = urlparse(self.path)
+            if url.path == '/':
+                self._responder(
+                    200,
+                    PAGINA_LOGIN.encode('utf-8'),
+                    'text/html; charset=utf-8',
+                )
+            elif url.path == '/app' and self._logado():
+                itens = '\n    '.join(
+                    f'<li><a><i>{n}</i></a></li>' for n in range(1, 7)
+                )
+                pagina = PAGINA_APP.format(itens_menu=itens)
+                self._responder(
+                    200, pagina.encode('utf-8'), 'text/html; charset=utf-8'
+                )
+            elif url.path == '/exportar' and self._logado():
+                self._exportar(parse_qs(url.query))
+            else:
+                self._responder(302, b'', 'text/plain', {'Location': '/'})
+
+        def do_POST(self):
+            """Aceita qualquer usuário e senha e abre a sessão."""
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(tamanho)
+            self._responder(
+                303,
+                b'',
+                'text/plain',
+                {'Location': '/app', 'Set-Cookie': 'sessao=fake; Path=/'},
+            )
+
+        def _exportar(self, params):
+            tipo = params.get('tp_relatorio', [''])[0]
+            report = 'return' if tipo == 'retornos' else 'general'
+            inicio = datetime.strptime(
+                params['data_inicio'][0], '%d/%m/%Y'
+            ).date()
+            fim = datetime.strptime(params['data_fim'][0], '%d/%m/%Y').date()
+
+            conteudo = gerar_csv(
+                report,
+                inicio,
+                fim,
+                linhas_por_dia,
+                taxa_duplicadas=taxa_duplicadas,
+            )
+            linhas = ((fim - inicio).days + 1) * linhas_por_dia
+            time.sleep(latencia + latencia_por_mil * linhas / 1000)
+
+            prefixo = (
+                'retorno' if report == 'return' else 'relatorio_prot_geral'
+            )
+            nome = f'{prefixo}_{time.time_ns()}.csv'
+            self._responder(
+                200,
+                conteudo,
+                'text/csv; charset=latin1',
+                {'Content-Disposition': f'attachment; filename="{nome}"'},
+            )
+
+    return FakeSigosHandler
+
+
+def iniciar_servidor(
+    porta=0,
+    linhas_por_dia=200,
+    latencia=0.5,
+    latencia_por_mil=0.05,
+    taxa_duplicadas=0.02,
+):
+    """
+    Sobe o SIGOS fake em uma thread daemon.
+
+    Args:
+        porta: Porta TCP (0 escolhe uma livre).
+        linhas_por_dia: Linhas geradas por dia exportado.
+        latencia: Segundos fixos de espera antes de cada export.
+        latencia_por_mil: Segundos extras a cada mil linhas exportadas.
+        taxa_duplicadas: Fração das linhas com chave repetida.
+
+    Returns:
+        Tupla (servidor, URL base para usar em SIGOS_URL).
+    """
+    servidor = ThreadingHTTPServer(
+        ('127.0.0.1', porta),
+        criar_handler(
+            linhas_por_dia, latencia, latencia_por_mil, taxa_duplicadas
+        ),
+    )
+    thread = threading.Thread(
+        target=servidor.serve_forever, name='fake-sigos', daemon=True
+    )
+    thread.start()
+    return servidor, f'http://127.0.0.1:{servidor.server_address[1]}/'
+
+
+def main():
+    """Sobe o SIGOS fake em primeiro plano."""
+    parser = argparse.ArgumentParser(description='SIGOS fake local')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--linhas-por-dia', type=int, default=200)
+    parser.add_argument('--latencia', type=float, default=0.5)
+    parser.add_argument('--latencia-por-mil', type=float, default=0.05)
+    parser.add_argument('--duplicadas', type=float, default=0.02)
+    args = parser.parse_args()
+
+    servidor, url = iniciar_servidor(
+        args.porta,
+        args.linhas_por_dia,
+        args.latencia,
+        args.latencia_por_mil,
+        args.duplicadas,
+    )
+    print(f'SIGOS fake em {url} (Ctrl+C para parar)')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
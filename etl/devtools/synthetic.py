@@ -0,0 +1,407 @@
+"""Gerador de CSVs sintéticos no formato dos exports do SIGOS.
+
+Os arquivos imitam o que o SIGOS entrega de verdade: latin1, separados por
+``;``, com linhas de lixo antes do cabeçalho, chaves duplicadas, datas
+inválidas (``00/00/0000``), horas em HH:MM e HH:MM:SS e códigos de equipe
+no formato usado para derivar REGIONAL/GRUPO. O conteúdo é determinístico
+por relatório, dia e semente.
+
+Uso (teste de carga):
+    python etl/devtools/synthetic.py --report general --linhas 5000000 \\
+        --dias 365 --arquivos 12 --pasta etl/downloads
+"""
+
+import argparse
+import io
+import math
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+if not __package__:
+    # Rodando como script: coloca etl/ no path, como no main.py
+    sys.path.insert(
+        0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+import esquemas  # noqa: E402
+from transformation.transformer import _norm_col  # noqa: E402
+
+CABECALHO_GENERAL = [
+    'UC / MD',
+    'Status',
+    'Motivo não baixado',
+    'Município',
+    'Tipo serviço',
+    'Data execução',
+    'Cod',
+    'Data aferição',
+    'TOI',
+    'TOI entregue',
+    'AR',
+    'Data AR',
+    'MD encontrado',
+    'MD instalado',
+    'Tipo medição',
+    'Equipe',
+    'Ramal mono',
+    'Ramal bi',
+    'Ramal tri',
+    'Serv de pedreiro',
+    'Parcelamento',
+    'RS negociado',
+    'Backoffice',
+    'Data baixado',
+    'Hora início serviço',
+    'Hora fim serviço',
+    'Cod financiamento',
+    'Qtd parcela(s)',
+    'Regional',
+    'Empresa',
+    'Sit deixada',
+    'Fiscal',
+    'tipo_servico_comercial',
+    'obs_at',
+    'RS Entrada',
+    'Lançado por',
+    'Data lançado',
+    'Hora',
+    'Notificado',
+]
+CABECALHO_RETURN = [
+    'REGIONAL',
+    'UC / MD',
+    'TIPO SERVICO',
+    'DATA EXECUCAO',
+    'CODIGO',
+    'TOI',
+    'MD INSTALADO',
+    'EQUIPE',
+    'DATA RESOLVIDO',
+    'MOTIVO',
+    'MOTIVO DETALHADO',
+    'MOTIVO DETALHADO 2',
+    'STATUS',
+    'FISCAL',
+    'EMPRESA',
+    'DATA ENTREGA',
+    'RETORNO DE',
+]
+
+# Prefixo da base (PEL = regional SUL) + A0xx (grupo AT) ou Bxxx (BT)
+BASES_EQUIPE = ['PEL', 'RGR', 'SMA', 'PFU', 'CAX', 'SLO', 'BAG', 'URU']
+STATUS_GENERAL = ['BAIXADO'] * 6 + ['PENDENTE', 'EM CAMPO', 'CANCELADO']
+MUNICIPIOS = [
+    'PELOTAS',
+    'RIO GRANDE',
+    'SANTA MARIA',
+    'PASSO FUNDO',
+    'CAXIAS DO SUL',
+    'SÃO LOURENÇO DO SUL',
+    'BAGÉ',
+    'URUGUAIANA',
+]
+TIPOS_SERVICO = [
+    'INSPEÇÃO',
+    'TROCA DE MEDIDOR',
+    'RELIGAÇÃO',
+    'CORTE',
+    'REGULARIZAÇÃO',
+]
+MOTIVOS = [
+    'FOTO ILEGÍVEL',
+    'TOI INCOMPLETO',
+    'LEITURA DIVERGENTE',
+    'SELO NÃO INFORMADO',
+]
+DATA_INVALIDA = '00/00/0000'
+
+
+def equipe_aleatoria(rng):
+    """
+    Sorteia um código de equipe (ex.: 'PEL-A012', 'RGR-B107').
+
+    Args:
+        rng: Instância de random.Random.
+
+    Returns:
+        Código da equipe.
+    """
+    base = rng.choice(BASES_EQUIPE)
+    if rng.random() < 0.3:
+        return f'{base}-A{rng.randint(1, 99):03d}'
+    return f'{base}-B{rng.randint(100, 999)}'
+
+
+def _data(dia, rng, taxa_invalidas, dias_depois=0):
+    """Formata uma data derivada, às vezes como 00/00/0000 ou vazia."""
+    sorteio = rng.random()
+    if sorteio < taxa_invalidas:
+        return DATA_INVALIDA
+    if sorteio < taxa_invalidas * 2:
+        return ''
+    return (dia + timedelta(days=dias_depois)).strftime('%d/%m/%Y')
+
+
+def _hora(rng, minutos):
+    """Formata uma hora alternando entre HH:MM e HH:MM:SS."""
+    if rng.random() < 0.5:
+        return f'{minutos // 60:02d}:{minutos % 60:02d}'
+    return f'{minutos // 60:02d}:{minutos % 60:02d}:{rng.randint(0, 59):02d}'
+
+
+def _linha_general(rng, dia, cod, taxa_invalidas):
+    """Gera uma linha do relatório geral para o dia informado."""
+    status = rng.choice(STATUS_GENERAL)
+    baixado = status == 'BAIXADO'
+    inicio = rng.randint(7 * 60, 17 * 60)
+    return [
+        str(rng.randint(10**7, 10**8 - 1)),
+        status,
+        '' if baixado else 'CLIENTE AUSENTE',
+        rng.choice(MUNICIPIOS),
+        rng.choice(TIPOS_SERVICO),
+        dia.strftime('%d/%m/%Y'),
+        str(cod),
+        _data(dia, rng, taxa_invalidas),
+        str(rng.randint(10**6, 10**7 - 1)),
+        rng.choice(['SIM', 'NAO']),
+        str(rng.randint(1000, 9999)),
+        _data(dia, rng, taxa_invalidas, 1),
+        str(rng.randint(10**6, 10**7 - 1)),
+        str(rng.randint(10**6, 10**7 - 1)),
+        rng.choice(['DIRETA', 'INDIRETA']),
+        equipe_aleatoria(rng),
+        str(rng.randint(0, 2)),
+        str(rng.randint(0, 2)),
+        str(rng.randint(0, 2)),
+        rng.choice(['SIM', 'NAO']),
+        rng.choice(['SIM', 'NAO']),
+        f'{rng.randint(0, 900)},{rng.randint(0, 99):02d}',
+        rng.choice(['SIM', 'NAO']),
+        _data(dia, rng, taxa_invalidas, 2) if baixado else '',
+        _hora(rng, inicio),
+        _hora(rng, min(inicio + rng.randint(10, 120), 23 * 60 + 59)),
+        str(rng.randint(100, 999)),
+        str(rng.randint(1, 12)),
+        'SUL',
+        'EMPRESA X',
+        rng.choice(['NORMAL', 'IRREGULAR']),
+        'FISCAL Y',
+        'RESIDENCIAL',
+        '',
+        '0,00',
+        'OPERADOR',
+        _data(dia, rng, taxa_invalidas),
+        _hora(rng, inicio),
+        rng.choice(['SIM', 'NAO']),
+    ]
+
+
+def _linha_return(rng, dia, cod, taxa_invalidas):
+    """Gera uma linha do relatório de retorno para o dia informado."""
+    resolvido = rng.random() < 0.6
+    return [
+        'SUL',
+        str(rng.randint(10**7, 10**8 - 1)),
+        rng.choice(TIPOS_SERVICO),
+        dia.strftime('%d/%m/%Y'),
+        str(cod),
+        str(rng.randint(10**6, 10**7 - 1)),
+        str(rng.randint(10**6, 10**7 - 1)),
+        equipe_aleatoria(rng),
+        _data(dia, rng, taxa_invalidas, 3) if resolvido else '',
+        rng.choice(MOTIVOS),
+        'DETALHE',
+        '',
+        'RESOLVIDO' if resolvido else 'EM RETORNO',
+        'FISCAL Y',
+        'EMPRESA X',
+        _data(dia, rng, taxa_invalidas, 1),
+        'CAMPO',
+    ]
+
+
+def _posicoes_da_chave(report, cabecalho):
+    """Posições, no cabeçalho do CSV, das colunas da chave do report."""
+    renomear = esquemas.renomeacoes(report)
+    nomes = [renomear.get(str(_norm_col(c)).upper()) for c in cabecalho]
+    return [nomes.index(coluna) for coluna in esquemas.chave(report)]
+
+
+def escrever_csv(
+    saida,
+    report,
+    data_inicio,
+    data_fim,
+    linhas_por_dia,
+    taxa_duplicadas=0.02,
+    taxa_datas_invalidas=0.01,
+    linhas_preambulo=2,
+    semente=0,
+):
+    """
+    Escreve um export sintético em um arquivo texto já aberto.
+
+    Args:
+        saida: Arquivo texto (ou StringIO) aberto para escrita.
+        report: 'general' ou 'return'.
+        data_inicio: Data inicial (date).
+        data_fim: Data final (date), inclusiva.
+        linhas_por_dia: Linhas geradas para cada dia.
+        taxa_duplicadas: Fração das linhas que repetem a chave de uma linha
+            anterior do mesmo dia (com outro conteúdo).
+        taxa_datas_invalidas: Fração das datas secundárias como
+            '00/00/0000' (e a mesma fração vazia).
+        linhas_preambulo: Linhas de lixo antes do cabeçalho.
+        semente: Semente extra para gerar bases diferentes.
+
+    Returns:
+        Quantidade de linhas de dados escritas.
+    """
+    if report == 'general':
+        cabecalho, gerar_linha = CABECALHO_GENERAL, _linha_general
+    else:
+        cabecalho, gerar_linha = CABECALHO_RETURN, _linha_return
+    chaves = _posicoes_da_chave(report, cabecalho)
+
+    preambulo = [
+        'Relatório exportado do SIGOS',
+        f'Período: {data_inicio:%d/%m/%Y} a {data_fim:%d/%m/%Y}',
+        f'Gerado em: {data_fim:%d/%m/%Y} 00:00',
+    ]
+    for i in range(linhas_preambulo):
+        saida.write(preambulo[i % len(preambulo)] + '\n')
+    saida.write(';'.join(cabecalho) + '\n')
+
+    escritas = 0
+    dia = data_inicio
+    while dia <= data_fim:
+        # Mesma semente para o mesmo dia: exports repetidos são idênticos
+        rng = random.Random(f'{report}-{dia.isoformat()}-{semente}')
+        base = int(dia.strftime('%Y%m%d')) * 100_000
+        anteriores = []
+        for i in range(linhas_por_dia):
+            linha = gerar_linha(rng, dia, base + i, taxa_datas_invalidas)
+            if anteriores and rng.random() < taxa_duplicadas:
+                original = rng.choice(anteriores)
+                for pos in chaves:
+                    linha[pos] = original[pos]
+            elif len(anteriores) < 1000:
+                anteriores.append(linha)
+            saida.write(';'.join(linha) + '\n')
+            escritas += 1
+        dia += timedelta(days=1)
+    return escritas
+
+
+def gerar_csv(report, data_inicio, data_fim, linhas_por_dia, **opcoes):
+    """
+    Gera um export sintético em memória (usado pelo SIGOS fake).
+
+    Args:
+        report: 'general' ou 'return'.
+        data_inicio: Data inicial (date).
+        data_fim: Data final (date), inclusiva.
+        linhas_por_dia: Linhas geradas para cada dia.
+        **opcoes: Demais argumentos de ``escrever_csv``.
+
+    Returns:
+        Conteúdo do CSV em bytes latin1.
+    """
+    saida = io.StringIO()
+    escrever_csv(
+        saida, report, data_inicio, data_fim, linhas_por_dia, **opcoes
+    )
+    return saida.getvalue().encode('latin1', errors='replace')
+
+
+def gerar_arquivos(
+    pasta, report, total_linhas, dias, data_fim=None, arquivos=1, **opcoes
+):
+    """
+    Gera ``arquivos`` CSVs cobrindo ``dias`` até ``data_fim``.
+
+    Cada arquivo cobre uma fatia contígua do período, como as janelas do
+    extrator, e os nomes seguem os padrões lidos pelo transformer
+    (``relatorio_prot_geral*.csv`` e ``retorno*.csv``).
+
+    Args:
+        pasta: Pasta de destino (criada se não existir).
+        report: 'general' ou 'return'.
+        total_linhas: Quantidade aproximada de linhas no total.
+        dias: Dias cobertos pelos arquivos.
+        data_fim: Último dia (padrão: hoje).
+        arquivos: Quantidade de arquivos gerados.
+        **opcoes: Demais argumentos de ``escrever_csv``.
+
+    Returns:
+        Lista com os caminhos dos arquivos gerados.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    data_fim = data_fim or date.today()
+    data_inicio = data_fim - timedelta(days=dias - 1)
+    linhas_por_dia = max(1, math.ceil(total_linhas / dias))
+    dias_por_arquivo = math.ceil(dias / arquivos)
+    prefixo = 'retorno' if report == 'return' else 'relatorio_prot_geral'
+
+    caminhos = []
+    inicio = data_inicio
+    while inicio <= data_fim:
+        fim = min(inicio + timedelta(days=dias_por_arquivo - 1), data_fim)
+        caminho = os.path.join(
+            pasta, f'{prefixo}_{inicio:%Y%m%d}_{fim:%Y%m%d}.csv'
+        )
+        with open(
+            caminho, 'w', encoding='latin1', errors='replace', newline=''
+        ) as f:
+            escrever_csv(f, report, inicio, fim, linhas_por_dia, **opcoes)
+        caminhos.append(caminho)
+        inicio = fim + timedelta(days=1)
+    return caminhos
+
+
+def main():
+    """Gera os arquivos a partir da linha de comando."""
+    parser = argparse.ArgumentParser(description='CSVs sintéticos do SIGOS')
+    parser.add_argument('--report', choices=['general', 'return'])
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--dias', type=int, default=60)
+    parser.add_argument('--data-fim', help='dd/mm/yyyy (padrão: hoje)')
+    parser.add_argument('--arquivos', type=int, default=1)
+    parser.add_argument('--duplicadas', type=float, default=0.02)
+    parser.add_argument('--datas-invalidas', type=float, default=0.01)
+    parser.add_argument('--preambulo', type=int, default=2)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument(
+        '--pasta', default=os.path.join('etl', 'downloads', 'sintetico')
+    )
+    args = parser.parse_args()
+
+    data_fim = (
+        datetime.strptime(args.data_fim, '%d/%m/%Y').date()
+        if args.data_fim
+        else None
+    )
+    reports = [args.report] if args.report else ['general', 'return']
+    for report in reports:
+        caminhos = gerar_arquivos(
+            args.pasta,
+            report,
+            args.linhas,
+            args.dias,
+            data_fim=data_fim,
+            arquivos=args.arquivos,
+            taxa_duplicadas=args.duplicadas,
+            taxa_datas_invalidas=args.datas_invalidas,
+            linhas_preambulo=args.preambulo,
+            semente=args.semente,
+        )
+        for caminho in caminhos:
+            tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+            print(f'{caminho} ({tamanho_mb:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""Módulo com a carga do .env da raiz do projeto.
+
+Os módulos do ETL leem a configuração com ``os.getenv`` no import, então o
+.env precisa ser carregado antes deles. Isso fica a cargo dos pontos de
+entrada (``main.py``, benchmarks), e não de cada módulo no import.
+"""
+
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_carregado = False
+
+
+def carregar_env():
+    """
+    Carrega o .env da raiz do projeto uma única vez por processo.
+
+    Variáveis já definidas no ambiente (ECS, docker, benchmarks) têm
+    prioridade sobre o arquivo.
+    """
+    global _carregado
+    if _carregado:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv(os.path.join(BASE_DIR, '.env'))
+    _carregado = True
@@ -0,0 +1,156 @@
+"""Módulo com o esquema declarativo de cada relatório.
+
+Um lugar só para as colunas de cada report: qual coluna do CSV vira qual
+coluna da tabela, com que tipo SQL. O transformer lê do CSV só as colunas
+daqui (``usecols``), então as descartadas nem chegam a ser parseadas; o
+loader tira daqui os tipos do ``to_sql``; e o ``init_database`` cria as
+tabelas e acrescenta as colunas novas a partir daqui. A chave de negócio
+(``chave``) também fica aqui: deduplicação, histórico, qualidade e o
+gerador de CSVs sintéticos usam a mesma.
+"""
+
+# Report -> tabela e colunas (coluna na tabela, tipo SQL, coluna no CSV).
+# A coluna no CSV é o cabeçalho normalizado (sem acento, espaços simples)
+# em maiúsculas; None indica coluna calculada pelo ETL. 'chave' são as
+# colunas que identificam um serviço
+ESQUEMAS = {
+    'general': {
+        'tabela': 'general_reports',
+        'chave': ['UC / MD', 'DATA_EXECUCAO', 'COD', 'TOI', 'EQUIPE'],
+        'colunas': [
+            ('UC / MD', 'TEXT', 'UC / MD'),
+            ('STATUS', 'TEXT', 'STATUS'),
+            ('MUNICIPIO', 'TEXT', 'MUNICIPIO'),
+            ('TIPO SERVICO', 'TEXT', 'TIPO SERVICO'),
+            ('DATA_EXECUCAO', 'DATE', 'DATA EXECUCAO'),
+            ('COD', 'TEXT', 'COD'),
+            ('DATA AFERICAO', 'DATE', 'DATA AFERICAO'),
+            ('TOI', 'TEXT', 'TOI'),
+            ('TOI ENTREGUE', 'TEXT', 'TOI ENTREGUE'),
+            ('AR', 'TEXT', 'AR'),
+            ('DATA AR', 'DATE', 'DATA AR'),
+            ('MD ENCONTRADO', 'TEXT', 'MD ENCONTRADO'),
+            ('MD INSTALADO', 'TEXT', 'MD INSTALADO'),
+            ('TIPO MEDICAO', 'TEXT', 'TIPO MEDICAO'),
+            ('EQUIPE', 'TEXT', 'EQUIPE'),
+            ('RAMAL MONO', 'TEXT', 'RAMAL MONO'),
+            ('RAMAL BI', 'TEXT', 'RAMAL BI'),
+            ('RAMAL TRI', 'TEXT', 'RAMAL TRI'),
+            ('SERV DE PEDREIRO', 'TEXT', 'SERV DE PEDREIRO'),
+            ('PARCELAMENTO', 'TEXT', 'PARCELAMENTO'),
+            ('RS NEGOCIADO', 'TEXT', 'RS NEGOCIADO'),
+            ('BACKOFFICE', 'TEXT', 'BACKOFFICE'),
+            ('DATA BAIXADO', 'DATE', 'DATA BAIXADO'),
+            ('HORA INICIO SERVICO', 'TIME', 'HORA INICIO SERVICO'),
+            ('HORA FIM SERVICO', 'TIME', 'HORA FIM SERVICO'),
+            ('COD FINANCIAMENTO', 'TEXT', 'COD FINANCIAMENTO'),
+            ('QTD PARCELA(S)', 'TEXT', 'QTD PARCELA(S)'),
+            ('REGIONAL', 'TEXT', None),
+            ('GRUPO', 'TEXT', None),
+            ('DATA_EXTRACAO', 'TIMESTAMP', None),
+            ('NOTIFICADO', 'TEXT', 'NOTIFICADO'),
+        ],
+    },
+    'return': {
+        'tabela': 'return_reports',
+        'chave': ['UC / MD', 'DATA_EXECUCAO', 'CODIGO', 'TOI', 'EQUIPE'],
+        'colunas': [
+            ('UC / MD', 'TEXT', 'UC / MD'),
+            ('DATA_EXECUCAO', 'DATE', 'DATA EXECUCAO'),
+            ('CODIGO', 'TEXT', 'CODIGO'),
+            ('TOI', 'TEXT', 'TOI'),
+            ('MD INSTALADO', 'TEXT', 'MD INSTALADO'),
+            ('EQUIPE', 'TEXT', 'EQUIPE'),
+            ('DATA RESOLVIDO', 'DATE', 'DATA RESOLVIDO'),
+            ('MOTIVO', 'TEXT', 'MOTIVO'),
+            ('MOTIVO DETALHADO', 'TEXT', 'MOTIVO DETALHADO'),
+            ('MOTIVO DETALHADO 2', 'TEXT', 'MOTIVO DETALHADO 2'),
+            ('STATUS', 'TEXT', 'STATUS'),
+            ('REGIONAL', 'TEXT', None),
+            ('GRUPO', 'TEXT', None),
+            ('DATA_EXTRACAO', 'TIMESTAMP', None),
+        ],
+    },
+}
+
+
+def esquema_da_tabela(tabela):
+    """Retorna o esquema cuja tabela é ``tabela`` (ou None)."""
+    for esquema in ESQUEMAS.values():
+        if esquema['tabela'] == tabela:
+            return esquema
+    return None
+
+
+def renomeacoes(report):
+    """
+    Retorna o mapeamento {coluna no CSV: coluna na tabela} do report.
+
+    Args:
+        report: 'general' ou 'return'.
+    """
+    return {
+        origem: nome
+        for nome, _, origem in ESQUEMAS[report]['colunas']
+        if origem is not None
+    }
+
+
+def chave(report):
+    """
+    Retorna a chave de negócio do report (colunas da tabela).
+
+    Args:
+        report: 'general' ou 'return'.
+    """
+    return list(ESQUEMAS[report]['chave'])
+
+
+def colunas_do_tipo(report, tipo):
+    """Colunas da tabela do report com o tipo SQL informado."""
+    return [
+        nome
+        for nome, tipo_sql, _ in ESQUEMAS[report]['colunas']
+        if tipo_sql == tipo
+    ]
+
+
+def tipos_sqlalchemy(tabela):
+    """
+    Retorna os tipos SQLAlchemy das colunas não textuais da tabela.
+
+    Args:
+        tabela: Nome da tabela.
+
+    Returns:
+        Dicionário {coluna: tipo} para o ``dtype`` do ``to_sql`` (vazio
+        para tabelas fora dos esquemas).
+    """
+    from sqlalchemy.types import Date, DateTime, Time
+
+    tipos = {'DATE': Date, 'TIME': Time, 'TIMESTAMP': DateTime}
+    esquema = esquema_da_tabela(tabela)
+    if esquema is None:
+        return {}
+    return {
+        nome: tipos[tipo]()
+        for nome, tipo, _ in esquema['colunas']
+        if tipo in tipos
+    }
+
+
+def ddl(report):
+    """
+    Monta o CREATE TABLE da tabela do report.
+
+    Args:
+        report: 'general' ou 'return'.
+
+    Returns:
+        Comando SQL (idempotente: ``IF NOT EXISTS``).
+    """
+    esquema = ESQUEMAS[report]
+    colunas = ',\n'.join(
+        f'    "{nome}" {tipo}' for nome, tipo, _ in esquema['colunas']
+    )
+    return f'CREATE TABLE IF NOT EXISTS {esquema["tabela"]} (\n{colunas}\n);\n'
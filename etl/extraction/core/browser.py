@@ -2,7 +2,7 @@
 
 import os
 
-from dotenv import load_dotenv
+from extraction.core.pool import PoolNavegadores
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -10,11 +10,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-load_dotenv()
-
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
-load_dotenv(os.path.join(BASE_DIR, '.env'))
-
+# O .env é carregado pelo ponto de entrada (env.carregar_env)
 USUARIO = os.getenv('SIGOS_USUARIO')
 SENHA = os.getenv('SIGOS_SENHA')
 
@@ -22,6 +18,45 @@ DOWNLOAD_DIR = os.path.join(os.getcwd(), 'etl', 'downloads')
 
 HEADLESS = os.getenv('HEADLESS', 'true').lower() == 'true'
 
+# Pode apontar para o SIGOS fake local (etl/devtools/fake_sigos.py)
+SIGOS_URL = os.getenv(
+    'SIGOS_URL', 'https://apps.equatorialenergia.com.br/sigos/'
+)
+
+# Perfil do navegador: 'default' ou 'lean' (sem imagens, fontes e afins)
+BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'default').lower()
+
+# URLs bloqueadas via CDP no perfil lean (analytics e estáticos pesados)
+URLS_BLOQUEADAS_LEAN = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+    '*.png',
+    '*.jpg',
+    '*.jpeg',
+    '*.gif',
+    '*.svg',
+    '*.ico',
+    '*.webp',
+    '*.woff',
+    '*.woff2',
+    '*.ttf',
+    '*.otf',
+    '*.eot',
+    '*.mp4',
+]
+
+# Desliga animações e transições CSS em toda página carregada
+CSS_SEM_ANIMACOES = (
+    '*,*::before,*::after{animation:none!important;'
+    'transition:none!important;scroll-behavior:auto!important}'
+)
+
+# Pool de navegadores aquecidos (ativado apenas no modo scheduler)
+_POOL = None
+
 
 def esperar_elemento(driver, xpath, tipo='presenca', timeout=20):
     """
@@ -60,23 +95,143 @@ def esperar_elemento(driver, xpath, tipo='presenca', timeout=20):
         )
     
     
-def abre_navegador():
+# Atribui o valor pelo setter nativo (funciona com frameworks que observam o
+# input) e dispara os eventos que a página escuta
+JS_DEFINIR_VALOR = """
+const el = arguments[0];
+const setter = Object.getOwnPropertyDescriptor(
+    HTMLInputElement.prototype, 'value'
+).set;
+setter.call(el, arguments[1]);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+
+def preencher_data(driver, xpath, data_str, timeout=20):
+    """
+    Preenche um campo de data via JavaScript e confere o valor lido de volta.
+
+    Campos ``type=date`` recebem o valor em ISO (yyyy-mm-dd), independente do
+    locale do Chrome; os demais recebem a data como 'dd/mm/yyyy'.
+
+    Args:
+        driver: Instância do WebDriver do Selenium.
+        xpath: XPath do campo de data.
+        data_str: Data no formato 'dd/mm/yyyy'.
+        timeout: Tempo máximo de espera em segundos.
+
+    Raises:
+        TimeoutException: Se o campo não refletir o valor dentro do timeout.
+    """
+    elem = esperar_elemento(driver, xpath, tipo='clicavel', timeout=timeout)
+    if (elem.get_attribute('type') or '').lower() == 'date':
+        dia, mes, ano = data_str.split('/')
+        valor = f'{ano}-{mes}-{dia}'
+    else:
+        valor = data_str
+
+    driver.execute_script(JS_DEFINIR_VALOR, elem, valor)
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script('return arguments[0].value;', elem)
+        == valor,
+        message=f'Campo {xpath} não aceitou a data {data_str}',
+    )
+
+
+def _aplicar_perfil_lean(options, prefs):
+    """
+    Ajusta opções e prefs do Chrome para o perfil enxuto.
+
+    Args:
+        options: Instância de Options do Chrome.
+        prefs: Dicionário de preferências que será enviado ao Chrome.
+    """
+    prefs.update(
+        {
+            'safebrowsing.enabled': False,
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        }
+    )
+    options.page_load_strategy = 'eager'
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-component-update')
+    options.add_argument('--disable-default-apps')
+    options.add_argument('--disable-sync')
+    options.add_argument('--disable-client-side-phishing-detection')
+    options.add_argument(
+        '--disable-features=Translate,OptimizationHints,MediaRouter'
+    )
+    options.add_argument('--metrics-recording-only')
+    options.add_argument('--mute-audio')
+
+
+def _bloquear_requisicoes_lean(driver):
+    """
+    Bloqueia analytics/estáticos via CDP e remove animações CSS.
+
+    Args:
+        driver: Instância do WebDriver do Chrome.
+    """
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd(
+        'Network.setBlockedURLs', {'urls': URLS_BLOQUEADAS_LEAN}
+    )
+    driver.execute_cdp_cmd(
+        'Page.addScriptToEvaluateOnNewDocument',
+        {
+            'source': (
+                "document.addEventListener('DOMContentLoaded', () => {"
+                "const s = document.createElement('style');"
+                f"s.textContent = '{CSS_SEM_ANIMACOES}';"
+                'document.head.appendChild(s);});'
+            )
+        },
+    )
+
+
+def definir_pasta_download(driver, pasta):
+    """
+    Troca a pasta de download de um navegador já aberto (via CDP).
+
+    Args:
+        driver: Instância do WebDriver do Chrome.
+        pasta: Caminho absoluto da nova pasta de download.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    driver.execute_cdp_cmd(
+        'Page.setDownloadBehavior',
+        {'behavior': 'allow', 'downloadPath': pasta},
+    )
+
+
+def abre_navegador(perfil=None, pasta_download=None):
     """
     Configura e abre uma instância do Chrome com opções de download.
     Se SELENIUM_URL estiver definido, usa Remote; caso contrário, usa local.
 
+    Args:
+        perfil: 'default' ou 'lean' (padrão: variável BROWSER_PROFILE).
+        pasta_download: Pasta de download (padrão: DOWNLOAD_DIR).
+
     Returns:
         WebDriver configurado e apontando para a URL do SIGOS.
     """
+    perfil = (perfil or BROWSER_PROFILE).lower()
     options = Options()
 
     prefs = {
-        'download.default_directory': DOWNLOAD_DIR,
+        'download.default_directory': pasta_download or DOWNLOAD_DIR,
         'download.prompt_for_download': False,
         'download.directory_upgrade': True,
         'safebrowsing.enabled': True,
         'safebrowsing.disable_download_protection': True,
     }
+    if perfil == 'lean':
+        _aplicar_perfil_lean(options, prefs)
     options.add_experimental_option('prefs', prefs)
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
 
@@ -100,32 +255,91 @@ def abre_navegador():
     service = Service(executable_path=chromedriver_path)
 
     driver = webdriver.Chrome(service=service, options=options)
-    driver.get('https://apps.equatorialenergia.com.br/sigos/')
+    if perfil == 'lean':
+        _bloquear_requisicoes_lean(driver)
+    driver.get(SIGOS_URL)
     return driver
 
 
-def logar_sigos():
+def ativar_pool(tamanho=None):
+    """
+    Ativa o pool de navegadores aquecidos para os próximos logins.
+
+    Args:
+        tamanho: Quantidade de navegadores aquecidos (padrão: POOL_TAMANHO).
+
+    Returns:
+        Instância de PoolNavegadores em uso.
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = PoolNavegadores(abre_navegador, SIGOS_URL)
+    if tamanho is not None:
+        _POOL.tamanho = tamanho
+    return _POOL
+
+
+def encerrar_pool():
+    """Fecha os navegadores do pool e volta ao modo sem pool."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.encerrar()
+        _POOL = None
+
+
+def fechar_navegador(driver):
+    """
+    Encerra o navegador ou devolve ao pool, se o pool estiver ativo.
+
+    Args:
+        driver: Instância do WebDriver do Selenium.
+    """
+    if _POOL is not None:
+        _POOL.liberar(driver)
+    else:
+        driver.quit()
+
+
+def logar_sigos(perfil=None, pasta_download=None):
     """
     Realiza login no sistema SIGOS usando credenciais do .env.
 
+    Args:
+        perfil: Perfil do navegador ('default' ou 'lean'); ignorado quando o
+            pool está ativo, pois o pool usa BROWSER_PROFILE.
+        pasta_download: Pasta de download deste login (padrão: DOWNLOAD_DIR).
+
     Returns:
         WebDriver autenticado e pronto para navegação.
     """
-    driver = abre_navegador()
+    if _POOL is not None:
+        driver = _POOL.adquirir()
+        # Navegadores do pool podem ter baixado em outra pasta antes
+        try:
+            definir_pasta_download(driver, pasta_download or DOWNLOAD_DIR)
+        except Exception:
+            fechar_navegador(driver)
+            raise
+    else:
+        driver = abre_navegador(perfil, pasta_download)
     if not HEADLESS:  # só maximiza se não for headless
         driver.maximize_window()
-    campo_login = esperar_elemento(
-        driver, '/html/body/form/div/div/div[2]/div[3]/div/div[1]/input'
-    )
-    campo_login.send_keys(USUARIO)
-    campo_senha = esperar_elemento(
-        driver, '/html/body/form/div/div/div[2]/div[3]/div/div[2]/input'
-    )
-    campo_senha.send_keys(SENHA)
-    botao_entrar = esperar_elemento(
-        driver,
-        '/html/body/form/div/div/div[2]/div[3]/div/div[3]/div[2]/button',
-        tipo='clicavel',
-    )
-    botao_entrar.click()
+    try:
+        campo_login = esperar_elemento(
+            driver, '/html/body/form/div/div/div[2]/div[3]/div/div[1]/input'
+        )
+        campo_login.send_keys(USUARIO)
+        campo_senha = esperar_elemento(
+            driver, '/html/body/form/div/div/div[2]/div[3]/div/div[2]/input'
+        )
+        campo_senha.send_keys(SENHA)
+        botao_entrar = esperar_elemento(
+            driver,
+            '/html/body/form/div/div/div[2]/div[3]/div/div[3]/div[2]/button',
+            tipo='clicavel',
+        )
+        botao_entrar.click()
+    except Exception:
+        fechar_navegador(driver)
+        raise
     return driver
@@ -0,0 +1,147 @@
+"""Módulo com o diário de checkpoints das extrações FULL."""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+STATE_DIR = os.path.join(os.getcwd(), 'etl', 'state')
+
+# Janelas concluídas há mais tempo que isso são baixadas de novo
+CHECKPOINT_MAX_HORAS = float(os.getenv('CHECKPOINT_MAX_HORAS', '24'))
+
+_lock = threading.Lock()
+
+
+def _caminho_diario(report):
+    """Retorna o caminho do diário de checkpoints do relatório."""
+    return os.path.join(STATE_DIR, f'checkpoint_{report}.json')
+
+
+def _carregar(report):
+    """
+    Carrega o diário do relatório, descartando diários expirados.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+
+    Returns:
+        Dicionário com 'criado_em' e a lista de 'entradas'.
+    """
+    vazio = {
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'entradas': [],
+    }
+    caminho = _caminho_diario(report)
+    if not os.path.exists(caminho):
+        return vazio
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            diario = json.load(f)
+        criado_em = datetime.fromisoformat(diario['criado_em'])
+    except (OSError, ValueError, KeyError):
+        return vazio
+    if datetime.now() - criado_em > timedelta(hours=CHECKPOINT_MAX_HORAS):
+        return vazio
+    return diario
+
+
+def registrar_concluido(report, data_inicio, data_fim, arquivo):
+    """
+    Registra no diário uma janela baixada com sucesso.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        data_inicio: Data inicial da janela no formato 'dd/mm/yyyy'.
+        data_fim: Data final da janela no formato 'dd/mm/yyyy'.
+        arquivo: Caminho do CSV baixado para a janela.
+    """
+    with _lock:
+        diario = _carregar(report)
+        diario['entradas'].append(
+            {
+                'report': report,
+                'inicio': data_inicio,
+                'fim': data_fim,
+                'arquivo': arquivo,
+                'concluido_em': datetime.now().isoformat(timespec='seconds'),
+            }
+        )
+        os.makedirs(STATE_DIR, exist_ok=True)
+        caminho = _caminho_diario(report)
+        tmp = f'{caminho}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(diario, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, caminho)
+
+
+def _na_pasta(arquivo, pasta):
+    """Indica se o arquivo está diretamente dentro da pasta."""
+    return os.path.dirname(os.path.abspath(arquivo)) == os.path.abspath(pasta)
+
+
+def entradas_validas(report, pasta=None):
+    """
+    Retorna as entradas do diário cujo arquivo ainda existe em disco.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        pasta: Se informada, só valem os arquivos baixados nessa pasta. A
+            transformação lê os CSVs da pasta de download da execução, então
+            uma janela baixada em outra pasta (ex.: pasta por report dos
+            ciclos concorrentes) seria pulada sem nunca ser lida.
+
+    Returns:
+        Lista de entradas válidas, ordenadas pela data inicial.
+    """
+    entradas = [
+        e
+        for e in _carregar(report)['entradas']
+        if os.path.exists(e['arquivo'])
+        and (pasta is None or _na_pasta(e['arquivo'], pasta))
+    ]
+    return sorted(
+        entradas, key=lambda e: datetime.strptime(e['inicio'], '%d/%m/%Y')
+    )
+
+
+def retomar_de(report, data_inicio_str, pasta=None):
+    """
+    Calcula a partir de qual data a extração FULL precisa continuar.
+
+    Percorre as janelas concluídas em ordem e avança enquanto elas cobrem o
+    período sem buracos, a partir de ``data_inicio_str``.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        data_inicio_str: Data inicial da coleta no formato 'dd/mm/yyyy'.
+        pasta: Pasta de download da execução; só as janelas baixadas nela
+            são reaproveitadas (ver ``entradas_validas``).
+
+    Returns:
+        Tupla (data de retomada 'dd/mm/yyyy', entradas reaproveitadas).
+    """
+    cursor = datetime.strptime(data_inicio_str, '%d/%m/%Y')
+    reaproveitadas = []
+    for entrada in entradas_validas(report, pasta):
+        inicio = datetime.strptime(entrada['inicio'], '%d/%m/%Y')
+        fim = datetime.strptime(entrada['fim'], '%d/%m/%Y')
+        if inicio > cursor:
+            break
+        if fim > cursor:
+            cursor = fim
+        reaproveitadas.append(entrada)
+    return cursor.strftime('%d/%m/%Y'), reaproveitadas
+
+
+def limpar(report):
+    """
+    Remove o diário do relatório (chamado após um load bem-sucedido).
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+    """
+    with _lock:
+        caminho = _caminho_diario(report)
+        if os.path.exists(caminho):
+            os.remove(caminho)
@@ -0,0 +1,99 @@
+"""Módulo com o manifesto de impressões digitais das janelas carregadas."""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+STATE_DIR = os.path.join(os.getcwd(), 'etl', 'state')
+
+_lock = threading.Lock()
+
+
+def _caminho_manifesto(report):
+    """Retorna o caminho do manifesto do relatório."""
+    return os.path.join(STATE_DIR, f'manifest_{report}.json')
+
+
+def chave(data_inicio, data_fim):
+    """Monta a chave da janela no manifesto."""
+    return f'{data_inicio}-{data_fim}'
+
+
+def impressao_digital(caminho, tamanho_bloco=1024 * 1024):
+    """
+    Calcula o BLAKE2b do conteúdo de um arquivo.
+
+    Args:
+        caminho: Caminho do CSV baixado.
+        tamanho_bloco: Bytes lidos por vez.
+
+    Returns:
+        Hash hexadecimal do arquivo.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def carregar(report):
+    """
+    Carrega os hashes da última carga de cada janela do relatório.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+
+    Returns:
+        Dicionário {chave da janela: {'hashes': [...], 'carregado_em': ...}}.
+    """
+    caminho = _caminho_manifesto(report)
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Manifesto corrompido só faz a janela ser carregada de novo
+        return {}
+
+
+def registrar_carregados(report, janelas):
+    """
+    Registra os hashes das janelas que acabaram de ser carregadas no banco.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        janelas: Dicionário {chave da janela: lista de hashes dos CSVs}.
+    """
+    if not janelas:
+        return
+    agora = datetime.now().isoformat(timespec='seconds')
+    with _lock:
+        manifesto = carregar(report)
+        for chave_janela, hashes in janelas.items():
+            manifesto[chave_janela] = {
+                'hashes': sorted(set(hashes)),
+                'carregado_em': agora,
+            }
+        os.makedirs(STATE_DIR, exist_ok=True)
+        caminho = _caminho_manifesto(report)
+        tmp = f'{caminho}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, caminho)
+
+
+def limpar(report):
+    """
+    Remove o manifesto do relatório (chamado antes de um FULL truncar).
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+    """
+    with _lock:
+        caminho = _caminho_manifesto(report)
+        if os.path.exists(caminho):
+            os.remove(caminho)
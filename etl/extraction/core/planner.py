@@ -0,0 +1,186 @@
+"""Módulo para planejamento adaptativo dos intervalos de exportação."""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import metrics
+
+STATE_DIR = os.path.join(os.getcwd(), 'etl', 'state')
+
+# Quantidade de linhas que queremos em cada CSV exportado
+ALVO_LINHAS = int(os.getenv('ALVO_LINHAS_POR_EXPORT', '20000'))
+# Tempo máximo desejado por export (o download estoura em 120s)
+ORCAMENTO_SEGUNDOS = float(os.getenv('ORCAMENTO_SEGUNDOS_EXPORT', '60'))
+# Quantidade máxima de amostras guardadas por relatório
+MAX_AMOSTRAS = 500
+
+_lock = threading.Lock()
+
+
+def _caminho_estatisticas(report):
+    """Retorna o caminho do arquivo de estatísticas do relatório."""
+    return os.path.join(STATE_DIR, f'interval_stats_{report}.json')
+
+
+def carregar_estatisticas(report):
+    """
+    Carrega as amostras de exportação registradas para o relatório.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+
+    Returns:
+        Lista de amostras (dicts com inicio, fim, linhas e segundos).
+    """
+    caminho = _caminho_estatisticas(report)
+    if not os.path.exists(caminho):
+        return []
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Arquivo corrompido não pode travar a extração
+        return []
+
+
+def registrar_janela(report, data_inicio, data_fim, linhas, segundos):
+    """
+    Registra o resultado de um export no armazenamento de estatísticas.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        data_inicio: Data inicial da janela no formato 'dd/mm/yyyy'.
+        data_fim: Data final da janela no formato 'dd/mm/yyyy'.
+        linhas: Quantidade de linhas do CSV exportado.
+        segundos: Tempo entre o clique em exportar e o fim do download.
+    """
+    metrics.observar('etl_download_janela_seconds', segundos, report=report)
+    metrics.incrementar('etl_linhas_exportadas_total', linhas, report=report)
+    with _lock:
+        amostras = carregar_estatisticas(report)
+        amostras.append(
+            {
+                'inicio': data_inicio,
+                'fim': data_fim,
+                'linhas': int(linhas),
+                'segundos': round(float(segundos), 3),
+                'registrado_em': datetime.now().isoformat(timespec='seconds'),
+            }
+        )
+        amostras = amostras[-MAX_AMOSTRAS:]
+
+        os.makedirs(STATE_DIR, exist_ok=True)
+        caminho = _caminho_estatisticas(report)
+        tmp = f'{caminho}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(amostras, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, caminho)
+
+
+def _densidade_por_dia(amostras):
+    """
+    Distribui as linhas de cada amostra igualmente entre os dias da janela.
+
+    Amostras mais novas sobrescrevem as mais antigas para o mesmo dia.
+
+    Args:
+        amostras: Lista de amostras carregadas do armazenamento.
+
+    Returns:
+        Dicionário {date: linhas estimadas no dia}.
+    """
+    densidade = {}
+    for amostra in amostras:
+        inicio = datetime.strptime(amostra['inicio'], '%d/%m/%Y').date()
+        fim = datetime.strptime(amostra['fim'], '%d/%m/%Y').date()
+        dias = max((fim - inicio).days, 1)
+        por_dia = amostra['linhas'] / dias
+        for i in range(dias):
+            densidade[inicio + timedelta(days=i)] = por_dia
+    return densidade
+
+
+def _alvo_efetivo(amostras, alvo_linhas):
+    """
+    Reduz o alvo de linhas quando a latência observada não cabe no orçamento.
+
+    Args:
+        amostras: Lista de amostras carregadas do armazenamento.
+        alvo_linhas: Alvo de linhas por export desejado.
+
+    Returns:
+        Alvo de linhas ajustado pela vazão observada do SIGOS.
+    """
+    linhas = sum(a['linhas'] for a in amostras)
+    segundos = sum(a['segundos'] for a in amostras)
+    if not linhas or not segundos:
+        return alvo_linhas
+    linhas_por_segundo = linhas / segundos
+    return max(
+        1, min(alvo_linhas, int(linhas_por_segundo * ORCAMENTO_SEGUNDOS))
+    )
+
+
+def planejar_intervalos(
+    report,
+    data_inicio_str,
+    data_fim_str,
+    dias_padrao,
+    dias_max=None,
+    alvo_linhas=None,
+):
+    """
+    Gera intervalos de datas dimensionados pelo histórico de exports.
+
+    Dias sem histórico assumem a densidade que faria uma janela de
+    ``dias_padrao`` atingir o alvo, então sem estatísticas o resultado é
+    igual ao de ``gerar_intervalos``. Períodos esparsos são agrupados em
+    janelas maiores e períodos densos são quebrados em janelas menores.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        data_inicio_str: Data inicial no formato 'dd/mm/yyyy'.
+        data_fim_str: Data final no formato 'dd/mm/yyyy'.
+        dias_padrao: Tamanho da janela fixa usada quando não há histórico.
+        dias_max: Tamanho máximo de uma janela (padrão: 6x ``dias_padrao``).
+        alvo_linhas: Linhas desejadas por export (padrão: ALVO_LINHAS).
+
+    Returns:
+        Lista de tuplas (data_inicio, data_fim) no formato 'dd/mm/yyyy'.
+    """
+    alvo_linhas = alvo_linhas or ALVO_LINHAS
+    dias_max = dias_max or dias_padrao * 6
+
+    amostras = carregar_estatisticas(report)
+    densidade = _densidade_por_dia(amostras)
+    alvo = _alvo_efetivo(amostras, alvo_linhas)
+    densidade_padrao = alvo_linhas / dias_padrao
+
+    data_inicio = datetime.strptime(data_inicio_str, '%d/%m/%Y').date()
+    data_fim = datetime.strptime(data_fim_str, '%d/%m/%Y').date()
+
+    intervalos = []
+    while data_inicio < data_fim:
+        data_final_intervalo = data_inicio
+        estimado = 0.0
+        while data_final_intervalo < data_fim:
+            dias = (data_final_intervalo - data_inicio).days
+            linhas_dia = densidade.get(data_final_intervalo, densidade_padrao)
+            if dias >= dias_max or (
+                dias >= 1 and estimado + linhas_dia > alvo + 1e-6
+            ):
+                break
+            estimado += linhas_dia
+            data_final_intervalo += timedelta(days=1)
+
+        intervalos.append(
+            (
+                data_inicio.strftime('%d/%m/%Y'),
+                data_final_intervalo.strftime('%d/%m/%Y'),
+            )
+        )
+        data_inicio = data_final_intervalo
+
+    return intervalos
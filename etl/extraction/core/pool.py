@@ -0,0 +1,249 @@
+"""Módulo com o pool de navegadores pré-aquecidos do modo scheduler."""
+
+import logging
+import os
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+POOL_TAMANHO = int(os.getenv('POOL_TAMANHO', '1'))
+POOL_MAX_RSS_MB = float(os.getenv('POOL_MAX_RSS_MB', '1500'))
+POOL_MAX_IDADE_MIN = float(os.getenv('POOL_MAX_IDADE_MIN', '240'))
+
+
+def _filhos_por_processo():
+    """
+    Monta o mapa {ppid: [pids]} lendo o /proc.
+
+    Returns:
+        Dicionário com os filhos de cada processo.
+    """
+    filhos = {}
+    for nome in os.listdir('/proc'):
+        if not nome.isdigit():
+            continue
+        try:
+            with open(f'/proc/{nome}/stat', 'r') as f:
+                # O nome do processo pode ter espaços, então corta no ')'
+                campos = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        filhos.setdefault(int(campos[1]), []).append(int(nome))
+    return filhos
+
+
+def rss_processos_mb(pid_raiz):
+    """
+    Soma a memória residente de um processo e de todos os seus descendentes.
+
+    Args:
+        pid_raiz: PID do processo raiz (o chromedriver).
+
+    Returns:
+        RSS total em MB, ou None se o /proc não estiver disponível.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    filhos = _filhos_por_processo()
+    tamanho_pagina = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    pendentes = [pid_raiz]
+    while pendentes:
+        pid = pendentes.pop()
+        try:
+            with open(f'/proc/{pid}/statm', 'r') as f:
+                total += int(f.read().split()[1]) * tamanho_pagina
+        except OSError:
+            continue
+        pendentes.extend(filhos.get(pid, []))
+    return total / (1024 * 1024)
+
+
+def rss_navegador_mb(driver):
+    """
+    Retorna a memória residente do Chromium controlado pelo driver.
+
+    Args:
+        driver: Instância do WebDriver do Selenium.
+
+    Returns:
+        RSS em MB, ou None se não for possível medir (ex.: driver remoto).
+    """
+    processo = getattr(getattr(driver, 'service', None), 'process', None)
+    if processo is None:
+        return None
+    return rss_processos_mb(processo.pid)
+
+
+class PoolNavegadores:
+    """
+    Mantém navegadores vivos entre ciclos para evitar o cold start do Chromium.
+
+    Os navegadores ociosos passam por health check, são reciclados quando a
+    memória passa de ``max_rss_mb`` e rotacionados após ``max_idade_min``.
+    """
+
+    def __init__(
+        self,
+        fabrica,
+        url_inicial,
+        tamanho=POOL_TAMANHO,
+        max_rss_mb=POOL_MAX_RSS_MB,
+        max_idade_min=POOL_MAX_IDADE_MIN,
+    ):
+        """
+        Cria o pool (vazio; use ``aquecer`` para pré-abrir navegadores).
+
+        Args:
+            fabrica: Função sem argumentos que abre um novo WebDriver.
+            url_inicial: URL carregada ao devolver um navegador ao pool.
+            tamanho: Quantidade de navegadores mantidos ociosos.
+            max_rss_mb: Limite de memória (MB) antes de reciclar.
+            max_idade_min: Idade máxima (minutos) de um navegador.
+        """
+        self.fabrica = fabrica
+        self.url_inicial = url_inicial
+        self.tamanho = tamanho
+        self.max_rss_mb = max_rss_mb
+        self.max_idade_min = max_idade_min
+        self._ociosos = []
+        self._em_uso = 0
+        self._criado_em = {}
+        self._numeros = {}
+        self._abertos = 0
+        self._lock = threading.Lock()
+
+    def _abrir(self):
+        """Abre um navegador novo e registra o horário de criação."""
+        inicio = time.time()
+        driver = self.fabrica()
+        self._criado_em[id(driver)] = time.time()
+        self._abertos += 1
+        self._numeros[id(driver)] = str(self._abertos)
+        logger.info(f'[POOL] Navegador aberto em {time.time() - inicio:.1f}s')
+        return driver
+
+    def _descartar(self, driver, motivo):
+        """Encerra um navegador que não pode mais ser reaproveitado."""
+        logger.info(f'[POOL] Reciclando navegador: {motivo}')
+        self._criado_em.pop(id(driver), None)
+        numero = self._numeros.pop(id(driver), None)
+        if numero is not None:
+            metrics.remover('etl_pool_rss_bytes', navegador=numero)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _motivo_para_reciclar(self, driver):
+        """
+        Verifica saúde, memória e idade de um navegador.
+
+        Args:
+            driver: Instância do WebDriver do Selenium.
+
+        Returns:
+            Texto com o motivo da reciclagem, ou None se estiver saudável.
+        """
+        try:
+            driver.execute_script('return document.readyState')
+        except Exception as e:
+            return f'health check falhou ({e.__class__.__name__})'
+
+        idade_min = (time.time() - self._criado_em.get(id(driver), 0)) / 60
+        if idade_min > self.max_idade_min:
+            return f'idade {idade_min:.0f}min > {self.max_idade_min:.0f}min'
+
+        rss = rss_navegador_mb(driver)
+        if rss is not None and id(driver) in self._numeros:
+            metrics.definir(
+                'etl_pool_rss_bytes',
+                rss * 1024 * 1024,
+                navegador=self._numeros[id(driver)],
+            )
+        if rss is not None and rss > self.max_rss_mb:
+            return f'RSS {rss:.0f}MB > {self.max_rss_mb:.0f}MB'
+        return None
+
+    def adquirir(self):
+        """
+        Retorna um navegador saudável, reaproveitando um ocioso se houver.
+
+        Returns:
+            WebDriver apontando para a URL inicial do SIGOS.
+        """
+        with self._lock:
+            self._em_uso += 1
+            while self._ociosos:
+                driver = self._ociosos.pop()
+                motivo = self._motivo_para_reciclar(driver)
+                if motivo is None:
+                    logger.info('[POOL] Reaproveitando navegador aquecido')
+                    return driver
+                self._descartar(driver, motivo)
+        try:
+            return self._abrir()
+        except Exception:
+            with self._lock:
+                self._em_uso -= 1
+            raise
+
+    def liberar(self, driver):
+        """
+        Devolve o navegador ao pool, já deslogado e na tela de login.
+
+        Args:
+            driver: Instância do WebDriver obtida com ``adquirir``.
+        """
+        try:
+            driver.delete_all_cookies()
+            driver.get(self.url_inicial)
+        except Exception as e:
+            with self._lock:
+                self._em_uso -= 1
+                self._descartar(driver, f'falha ao resetar sessão ({e})')
+            return
+
+        with self._lock:
+            self._em_uso -= 1
+            motivo = self._motivo_para_reciclar(driver)
+            if motivo is not None:
+                self._descartar(driver, motivo)
+            elif len(self._ociosos) >= self.tamanho:
+                self._descartar(driver, 'pool cheio')
+            else:
+                self._ociosos.append(driver)
+
+    def aquecer(self):
+        """
+        Recicla ociosos fora dos limites e completa o pool até o tamanho.
+
+        Navegadores em uso contam para o tamanho, então o aquecimento não
+        abre um Chromium extra enquanto um ciclo está rodando.
+        """
+        with self._lock:
+            saudaveis = []
+            for driver in self._ociosos:
+                motivo = self._motivo_para_reciclar(driver)
+                if motivo is None:
+                    saudaveis.append(driver)
+                else:
+                    self._descartar(driver, motivo)
+            self._ociosos = saudaveis
+
+            while len(self._ociosos) + self._em_uso < self.tamanho:
+                try:
+                    self._ociosos.append(self._abrir())
+                except Exception as e:
+                    logger.warning(f'[POOL] Falha ao aquecer navegador: {e}')
+                    break
+
+    def encerrar(self):
+        """Fecha todos os navegadores ociosos."""
+        with self._lock:
+            for driver in self._ociosos:
+                self._descartar(driver, 'encerrando pool')
+            self._ociosos = []
@@ -0,0 +1,67 @@
+"""Módulo com o relatório de tempos da extração."""
+
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Sono fixo que existia por janela antes das esperas por condição:
+# time.sleep(2) após o download + 3 pausas de 0.5s em cada campo de data
+SONO_FIXO_ANTIGO_POR_JANELA = 2.0 + 2 * 3 * 0.5
+
+
+class RelatorioTempos:
+    """Acumula o tempo gasto em cada etapa da extração de um relatório."""
+
+    def __init__(self, report):
+        """
+        Cria um relatório vazio.
+
+        Args:
+            report: Nome do relatório ('general' ou 'return').
+        """
+        self.report = report
+        self.janelas = 0
+        self.etapas = {}
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nome):
+        """
+        Mede o tempo de um bloco e soma na etapa informada.
+
+        Args:
+            nome: Nome da etapa (ex.: 'login', 'formulario', 'download').
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + (
+                time.perf_counter() - inicio
+            )
+
+    def resumo(self):
+        """
+        Monta o resumo da extração e registra no log.
+
+        Returns:
+            Dicionário com janelas, tempo total, tempo por etapa e o sono
+            fixo que deixou de ser gasto.
+        """
+        total = time.perf_counter() - self._inicio
+        sono_removido = self.janelas * SONO_FIXO_ANTIGO_POR_JANELA
+        etapas = ', '.join(f'{k}={v:.1f}s' for k, v in self.etapas.items())
+        logger.info(
+            f'[TEMPOS] {self.report}: {self.janelas} janela(s) em {total:.1f}s '
+            f'({etapas}). Sono fixo removido: {self.janelas} x '
+            f'{SONO_FIXO_ANTIGO_POR_JANELA:.1f}s = {sono_removido:.1f}s'
+        )
+        return {
+            'report': self.report,
+            'janelas': self.janelas,
+            'total_s': round(total, 3),
+            'etapas_s': {k: round(v, 3) for k, v in self.etapas.items()},
+            'sono_removido_s': sono_removido,
+        }
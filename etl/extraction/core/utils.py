@@ -5,7 +5,23 @@ import time
 from datetime import datetime, timedelta
 
 
-def esperar_download_concluir(pasta, timeout=120):
+def listar_pasta(pasta):
+    """
+    Retorna o conjunto de arquivos da pasta, criando a pasta se preciso.
+
+    Args:
+        pasta: Caminho da pasta de downloads.
+
+    Returns:
+        Conjunto com os nomes dos arquivos.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    return set(os.listdir(pasta))
+
+
+def esperar_download_concluir(
+    pasta, timeout=120, arquivos_iniciais=None, intervalo=0.2
+):
     """
     Aguarda a conclusão de downloads na pasta especificada.
 
@@ -15,15 +31,22 @@ def esperar_download_concluir(pasta, timeout=120):
     Args:
         pasta: Caminho da pasta onde os downloads são salvos.
         timeout: Tempo máximo de espera em segundos (padrão: 120).
+        arquivos_iniciais: Conteúdo da pasta antes de clicar em exportar.
+            Se omitido, usa o conteúdo atual (downloads muito rápidos
+            podem terminar antes e não serem detectados).
+        intervalo: Intervalo entre as checagens da pasta em segundos.
+
+    Returns:
+        Lista com os caminhos completos dos CSVs baixados.
 
     Raises:
         TimeoutError: Se o download não for concluído dentro do timeout.
     """
-    # Garante que a pasta existe (cria se não existir)
-    os.makedirs(pasta, exist_ok=True)
+    # Sem retrato prévio, usa o conteúdo atual (e garante que a pasta existe)
+    if arquivos_iniciais is None:
+        arquivos_iniciais = listar_pasta(pasta)
 
     inicio = time.time()
-    arquivos_iniciais = set(os.listdir(pasta))
 
     while True:
         arquivos_temporarios = [
@@ -40,11 +63,28 @@ def esperar_download_concluir(pasta, timeout=120):
 
         if not arquivos_temporarios and arquivos_csv_baixados:
             print(f'Download(s) concluído(s): {arquivos_csv_baixados}')
-            break
+            return [os.path.join(pasta, f) for f in arquivos_csv_baixados]
 
         if time.time() - inicio > timeout:
             raise TimeoutError('Download demorou demais e não foi concluído.')
-        time.sleep(1)
+        time.sleep(intervalo)
+
+
+def contar_linhas_csv(caminho):
+    """
+    Conta as linhas de dados de um CSV sem fazer o parse do arquivo.
+
+    Args:
+        caminho: Caminho do arquivo CSV.
+
+    Returns:
+        Quantidade de linhas descontando o cabeçalho.
+    """
+    linhas = 0
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            linhas += bloco.count(b'\n')
+    return max(linhas - 1, 0)
 
 
 def gerar_intervalos(data_inicio_str, data_fim_str, dias_por_intervalo=30):
@@ -72,4 +112,27 @@ def gerar_intervalos(data_inicio_str, data_fim_str, dias_por_intervalo=30):
             data_inicio.strftime('%d/%m/%Y'),
             data_final_intervalo.strftime('%d/%m/%Y'),
         )
-        data_inicio = data_final_intervalo
\ No newline at end of file
+        data_inicio = data_final_intervalo
+
+
+def janelas_do_shard(intervalos, indice, total):
+    """
+    Seleciona as janelas de um shard do FULL dividido entre containers.
+
+    A distribuição é em rodízio pela posição da janela, então todos os
+    shards chegam à mesma divisão sem conversar entre si, e os meses mais
+    recentes (os mais cheios) ficam espalhados entre eles.
+
+    Args:
+        intervalos: Lista de janelas (data_inicio, data_fim) do relatório.
+        indice: Número do shard, de 1 a ``total``.
+        total: Quantidade de shards.
+
+    Returns:
+        Lista com as janelas do shard, na ordem original.
+    """
+    return [
+        janela
+        for posicao, janela in enumerate(intervalos)
+        if posicao % total == indice - 1
+    ]
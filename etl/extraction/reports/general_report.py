@@ -4,32 +4,34 @@ import os
 import time
 from datetime import date, datetime, timedelta
 
-from extraction.core.browser import esperar_elemento, logar_sigos
-from extraction.core.utils import esperar_download_concluir, gerar_intervalos
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
+from extraction.core import checkpoint
+from extraction.core.browser import (
+    esperar_elemento,
+    fechar_navegador,
+    logar_sigos,
+    preencher_data,
+)
+from extraction.core.planner import planejar_intervalos, registrar_janela
+from extraction.core.timing import RelatorioTempos
+from extraction.core.utils import (
+    contar_linhas_csv,
+    esperar_download_concluir,
+    gerar_intervalos,
+    janelas_do_shard,
+    listar_pasta,
+)
 from selenium.webdriver.support.ui import Select
 
 DOWNLOAD_DIR = os.path.join(os.getcwd(), 'etl', 'downloads')
 
+INTERVALOS_ADAPTATIVOS = (
+    os.getenv('INTERVALOS_ADAPTATIVOS', 'true').lower() == 'true'
+)
+DIAS_POR_INTERVALO = 30
+# Janela padrão do incremental (dias para trás a partir de hoje)
+DIAS_INCREMENTAL = 60
 
-def digitar_data_por_etapas(actions, data_str):
-    """
-    Digita uma data em etapas (dia, mês, ano) com pausas.
-
-    Args:
-        actions: Instância de ActionChains do Selenium.
-        data_str: Data no formato 'dd/mm/yyyy'.
-
-    Returns:
-        ActionChains atualizado com as ações de digitação.
-    """
-    dia, mes, ano = data_str.split('/')
-    # digita devagar com pausa entre cada parte
-    actions.send_keys(mes).pause(0.5)
-    actions.send_keys(dia).pause(0.5)
-    actions.send_keys(ano).pause(0.5)
-    return actions
+XPATH_BOTAO_EXPORTAR = '//*[@id="btn-salvar-form"]'
 
 
 def exportar_geral(driver, data_inicio, data_final, primeira_vez=False):
@@ -42,8 +44,6 @@ def exportar_geral(driver, data_inicio, data_final, primeira_vez=False):
         data_final: Data final no formato 'dd/mm/yyyy'.
         primeira_vez: Se True, navega até o menu de relatórios.
     """
-    actions = ActionChains(driver)
-
     if primeira_vez:
         # Abre o menu de relatórios
         botao_relatorios = esperar_elemento(
@@ -74,67 +74,44 @@ def exportar_geral(driver, data_inicio, data_final, primeira_vez=False):
         select = Select(tipo_periodo_elem)
         select.select_by_value('data_execucao')
 
-        # Preenche as datas
-        # Data inicial
-        data_inicio_elem = esperar_elemento(
-            driver, '//*[@id="data_inicio"]', tipo='clicavel'
-        )
-        data_inicio_elem.clear()
-        data_inicio_elem.click()
-        actions = digitar_data_por_etapas(actions, data_inicio)
-        actions.perform()
-        # Data final
-        data_final_elem = esperar_elemento(
-            driver, '//*[@id="data_fim"]', tipo='clicavel'
-        )
-        data_final_elem.clear()
-        data_final_elem.click()
-        actions = digitar_data_por_etapas(actions, data_final)
-        actions.perform()
-        # Clica no botão de exportar
-        botao_exportar_elem = esperar_elemento(
-            driver, '//*[@id="btn-salvar-form"]', tipo='clicavel'
-        )
-        botao_exportar_elem.click()
+    # Preenche as datas
+    preencher_data(driver, '//*[@id="data_inicio"]', data_inicio)
+    preencher_data(driver, '//*[@id="data_fim"]', data_final)
 
-    else:
-        # Preenche as datas
-        # Data inicial
-        data_inicio_elem = esperar_elemento(
-            driver, '//*[@id="data_inicio"]', tipo='clicavel'
-        )
-        data_inicio_elem.clear()
-        data_inicio_elem.click()
-        actions = digitar_data_por_etapas(actions, data_inicio)
-        actions.perform()
-        # Data final
-        data_final_elem = esperar_elemento(
-            driver, '//*[@id="data_fim"]', tipo='clicavel'
-        )
-        data_final_elem.clear()
-        data_final_elem.click()
-        actions = digitar_data_por_etapas(actions, data_final)
-        actions.perform()
-        # Clica no botão de exportar
-        botao_exportar_elem = esperar_elemento(
-            driver, '//*[@id="btn-salvar-form"]', tipo='clicavel'
-        )
-        botao_exportar_elem.click()
+    # Clica no botão de exportar
+    botao_exportar_elem = esperar_elemento(
+        driver, XPATH_BOTAO_EXPORTAR, tipo='clicavel'
+    )
+    botao_exportar_elem.click()
 
     print(f'Exportando relatório: {data_inicio} até {data_final}')
 
 
-def download_general_report(mode='full'):
+def download_general_report(
+    mode='full', pasta_download=None, ao_concluir=None, dias=None, shard=None
+):
     """
     Realiza o download do relatório geral do SIGOS.
 
     Args:
         mode: Modo de execução ('full' ou 'incremental').
+        pasta_download: Pasta onde os CSVs são salvos (padrão: DOWNLOAD_DIR).
+        ao_concluir: Callback opcional chamado com (arquivo, data_inicio,
+            data_final) para cada CSV pronto, inclusive os reaproveitados do
+            checkpoint, permitindo processar enquanto o resto baixa.
+        dias: Tamanho da janela do incremental, em dias para trás a partir
+            de hoje (padrão: DIAS_INCREMENTAL). Ignorado no modo FULL.
+        shard: Tupla (i, N) do FULL dividido entre containers: baixa só as
+            janelas fixas do shard i de N, sem checkpoint.
+
+    Returns:
+        Resumo de tempos da extração (ver RelatorioTempos.resumo), com a
+        janela coberta em 'janela' (data_inicio, data_fim) e as janelas
+        exportadas em 'janelas'.
 
     Raises:
         ValueError: Se o modo informado for inválido.
     """
-    driver = logar_sigos()
     hoje = date.today()
 
     if mode == 'full':
@@ -142,26 +119,101 @@ def download_general_report(mode='full'):
         data_fim_coleta = datetime.combine(hoje, datetime.min.time())
     elif mode == 'incremental':
         data_inicio_coleta = datetime.combine(
-            hoje - timedelta(days=60), datetime.min.time()
+            hoje - timedelta(days=dias or DIAS_INCREMENTAL),
+            datetime.min.time(),
         )
         data_fim_coleta = datetime.combine(hoje, datetime.min.time())
     else:
         raise ValueError(
             "Modo de execução inválido. Use 'full' ou 'incremental'."
         )
-
-    for i, (data_inicio, data_final) in enumerate(
-        gerar_intervalos(
+    janela = (
+        data_inicio_coleta.strftime('%d/%m/%Y'),
+        data_fim_coleta.strftime('%d/%m/%Y'),
+    )
+
+    if mode == 'full' and shard is None:
+        # Retoma um FULL interrompido a partir da primeira janela pendente
+        data_retomada, reaproveitadas = checkpoint.retomar_de(
+            'general',
+            data_inicio_coleta.strftime('%d/%m/%Y'),
+            pasta=pasta_download or DOWNLOAD_DIR,
+        )
+        if reaproveitadas:
+            print(
+                f'Retomando FULL a partir de {data_retomada} '
+                f'({len(reaproveitadas)} janela(s) já baixada(s))'
+            )
+            data_inicio_coleta = datetime.strptime(data_retomada, '%d/%m/%Y')
+            if ao_concluir is not None:
+                for entrada in reaproveitadas:
+                    ao_concluir(
+                        entrada['arquivo'], entrada['inicio'], entrada['fim']
+                    )
+
+    # Os shards precisam chegar à mesma lista de janelas, então usam as
+    # janelas fixas em vez das estatísticas locais de cada container
+    if INTERVALOS_ADAPTATIVOS and shard is None:
+        intervalos = planejar_intervalos(
+            'general',
             data_inicio_coleta.strftime('%d/%m/%Y'),
             data_fim_coleta.strftime('%d/%m/%Y'),
+            dias_padrao=DIAS_POR_INTERVALO,
+        )
+    else:
+        intervalos = list(
+            gerar_intervalos(
+                data_inicio_coleta.strftime('%d/%m/%Y'),
+                data_fim_coleta.strftime('%d/%m/%Y'),
+                dias_por_intervalo=DIAS_POR_INTERVALO,
+            )
         )
-    ):
-        primeira_vez = i == 0
-        exportar_geral(
-            driver, data_inicio, data_final, primeira_vez=primeira_vez
+    if shard is not None:
+        intervalos = janelas_do_shard(intervalos, *shard)
+        print(
+            f'Shard {shard[0]}/{shard[1]}: {len(intervalos)} janela(s) do '
+            'relatório geral'
         )
-        esperar_download_concluir(pasta=DOWNLOAD_DIR)
-        print(f'Download concluído: {data_inicio} a {data_final}')
-        time.sleep(2)
 
-    driver.quit()
+    pasta_download = pasta_download or DOWNLOAD_DIR
+    tempos = RelatorioTempos('general')
+    if not intervalos:
+        print('Nenhuma janela pendente para o relatório geral')
+        return {**tempos.resumo(), 'janela': janela, 'janelas': intervalos}
+
+    with tempos.etapa('login'):
+        driver = logar_sigos(pasta_download=pasta_download)
+    try:
+        for i, (data_inicio, data_final) in enumerate(intervalos):
+            primeira_vez = i == 0
+            inicio_export = time.time()
+            antes = listar_pasta(pasta_download)
+            with tempos.etapa('formulario'):
+                exportar_geral(
+                    driver, data_inicio, data_final, primeira_vez=primeira_vez
+                )
+            with tempos.etapa('download'):
+                arquivos = esperar_download_concluir(
+                    pasta=pasta_download, arquivos_iniciais=antes
+                )
+            registrar_janela(
+                'general',
+                data_inicio,
+                data_final,
+                linhas=sum(contar_linhas_csv(a) for a in arquivos),
+                segundos=time.time() - inicio_export,
+            )
+            if mode == 'full' and shard is None:
+                for arquivo in arquivos:
+                    checkpoint.registrar_concluido(
+                        'general', data_inicio, data_final, arquivo
+                    )
+            if ao_concluir is not None:
+                for arquivo in arquivos:
+                    ao_concluir(arquivo, data_inicio, data_final)
+            print(f'Download concluído: {data_inicio} a {data_final}')
+            tempos.janelas += 1
+    finally:
+        fechar_navegador(driver)
+
+    return {**tempos.resumo(), 'janela': janela, 'janelas': intervalos}
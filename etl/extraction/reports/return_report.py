@@ -4,34 +4,34 @@ import os
 import time
 from datetime import date, datetime, timedelta
 
-from extraction.core.browser import esperar_elemento, logar_sigos
-from extraction.core.utils import esperar_download_concluir
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
+from extraction.core import checkpoint
+from extraction.core.browser import (
+    esperar_elemento,
+    fechar_navegador,
+    logar_sigos,
+    preencher_data,
+)
+from extraction.core.planner import planejar_intervalos, registrar_janela
+from extraction.core.timing import RelatorioTempos
+from extraction.core.utils import (
+    contar_linhas_csv,
+    esperar_download_concluir,
+    janelas_do_shard,
+    listar_pasta,
+)
 from selenium.webdriver.support.ui import Select
 
 DOWNLOAD_DIR = os.path.join(os.getcwd(), 'etl', 'downloads')
 
+INTERVALOS_ADAPTATIVOS = (
+    os.getenv('INTERVALOS_ADAPTATIVOS', 'true').lower() == 'true'
+)
+DIAS_POR_INTERVALO = 180
+DIAS_MAX_POR_INTERVALO = 365
+# Janela padrão do incremental (dias para trás a partir de hoje)
+DIAS_INCREMENTAL = 180
 
-def digitar_data_por_etapas(actions, data_str):
-    """
-    Digita uma data em etapas (mês, dia, ano) para compatibilidade com
-    locale en-US (Docker/Linux).
-
-    Args:
-        actions: Instância de ActionChains do Selenium.
-        data_str: Data no formato 'dd/mm/yyyy'.
-
-    Returns:
-        ActionChains atualizado com as ações de digitação.
-    """
-    dia, mes, ano = data_str.split('/')
-
-    actions.send_keys(mes).pause(0.5)
-    actions.send_keys(dia).pause(0.5)
-    actions.send_keys(ano).pause(0.5)
-
-    return actions
+XPATH_BOTAO_EXPORTAR = '//*[@id="btn-salvar-form"]'
 
 
 def exportar_retorno(driver, data_inicio, data_final, primeira_vez=False):
@@ -44,8 +44,6 @@ def exportar_retorno(driver, data_inicio, data_final, primeira_vez=False):
         data_final: Data final no formato 'dd/mm/yyyy'.
         primeira_vez: Se True, navega até o menu de relatórios.
     """
-    actions = ActionChains(driver)
-
     if primeira_vez:
         # Abre o menu de relatórios
         botao_relatorios = esperar_elemento(
@@ -83,120 +81,179 @@ def exportar_retorno(driver, data_inicio, data_final, primeira_vez=False):
         select = Select(tipo_periodo_elem)
         select.select_by_value('data_execucao')
 
-        # Preenche as datas
-        # Data inicial
-        data_inicio_elem = esperar_elemento(
-            driver, '//*[@id="data_inicio"]', tipo='clicavel'
-        )
-        data_inicio_elem.clear()
-        data_inicio_elem.click()
-        actions = digitar_data_por_etapas(actions, data_inicio)
-        actions.perform()
-        # Data final
-        data_final_elem = esperar_elemento(
-            driver, '//*[@id="data_fim"]', tipo='clicavel'
-        )
-        data_final_elem.clear()
-        data_final_elem.click()
-        actions = digitar_data_por_etapas(actions, data_final)
-        actions.perform()
-        # Clica no botão de exportar
-        botao_exportar_elem = esperar_elemento(
-            driver, '//*[@id="btn-salvar-form"]', tipo='clicavel'
-        )
-        botao_exportar_elem.click()
+    # Preenche as datas
+    preencher_data(driver, '//*[@id="data_inicio"]', data_inicio)
+    preencher_data(driver, '//*[@id="data_fim"]', data_final)
 
-    else:
-        # Data inicial
-        data_inicio_elem = esperar_elemento(
-            driver, '//*[@id="data_inicio"]', tipo='clicavel'
-        )
-        data_inicio_elem.clear()
-        data_inicio_elem.click()
-        actions = digitar_data_por_etapas(actions, data_inicio)
-        actions.perform()
-        # Data final
-        data_final_elem = esperar_elemento(
-            driver, '//*[@id="data_fim"]', tipo='clicavel'
+    # Clica no botão de exportar
+    botao_exportar_elem = esperar_elemento(
+        driver, XPATH_BOTAO_EXPORTAR, tipo='clicavel'
+    )
+    botao_exportar_elem.click()
+
+    print(f'Exportando relatório de retorno: {data_inicio} até {data_final}')
+
+
+def _intervalos_fixos(data_inicio_coleta, data_fim_ajustada):
+    """
+    Monta janelas fixas de 180 dias, de trás para frente a partir do fim.
+
+    Args:
+        data_inicio_coleta: Datetime inicial da coleta.
+        data_fim_ajustada: Date final da coleta (já com o ajuste de hoje + 1).
+
+    Returns:
+        Lista de tuplas (data_inicio, data_fim) no formato 'dd/mm/yyyy'.
+    """
+    intervalos = []
+    current_end_date = datetime.combine(data_fim_ajustada, datetime.min.time())
+
+    while current_end_date.date() > data_inicio_coleta.date():
+        current_start_date = current_end_date - timedelta(
+            days=DIAS_POR_INTERVALO
         )
-        data_final_elem.clear()
-        data_final_elem.click()
-        actions = digitar_data_por_etapas(actions, data_final)
-        actions.perform()
-        # Clica no botão de exportar
-        botao_exportar_elem = esperar_elemento(
-            driver, '//*[@id="btn-salvar-form"]', tipo='clicavel'
+        if current_start_date.date() < data_inicio_coleta.date():
+            current_start_date = data_inicio_coleta
+
+        intervalos.insert(
+            0,
+            (
+                current_start_date.strftime('%d/%m/%Y'),
+                current_end_date.strftime('%d/%m/%Y'),
+            ),
         )
-        botao_exportar_elem.click()
+        current_end_date = current_start_date
 
-    print(f'Exportando relatório de retorno: {data_inicio} até {data_final}')
+    return intervalos
 
 
-def download_return_report(mode='full'):
+def download_return_report(
+    mode='full', pasta_download=None, ao_concluir=None, dias=None, shard=None
+):
     """
     Realiza o download do relatório de retorno do SIGOS.
 
     Args:
         mode: Modo de execução ('full' ou 'incremental').
+        pasta_download: Pasta onde os CSVs são salvos (padrão: DOWNLOAD_DIR).
+        ao_concluir: Callback opcional chamado com (arquivo, data_inicio,
+            data_final) para cada CSV pronto, inclusive os reaproveitados do
+            checkpoint, permitindo processar enquanto o resto baixa.
+        dias: Tamanho da janela do incremental, em dias para trás a partir
+            da data final ajustada, hoje + 1 (padrão: DIAS_INCREMENTAL).
+            Ignorado no modo FULL.
+        shard: Tupla (i, N) do FULL dividido entre containers: baixa só as
+            janelas fixas do shard i de N, sem checkpoint.
+
+    Returns:
+        Resumo de tempos da extração (ver RelatorioTempos.resumo), com a
+        janela coberta em 'janela' (data_inicio, data_fim) e as janelas
+        exportadas em 'janelas'.
 
     Raises:
         ValueError: Se o modo informado for inválido.
     """
-    driver = logar_sigos()
-
     hoje = date.today()
     # Correção para o bug do site: data final deve ser hoje + 1
     data_fim_ajustada = hoje + timedelta(days=1)
 
     if mode == 'full':
         data_inicio_coleta = datetime.strptime('01/03/2022', '%d/%m/%Y')
-        dias_por_intervalo = 180
-
-        intervalos = []
-        current_end_date = datetime.combine(
-            data_fim_ajustada, datetime.min.time()
-        )
-
-        while current_end_date.date() > data_inicio_coleta.date():
-            current_start_date = current_end_date - timedelta(
-                days=dias_por_intervalo
-            )
-            if current_start_date.date() < data_inicio_coleta.date():
-                current_start_date = data_inicio_coleta
-
-            intervalos.insert(
-                0,
-                (
-                    current_start_date.strftime('%d/%m/%Y'),
-                    current_end_date.strftime('%d/%m/%Y'),
-                ),
-            )
-            current_end_date = current_start_date
-
     elif mode == 'incremental':
-        # No modo incremental, baixar apenas os últimos 180 dias
-        data_inicio_incremental = datetime.combine(
-            data_fim_ajustada - timedelta(days=180), datetime.min.time()
+        # No modo incremental, baixar apenas os últimos dias da janela,
+        # contados da data final ajustada (hoje + 1), como sempre foi
+        data_inicio_coleta = datetime.combine(
+            data_fim_ajustada - timedelta(days=dias or DIAS_INCREMENTAL),
+            datetime.min.time(),
         )
-        intervalos = [
-            (
-                data_inicio_incremental.strftime('%d/%m/%Y'),
-                data_fim_ajustada.strftime('%d/%m/%Y'),
-            )
-        ]
-
     else:
         raise ValueError(
             "Modo de execução inválido. Use 'full' ou 'incremental'."
         )
-
-    for i, (data_inicio, data_final) in enumerate(intervalos):
-        primeira_vez = i == 0
-        exportar_retorno(
-            driver, data_inicio, data_final, primeira_vez=primeira_vez
+    janela = (
+        data_inicio_coleta.strftime('%d/%m/%Y'),
+        data_fim_ajustada.strftime('%d/%m/%Y'),
+    )
+
+    if mode == 'full' and shard is None:
+        # Retoma um FULL interrompido a partir da primeira janela pendente
+        data_retomada, reaproveitadas = checkpoint.retomar_de(
+            'return',
+            data_inicio_coleta.strftime('%d/%m/%Y'),
+            pasta=pasta_download or DOWNLOAD_DIR,
+        )
+        if reaproveitadas:
+            print(
+                f'Retomando FULL de retorno a partir de {data_retomada} '
+                f'({len(reaproveitadas)} janela(s) já baixada(s))'
+            )
+            data_inicio_coleta = datetime.strptime(data_retomada, '%d/%m/%Y')
+            if ao_concluir is not None:
+                for entrada in reaproveitadas:
+                    ao_concluir(
+                        entrada['arquivo'], entrada['inicio'], entrada['fim']
+                    )
+
+    # Os shards precisam chegar à mesma lista de janelas, então usam as
+    # janelas fixas em vez das estatísticas locais de cada container
+    if INTERVALOS_ADAPTATIVOS and shard is None:
+        intervalos = planejar_intervalos(
+            'return',
+            data_inicio_coleta.strftime('%d/%m/%Y'),
+            data_fim_ajustada.strftime('%d/%m/%Y'),
+            dias_padrao=DIAS_POR_INTERVALO,
+            dias_max=DIAS_MAX_POR_INTERVALO,
+        )
+    else:
+        intervalos = _intervalos_fixos(data_inicio_coleta, data_fim_ajustada)
+    if shard is not None:
+        intervalos = janelas_do_shard(intervalos, *shard)
+        print(
+            f'Shard {shard[0]}/{shard[1]}: {len(intervalos)} janela(s) do '
+            'relatório de retorno'
         )
-        esperar_download_concluir(pasta=DOWNLOAD_DIR)
-        print(f'Download de retorno concluído: {data_inicio} a {data_final}')
-        time.sleep(2)
 
-    driver.quit()
+    pasta_download = pasta_download or DOWNLOAD_DIR
+    tempos = RelatorioTempos('return')
+    if not intervalos:
+        print('Nenhuma janela pendente para o relatório de retorno')
+        return {**tempos.resumo(), 'janela': janela, 'janelas': intervalos}
+
+    with tempos.etapa('login'):
+        driver = logar_sigos(pasta_download=pasta_download)
+    try:
+        for i, (data_inicio, data_final) in enumerate(intervalos):
+            primeira_vez = i == 0
+            inicio_export = time.time()
+            antes = listar_pasta(pasta_download)
+            with tempos.etapa('formulario'):
+                exportar_retorno(
+                    driver, data_inicio, data_final, primeira_vez=primeira_vez
+                )
+            with tempos.etapa('download'):
+                arquivos = esperar_download_concluir(
+                    pasta=pasta_download, arquivos_iniciais=antes
+                )
+            registrar_janela(
+                'return',
+                data_inicio,
+                data_final,
+                linhas=sum(contar_linhas_csv(a) for a in arquivos),
+                segundos=time.time() - inicio_export,
+            )
+            if mode == 'full' and shard is None:
+                for arquivo in arquivos:
+                    checkpoint.registrar_concluido(
+                        'return', data_inicio, data_final, arquivo
+                    )
+            if ao_concluir is not None:
+                for arquivo in arquivos:
+                    ao_concluir(arquivo, data_inicio, data_final)
+            print(
+                f'Download de retorno concluído: {data_inicio} a {data_final}'
+            )
+            tempos.janelas += 1
+    finally:
+        fechar_navegador(driver)
+
+    return {**tempos.resumo(), 'janela': janela, 'janelas': intervalos}
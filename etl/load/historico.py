@@ -0,0 +1,246 @@
+"""Módulo com o histórico de versões (SCD2) das tabelas de relatório.
+
+As cargas apagam e reinserem as linhas, então a tabela de relatório só
+guarda a foto mais recente. O histórico (``<tabela>_history``) guarda cada
+versão de uma linha com ``VALIDO_DE``/``VALIDO_ATE``: quando um serviço
+muda de PENDENTE para BAIXADO, a versão antiga é fechada e a nova é aberta.
+
+O delta é calculado por hash. Cada linha vira dois inteiros de 64 bits (o
+hash da chave de negócio e o hash do conteúdo) com operações vetorizadas,
+e eles são comparados com as versões abertas do histórico. Só as linhas
+novas ou alteradas são gravadas, e o que sumiu da janela recarregada é
+fechado.
+
+A carga pode chegar em partes (ex.: a publicação dos shards lê a tabela
+em chunks): só os hashes de todas as linhas ficam em memória, junto com as
+linhas que não batem com uma versão aberta.
+"""
+
+import logging
+from datetime import datetime
+
+import esquemas
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.types import BigInteger, DateTime
+
+logger = logging.getLogger(__name__)
+
+# Tabela -> chave de negócio (a mesma da deduplicação do transformer)
+HISTORICO = {
+    esquema['tabela']: list(esquema['chave'])
+    for esquema in esquemas.ESQUEMAS.values()
+}
+# Mudam a cada execução sem que o serviço tenha mudado
+IGNORADAS = ['DATA_EXTRACAO']
+
+
+def tabela_historico(tabela):
+    """Retorna o nome da tabela de histórico."""
+    return f'{tabela}_history'
+
+
+def hash_linhas(df, colunas):
+    """
+    Calcula um hash de 64 bits por linha sobre as colunas informadas.
+
+    Cada coluna entra com peso próprio (derivado do nome) e valores nulos
+    não contam. Assim o hash não depende da ordem das colunas e uma coluna
+    ausente vale o mesmo que uma coluna toda nula, tanto para o DataFrame
+    saído do transformer quanto para as linhas lidas do banco.
+
+    Args:
+        df: DataFrame de origem.
+        colunas: Colunas que entram no hash (as ausentes são ignoradas).
+
+    Returns:
+        Array int64 com um hash por linha.
+    """
+    total = np.zeros(len(df), dtype='uint64')
+    for coluna in colunas:
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        hashes = pd.util.hash_array(serie.astype(str).to_numpy(dtype=object))
+        hashes[serie.isna().to_numpy()] = 0
+        peso = pd.util.hash_array(np.array([coluna], dtype=object))[0] | 1
+        total += hashes * peso
+    return total.view('int64')
+
+
+def _versoes_abertas(conn, historico, desde):
+    """Lê (chave, hash da linha, sem data) das versões abertas no escopo."""
+    filtro = ''
+    params = {}
+    if desde is not None:
+        filtro = 'AND ("DATA_EXECUCAO" >= :desde OR "DATA_EXECUCAO" IS NULL)'
+        params['desde'] = desde
+    linhas = conn.execute(
+        text(
+            f'SELECT "CHAVE_HASH", "LINHA_HASH", "DATA_EXECUCAO" IS NULL '
+            f'FROM "{historico}" WHERE "VALIDO_ATE" IS NULL {filtro}'
+        ),
+        params,
+    ).all()
+    return pd.DataFrame(linhas, columns=['chave', 'linha', 'sem_data'])
+
+
+def calcular_delta(entrada, abertas, desde=None):
+    """
+    Compara a carga com as versões abertas do histórico.
+
+    Args:
+        entrada: DataFrame da carga com 'CHAVE_HASH' e 'LINHA_HASH'.
+        abertas: Versões abertas no escopo, com 'chave', 'linha' e
+            'sem_data' (ver ``_versoes_abertas``).
+        desde: Primeira ``DATA_EXECUCAO`` recarregada (None no FULL). Só
+            no incremental as versões sem data ficam abertas quando somem
+            da carga; o TRUNCATE do FULL apaga essas linhas também.
+
+    Returns:
+        Tupla (linhas de ``entrada`` a gravar, chaves a fechar, contagens
+        'novas', 'alteradas' e 'removidas').
+    """
+    entrada = entrada.drop_duplicates('CHAVE_HASH', keep='last')
+
+    # Mesmo par (chave, conteúdo) já aberto: nada mudou
+    pares_abertos = pd.MultiIndex.from_arrays(
+        [abertas['chave'], abertas['linha']]
+    )
+    inalteradas = pd.MultiIndex.from_arrays(
+        [entrada['CHAVE_HASH'], entrada['LINHA_HASH']]
+    ).isin(pares_abertos)
+    gravar = entrada[~inalteradas]
+
+    alteradas = abertas['chave'].isin(gravar['CHAVE_HASH'])
+    removidas = ~abertas['chave'].isin(entrada['CHAVE_HASH'])
+    if desde is not None:
+        removidas &= ~abertas['sem_data'].astype(bool)
+    fechar = abertas.loc[alteradas | removidas, 'chave']
+    contagens = {
+        'novas': int(len(gravar) - alteradas.sum()),
+        'alteradas': int(alteradas.sum()),
+        'removidas': int(removidas.sum()),
+    }
+    return gravar, fechar, contagens
+
+
+def calcular_delta_em_partes(partes, chave, abertas, desde=None):
+    """
+    Calcula o delta de uma carga lida em partes.
+
+    Guarda só os hashes de cada parte e as linhas cujo par (chave,
+    conteúdo) não está aberto, as únicas que podem ser gravadas. O
+    resultado é o mesmo de ``calcular_delta`` sobre a carga inteira.
+
+    Args:
+        partes: Iterável de DataFrames da carga, na ordem de leitura.
+        chave: Colunas da chave de negócio.
+        abertas: Versões abertas no escopo (ver ``_versoes_abertas``).
+        desde: Primeira ``DATA_EXECUCAO`` recarregada (None no FULL).
+
+    Returns:
+        O mesmo que ``calcular_delta``.
+    """
+    pares_abertos = pd.MultiIndex.from_arrays(
+        [abertas['chave'], abertas['linha']]
+    )
+    hashes = []
+    candidatas = []
+    inicio = 0
+    for parte in partes:
+        atributos = [c for c in parte.columns if c not in IGNORADAS]
+        parte = parte.assign(
+            CHAVE_HASH=hash_linhas(parte, chave),
+            LINHA_HASH=hash_linhas(parte, atributos),
+        )
+        # Posição na carga inteira, para achar a linha depois do delta
+        parte.index = pd.RangeIndex(inicio, inicio + len(parte))
+        inicio += len(parte)
+        hashes.append(parte[['CHAVE_HASH', 'LINHA_HASH']])
+        inalteradas = pd.MultiIndex.from_arrays(
+            [parte['CHAVE_HASH'], parte['LINHA_HASH']]
+        ).isin(pares_abertos)
+        candidatas.append(parte[~inalteradas])
+    if not hashes:
+        vazia = pd.DataFrame(
+            {'CHAVE_HASH': [], 'LINHA_HASH': []}, dtype='int64'
+        )
+        hashes, candidatas = [vazia], [vazia]
+
+    gravar, fechar, contagens = calcular_delta(
+        pd.concat(hashes), abertas, desde
+    )
+    return pd.concat(candidatas).loc[gravar.index], fechar, contagens
+
+
+def registrar_historico(
+    conn, tabela, df, desde=None, dtype=None, chunksize=500, agora=None
+):
+    """
+    Grava no histórico as linhas novas ou alteradas da carga.
+
+    Deve rodar na transação do insert, depois do DELETE/TRUNCATE da tabela
+    de relatório. As versões abertas com data no escopo recarregado
+    (``desde`` em diante, ou tudo no FULL) que não vieram na carga são
+    fechadas; as sem ``DATA_EXECUCAO`` não são apagadas pelo incremental,
+    então lá continuam abertas (no FULL também são fechadas).
+
+    Args:
+        conn: Conexão SQLAlchemy dentro da transação da carga.
+        tabela: Tabela de relatório que acabou de ser carregada.
+        df: DataFrame carregado (já sanitizado), ou um iterável de
+            DataFrames com a carga em partes.
+        desde: Primeira ``DATA_EXECUCAO`` recarregada (None no FULL).
+        dtype: Tipos SQLAlchemy das colunas da tabela.
+        chunksize: Tamanho dos chunks do insert.
+        agora: Instante da troca de versão (padrão: agora).
+
+    Returns:
+        Dicionário com 'novas', 'alteradas' e 'removidas', ou None para
+        tabelas sem histórico.
+    """
+    chave = HISTORICO.get(tabela)
+    if chave is None:
+        return None
+    historico = tabela_historico(tabela)
+    agora = agora or datetime.now()
+    partes = [df] if isinstance(df, pd.DataFrame) else df
+
+    abertas = _versoes_abertas(conn, historico, desde)
+    gravar, fechar, resultado = calcular_delta_em_partes(
+        partes, chave, abertas, desde
+    )
+
+    if len(fechar):
+        conn.execute(
+            text(
+                f'UPDATE "{historico}" SET "VALIDO_ATE" = :agora '
+                'WHERE "VALIDO_ATE" IS NULL AND "CHAVE_HASH" = ANY(:chaves)'
+            ),
+            {'agora': agora, 'chaves': [int(c) for c in fechar]},
+        )
+    if len(gravar):
+        gravar.assign(VALIDO_DE=agora, VALIDO_ATE=None).to_sql(
+            historico,
+            con=conn,
+            if_exists='append',
+            index=False,
+            dtype={
+                **(dtype or {}),
+                'CHAVE_HASH': BigInteger(),
+                'LINHA_HASH': BigInteger(),
+                'VALIDO_DE': DateTime(),
+                'VALIDO_ATE': DateTime(),
+            },
+            method='multi',
+            chunksize=chunksize,
+        )
+
+    logger.info(
+        f'[HISTORICO] {historico}: {resultado["novas"]} nova(s), '
+        f'{resultado["alteradas"]} alterada(s), '
+        f'{resultado["removidas"]} removida(s) da janela'
+    )
+    return resultado
@@ -1,20 +1,40 @@
 """Módulo para carregamento de dados no PostgreSQL."""
 
+import hashlib
 import logging
 import os
+import re
 import time
+from contextlib import contextmanager
+from datetime import datetime
 from urllib.parse import quote_plus
 
+import metrics
 import pandas as pd
-from dotenv import load_dotenv
+from env import carregar_env
+from esquemas import ESQUEMAS, ddl, tipos_sqlalchemy
+from load.historico import registrar_historico
+from load.resumos import RESUMOS, atualizar_resumos
+from load.watermarks import registrar_watermark
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
-from sqlalchemy.types import Date, DateTime, Time
 from tqdm import tqdm
 
-# Carrega .env da raiz do projeto
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
-load_dotenv(os.path.join(BASE_DIR, '.env'))
+
+TABELAS_RELATORIO = tuple(e['tabela'] for e in ESQUEMAS.values())
+
+# Índices mantidos pelo loader nas tabelas de relatório. DATA_EXECUCAO usa
+# 'btree' ou 'brin' (menor, bom quando as linhas chegam em ordem de data)
+COLUNAS_INDEXADAS = ['UC / MD', 'TOI', 'EQUIPE']
+INDICE_DATA_EXECUCAO = os.getenv('INDICE_DATA_EXECUCAO', 'btree').lower()
+METODOS_INDICE = ('btree', 'brin')
+# No FULL, apaga os índices antes do insert em massa e recria no fim
+RECRIAR_INDICES_FULL = (
+    os.getenv('RECRIAR_INDICES_FULL', 'false').lower() == 'true'
+)
+# Linhas por lote do COPY usado com DataFrames do motor Arrow
+COPY_LOTE_LINHAS = int(os.getenv('COPY_LOTE_LINHAS', '100000'))
 
 
 def get_engine():
@@ -24,6 +44,8 @@ def get_engine():
     Returns:
         Engine configurada com pool de conexões e SSL.
     """
+    # Quem usa o loader direto (testes, scripts) também lê as credenciais
+    carregar_env()
     user = os.getenv('DB_USER')
     password = quote_plus(os.getenv('DB_PASS'))
     db = os.getenv('DB_NAME')
@@ -32,7 +54,7 @@ def get_engine():
     url = f'postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}'
     engine = create_engine(
         url,
-        connect_args={'sslmode': 'require'},
+        connect_args={'sslmode': os.getenv('DB_SSLMODE', 'require')},
         pool_pre_ping=True,
         pool_recycle=1800,
         pool_size=5,
@@ -42,8 +64,17 @@ def get_engine():
 
 
 def init_database():
-    """Inicializa as tabelas do banco de dados a partir do script SQL."""
+    """
+    Inicializa as tabelas do banco de dados.
+
+    As tabelas de relatório vêm dos esquemas (esquemas.py) e o restante
+    (controle, resumos, histórico) do script SQL. Colunas novas no esquema
+    são acrescentadas à tabela e ao histórico dela.
+    """
     engine = get_engine()
+    with engine.begin() as conn:
+        for report in ESQUEMAS:
+            conn.execute(text(ddl(report)))
     # usa caminho absoluto pro init.sql
     sql_path = os.path.join(BASE_DIR, 'etl', 'sql', 'init_tables.sql')
     if os.path.exists(sql_path):
@@ -54,6 +85,84 @@ def init_database():
         print('[INIT] Tabelas inicializadas com sucesso')
     else:
         print('[WARN] etl/sql/init_tables.sql não encontrado')
+    with engine.begin() as conn:
+        for esquema in ESQUEMAS.values():
+            for tabela in (esquema['tabela'], f'{esquema["tabela"]}_history'):
+                _completar_colunas(conn, tabela, esquema['colunas'])
+
+
+def _completar_colunas(conn, tabela: str, colunas) -> None:
+    """
+    Acrescenta à tabela as colunas do esquema que ainda não existem nela.
+
+    Consulta o catálogo antes: um ALTER TABLE pega lock exclusivo mesmo
+    com ``IF NOT EXISTS``, e só deve rodar quando há o que mudar.
+
+    Args:
+        conn: Conexão SQLAlchemy.
+        tabela: Nome da tabela.
+        colunas: Colunas do esquema (nome, tipo SQL, origem).
+    """
+    existentes = set(
+        conn.execute(
+            text(
+                'SELECT column_name FROM information_schema.columns '
+                'WHERE table_schema = current_schema() AND table_name = :t'
+            ),
+            {'t': tabela},
+        ).scalars()
+    )
+    if not existentes:
+        return
+    for nome, tipo, _ in colunas:
+        if nome not in existentes:
+            conn.execute(
+                text(f'ALTER TABLE "{tabela}" ADD COLUMN "{nome}" {tipo}')
+            )
+            print(f'[INIT] Coluna "{nome}" ({tipo}) adicionada em {tabela}')
+
+
+def _chave_lock(nome: str) -> int:
+    """Converte um nome em uma chave bigint estável para advisory lock."""
+    digest = hashlib.blake2b(nome.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+@contextmanager
+def advisory_lock(nome: str):
+    """
+    Tenta pegar um advisory lock de sessão no Postgres, sem bloquear.
+
+    O lock vale entre processos e containers (local + ECS) que apontam para
+    o mesmo banco, e é liberado automaticamente se a conexão cair.
+
+    Args:
+        nome: Nome lógico do lock (ex.: 'etl_sigos:general').
+
+    Yields:
+        True se o lock foi obtido, False se outro processo já o detém.
+    """
+    engine = get_engine()
+    chave = _chave_lock(nome)
+    conn = engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+    obtido = False
+    try:
+        obtido = bool(
+            conn.execute(
+                text('SELECT pg_try_advisory_lock(:chave)'), {'chave': chave}
+            ).scalar()
+        )
+        yield obtido
+    finally:
+        try:
+            if obtido:
+                conn.execute(
+                    text('SELECT pg_advisory_unlock(:chave)'),
+                    {'chave': chave},
+                )
+        finally:
+            conn.close()
+            engine.dispose()
 
 
 def _dtype_map_for_table(tabela: str):
@@ -66,23 +175,131 @@ def _dtype_map_for_table(tabela: str):
     Returns:
         Dicionário com mapeamento de colunas para tipos SQLAlchemy.
     """
-    if tabela == 'return_reports':
-        return {
-            'DATA_EXECUCAO': Date(),
-            'DATA RESOLVIDO': Date(),
-            'DATA_EXTRACAO': DateTime(),
-        }
-    if tabela == 'general_reports':
-        return {
-            'DATA_EXECUCAO': Date(),
-            'DATA AFERICAO': Date(),
-            'DATA AR': Date(),
-            'DATA BAIXADO': Date(),
-            'HORA INICIO SERVICO': Time(),
-            'HORA FIM SERVICO': Time(),
-            'DATA_EXTRACAO': DateTime(),
-        }
-    return {}
+    return tipos_sqlalchemy(tabela)
+
+
+def _indices(tabela: str) -> list[tuple[str, str, str]]:
+    """
+    Retorna os índices mantidos pelo loader em uma tabela.
+
+    O método entra no nome (ex.: ``general_reports_data_execucao_brin_idx``):
+    trocar INDICE_DATA_EXECUCAO gera um índice novo em vez de o ``IF NOT
+    EXISTS`` manter o antigo.
+
+    Args:
+        tabela: Nome da tabela.
+
+    Returns:
+        Lista de tuplas (nome do índice, coluna, método); vazia para tabelas
+        fora de TABELAS_RELATORIO (ex.: staging dos shards).
+    """
+    if tabela not in TABELAS_RELATORIO:
+        return []
+    colunas = [('DATA_EXECUCAO', INDICE_DATA_EXECUCAO)]
+    colunas += [(coluna, 'btree') for coluna in COLUNAS_INDEXADAS]
+    return [
+        (_nome_indice(tabela, coluna, metodo), coluna, metodo)
+        for coluna, metodo in colunas
+    ]
+
+
+def _nome_indice(tabela: str, coluna: str, metodo: str | None) -> str:
+    """Nome do índice da coluna (sem método: o nome antigo, só coluna)."""
+    sufixo = re.sub(r'\W+', '_', coluna.lower()).strip('_')
+    if metodo is None:
+        return f'{tabela}_{sufixo}_idx'
+    return f'{tabela}_{sufixo}_{metodo}_idx'
+
+
+def garantir_indices(conn, tabela: str) -> None:
+    """
+    Cria os índices da tabela que ainda não existirem.
+
+    Antes, apaga os da mesma coluna com outro método ou com o nome antigo
+    (sem método), para uma troca de INDICE_DATA_EXECUCAO não deixar dois
+    índices na coluna.
+    """
+    for _, coluna, metodo in _indices(tabela):
+        for outro in (None, *METODOS_INDICE):
+            if outro != metodo:
+                nome = _nome_indice(tabela, coluna, outro)
+                conn.execute(text(f'DROP INDEX IF EXISTS "{nome}"'))
+    for nome, coluna, metodo in _indices(tabela):
+        conn.execute(
+            text(
+                f'CREATE INDEX IF NOT EXISTS "{nome}" ON "{tabela}" '
+                f'USING {metodo} ("{coluna}")'
+            )
+        )
+
+
+def remover_indices(conn, tabela: str) -> None:
+    """Apaga os índices da tabela (antes de um insert em massa)."""
+    for nome, _, _ in _indices(tabela):
+        conn.execute(text(f'DROP INDEX IF EXISTS "{nome}"'))
+
+
+def manutencao_pos_carga(engine, tabela: str) -> None:
+    """
+    Garante os índices e atualiza as estatísticas depois de uma carga.
+
+    Depois de um TRUNCATE + reload o planner fica com estatísticas velhas e
+    cai em sequential scan, inclusive no DELETE do próximo incremental. O
+    ANALYZE cobre a tabela carregada e os resumos recalculados com ela.
+    Uma falha aqui só gera aviso: os dados já estão confirmados.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        tabela: Tabela que acabou de ser carregada.
+    """
+    inicio = time.monotonic()
+    tabelas = [tabela, *(resumo for resumo, _ in RESUMOS.get(tabela, []))]
+    try:
+        with engine.begin() as conn:
+            garantir_indices(conn, tabela)
+            for nome in tabelas:
+                conn.execute(text(f'ANALYZE "{nome}"'))
+    except SQLAlchemyError as e:
+        logging.warning(
+            f'[LOAD] Falha na manutenção pós-carga de {tabela}: {e}'
+        )
+        return
+    print(
+        f'[LOAD] Índices e ANALYZE de {", ".join(tabelas)} em '
+        f'{time.monotonic() - inicio:.1f}s'
+    )
+
+
+def registrar_versao(conn, tabela: str) -> str | None:
+    """
+    Grava uma nova versão da tabela na transação da carga.
+
+    Quem lê a tabela com cache (ex.: a API de leitura) compara a versão
+    para saber se o que guardou ainda vale.
+
+    Args:
+        conn: Conexão SQLAlchemy dentro da transação do insert.
+        tabela: Tabela carregada.
+
+    Returns:
+        Versão gravada, ou None para tabelas fora de TABELAS_RELATORIO.
+    """
+    if tabela not in TABELAS_RELATORIO:
+        return None
+    versao = f'{datetime.now():%Y%m%d%H%M%S%f}'
+    conn.execute(
+        text(
+            """
+            INSERT INTO etl_versoes (tabela, versao, atualizado_em)
+            VALUES (:tabela, :versao, NOW())
+            ON CONFLICT (tabela) DO UPDATE SET
+                versao = EXCLUDED.versao,
+                atualizado_em = EXCLUDED.atualizado_em
+            """
+        ),
+        {'tabela': tabela, 'versao': versao},
+    )
+    return versao
 
 
 def _sanitize_df(df: pd.DataFrame) -> pd.DataFrame:
@@ -107,12 +324,88 @@ def _sanitize_df(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _eh_arrow(df: pd.DataFrame) -> bool:
+    """Indica se o DataFrame veio do motor Arrow (só colunas ArrowDtype)."""
+    return len(df.columns) > 0 and all(
+        isinstance(tipo, pd.ArrowDtype) for tipo in df.dtypes
+    )
+
+
+def copiar_arrow(
+    conn, tabela: str, df: pd.DataFrame, lote: int = COPY_LOTE_LINHAS
+) -> None:
+    """
+    Grava um DataFrame do motor Arrow com ``COPY ... FROM STDIN``.
+
+    Os record batches vão direto para CSV no writer do Arrow e dali para o
+    COPY, sem criar um objeto Python por célula. Texto vazio sai entre
+    aspas e nulo sai vazio, que é como o COPY em CSV distingue os dois.
+
+    Args:
+        conn: Conexão SQLAlchemy dentro da transação da carga.
+        tabela: Tabela de destino.
+        df: DataFrame com colunas ArrowDtype.
+        lote: Linhas por lote do COPY.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    colunas = ', '.join(f'"{c}"' for c in df.columns)
+    comando = f'COPY "{tabela}" ({colunas}) FROM STDIN WITH (FORMAT csv)'
+    opcoes = pacsv.WriteOptions(include_header=False)
+    cursor = conn.connection.cursor()
+    try:
+        tabela_arrow = pa.Table.from_pandas(df, preserve_index=False)
+        for batch in tabela_arrow.to_batches(max_chunksize=lote):
+            saida = pa.BufferOutputStream()
+            pacsv.write_csv(batch, saida, opcoes)
+            cursor.copy_expert(comando, pa.BufferReader(saida.getvalue()))
+    finally:
+        cursor.close()
+
+
+def _limpar_tabela(
+    conn, tabela: str, mode: str, coluna_data_execucao: str, menor_data
+) -> None:
+    """
+    Apaga as linhas que a carga substitui (TRUNCATE ou DELETE).
+
+    Args:
+        conn: Conexão SQLAlchemy dentro da transação da carga.
+        tabela: Tabela de destino.
+        mode: Modo de carga ('full' ou 'incremental').
+        coluna_data_execucao: Coluna de data do filtro incremental.
+        menor_data: Primeira data recarregada no incremental.
+    """
+    if mode == 'full':
+        print(f'[LOAD] Truncando tabela {tabela} (modo FULL)...')
+        conn.execute(text(f'TRUNCATE TABLE "{tabela}" RESTART IDENTITY;'))
+        print(f'[LOAD] Tabela {tabela} truncada (modo FULL)')
+        if RECRIAR_INDICES_FULL:
+            # Insert em massa sem manter índice; recriados no pós-carga
+            remover_indices(conn, tabela)
+    elif mode == 'incremental' and pd.notna(menor_data):
+        print(
+            f'[LOAD] Deletando registros >= {menor_data} da tabela {tabela}...'
+        )
+        conn.execute(
+            text(
+                f'DELETE FROM "{tabela}" '
+                f'WHERE "{coluna_data_execucao}" >= :menor_data'
+            ),
+            {'menor_data': menor_data},
+        )
+        print(f'[LOAD] Deletados registros >= {menor_data} da tabela {tabela}')
+
+
 def load_df_to_postgres(
     df: pd.DataFrame,
     tabela: str,
     mode: str,
     coluna_data_execucao: str,
     chunksize: int = 500,
+    data_inicio_carga=None,
+    watermark: dict | None = None,
 ):
     """
     Carrega um DataFrame no PostgreSQL com suporte a modo full e incremental.
@@ -123,6 +416,19 @@ def load_df_to_postgres(
         mode: Modo de carga ('full' ou 'incremental').
         coluna_data_execucao: Nome da coluna de data para filtro incremental.
         chunksize: Tamanho dos chunks para inserção (padrão: 500).
+        data_inicio_carga: Início da janela extraída. No incremental, apaga a
+            partir dessa data em vez da menor data presente no DataFrame, para
+            o range da carga bater com a janela baixada.
+        watermark: Argumentos de ``registrar_watermark`` (sem ``conn``). A
+            marca d'água é gravada na mesma transação do insert, então só
+            avança se a carga for confirmada.
+
+    O TRUNCATE/DELETE roda na mesma transação do insert: se a carga falhar,
+    a tabela continua com os dados anteriores. Os resumos diários da tabela
+    (ver load/resumos.py) são recalculados nessa transação, só para as datas
+    apagadas e recarregadas. Na mesma transação, as linhas novas ou alteradas vão para o histórico
+    ``<tabela>_history`` (ver load/historico.py). DataFrames do motor Arrow
+    (MOTOR_TRANSFORMACAO=arrow) entram por ``COPY`` (ver ``copiar_arrow``).
 
     Raises:
         ValueError: Se a coluna de data não existir no DataFrame.
@@ -130,36 +436,24 @@ def load_df_to_postgres(
         SQLAlchemyError: Se houver erro SQL durante a carga.
     """
     engine = get_engine()
+    inicio = time.monotonic()
 
     if coluna_data_execucao not in df.columns:
         raise ValueError(
             f"Coluna '{coluna_data_execucao}' não encontrada no DataFrame."
         )
 
-    df = _sanitize_df(df)
+    arrow = _eh_arrow(df)
+    if not arrow:
+        df = _sanitize_df(df)
     dtype_map = _dtype_map_for_table(tabela)
 
-    # Limpeza incremental/full em transação separada
-    with engine.begin() as conn:
-        if mode == 'full':
-            print(f'[LOAD] Truncando tabela {tabela} (modo FULL)...')
-            conn.execute(text(f'TRUNCATE TABLE "{tabela}" RESTART IDENTITY;'))
-            print(f'[LOAD] Tabela {tabela} truncada (modo FULL)')
-        elif mode == 'incremental':
+    menor_data = None
+    if mode == 'incremental':
+        if data_inicio_carga is not None:
+            menor_data = data_inicio_carga
+        else:
             menor_data = df[coluna_data_execucao].min()
-            if pd.notna(menor_data):
-                print(
-                    f'[LOAD] Deletando registros >= {menor_data} da tabela {tabela}...'
-                )
-                conn.execute(
-                    text(
-                        f'DELETE FROM "{tabela}" WHERE "{coluna_data_execucao}" >= :menor_data'
-                    ),
-                    {'menor_data': menor_data},
-                )
-                print(
-                    f'[LOAD] Deletados registros >= {menor_data} da tabela {tabela}'
-                )
 
     # Insert com retry em erros operacionais e dump de chunks problemáticos
     total = len(df)
@@ -170,7 +464,18 @@ def load_df_to_postgres(
         try:
             start = 0
             with engine.begin() as conn:
-                if total <= chunksize:
+                # Limpeza na mesma transação do insert: se a carga falhar,
+                # tabela, índices, resumos e histórico ficam como estavam
+                _limpar_tabela(
+                    conn, tabela, mode, coluna_data_execucao, menor_data
+                )
+                if arrow:
+                    print(
+                        f'[LOAD] Copiando {total} registros em {tabela} '
+                        f'(COPY, lotes de {COPY_LOTE_LINHAS})...'
+                    )
+                    copiar_arrow(conn, tabela, df)
+                elif total <= chunksize:
                     # DataFrame pequeno: insere tudo de uma vez com barra de progresso
                     print(f'[LOAD] Inserindo {total} registros em {tabela}...')
                     with tqdm(
@@ -230,12 +535,41 @@ def load_df_to_postgres(
                                 )
                                 raise
                             start = end
+                if mode == 'full':
+                    if RECRIAR_INDICES_FULL:
+                        # Recriados antes do commit: uma falha aqui desfaz
+                        # a carga em vez de deixar a tabela sem índice
+                        garantir_indices(conn, tabela)
+                    registrar_historico(
+                        conn, tabela, df, dtype=dtype_map, chunksize=chunksize
+                    )
+                    atualizar_resumos(conn, tabela)
+                elif pd.notna(menor_data):
+                    registrar_historico(
+                        conn,
+                        tabela,
+                        df,
+                        desde=menor_data,
+                        dtype=dtype_map,
+                        chunksize=chunksize,
+                    )
+                    atualizar_resumos(conn, tabela, desde=menor_data)
+                if watermark is not None:
+                    registrar_watermark(conn, **watermark)
+                registrar_versao(conn, tabela)
             print(
                 f'[LOAD] {total} registros inseridos em {tabela} (modo={mode.upper()})'
             )
+            metrics.incrementar(
+                'etl_linhas_carregadas_total', total, tabela=tabela
+            )
+            metrics.observar(
+                'etl_load_seconds', time.monotonic() - inicio, tabela=tabela
+            )
             break  # sucesso
         except OperationalError as e:
             attempt += 1
+            metrics.incrementar('etl_retentativas_total', etapa='load')
             logging.warning(
                 f'OperationalError no load ({attempt}/{max_retries}). Vou reciclar a engine e tentar de novo: {e}'
             )
@@ -256,3 +590,5 @@ def load_df_to_postgres(
                 'Erro inesperado durante o load. Rollback automático realizado.'
             )
             raise
+
+    manutencao_pos_carga(engine, tabela)
@@ -0,0 +1,80 @@
+"""Módulo com as tabelas de resumo diário usadas pelos dashboards.
+
+Os dashboards contam serviços por dia, regional, equipe e status. Em vez
+de varrer ``general_reports`` e ``return_reports`` a cada refresh, eles
+leem as tabelas de resumo, que o loader recalcula na mesma transação do
+insert e só para as datas que a carga mexeu. Assim a leitura custa O(dias)
+e o resumo nunca fica fora de sincronia com a tabela base.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Tabela base -> [(tabela de resumo, colunas agrupadas além da data)]
+RESUMOS = {
+    'general_reports': [
+        (
+            'general_resumo_diario',
+            ['REGIONAL', 'GRUPO', 'EQUIPE', 'STATUS', 'TIPO SERVICO'],
+        ),
+    ],
+    'return_reports': [
+        ('return_resumo_diario', ['REGIONAL', 'GRUPO', 'EQUIPE', 'MOTIVO']),
+    ],
+}
+
+
+def _filtro_datas(desde):
+    """
+    Monta o WHERE das datas recalculadas.
+
+    Linhas sem ``DATA_EXECUCAO`` não são apagadas pelo incremental, então o
+    grupo sem data é recalculado em toda carga.
+    """
+    if desde is None:
+        return ''
+    return 'WHERE "DATA_EXECUCAO" >= :desde OR "DATA_EXECUCAO" IS NULL'
+
+
+def atualizar_resumos(conn, tabela, desde=None):
+    """
+    Recalcula os resumos da tabela a partir de uma data.
+
+    Se o resumo ainda estiver vazio (tabela nova), ele é reconstruído
+    inteiro, independentemente de ``desde``.
+
+    Args:
+        conn: Conexão SQLAlchemy dentro da transação da carga.
+        tabela: Tabela base que acabou de ser carregada.
+        desde: Primeira ``DATA_EXECUCAO`` alterada pela carga (None
+            recalcula tudo, como no FULL).
+    """
+    for resumo, colunas in RESUMOS.get(tabela, []):
+        inicio = desde
+        if inicio is not None:
+            vazio = not conn.execute(
+                text(f'SELECT EXISTS (SELECT 1 FROM "{resumo}")')
+            ).scalar()
+            if vazio:
+                inicio = None
+
+        grupo = ', '.join(f'"{c}"' for c in ['DATA_EXECUCAO', *colunas])
+        filtro = _filtro_datas(inicio)
+        params = {} if inicio is None else {'desde': inicio}
+        conn.execute(text(f'DELETE FROM "{resumo}" {filtro}'), params)
+        resultado = conn.execute(
+            text(
+                f'INSERT INTO "{resumo}" ({grupo}, "QUANTIDADE") '
+                f'SELECT {grupo}, COUNT(*) FROM "{tabela}" {filtro} '
+                f'GROUP BY {grupo}'
+            ),
+            params,
+        )
+        alcance = 'completo' if inicio is None else f'desde {inicio}'
+        logger.info(
+            f'[RESUMO] {resumo}: {resultado.rowcount} grupo(s) '
+            f'recalculado(s) ({alcance})'
+        )
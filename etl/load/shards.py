@@ -0,0 +1,279 @@
+"""Módulo com a coordenação do FULL dividido entre containers (shards).
+
+Com ``--shard i/N``, cada container baixa só as janelas fixas do shard i
+(rodízio pela posição da janela), transforma e grava a sua parte em uma
+tabela de staging própria (``<tabela>_shard_<i>``). A tabela
+``etl_shard_runs`` registra o andamento de cada shard; o último a concluir
+publica a tabela inteira em uma única transação: TRUNCATE, cópia de todos
+os stagings, histórico, resumos diários e marca d'água. Quem consulta a
+tabela durante a publicação espera o commit e nunca a vê vazia ou pela
+metade.
+"""
+
+import logging
+import os
+from datetime import date, datetime
+
+import pandas as pd
+from load.historico import registrar_historico
+from load.loader import (
+    RECRIAR_INDICES_FULL,
+    _chave_lock,
+    _dtype_map_for_table,
+    garantir_indices,
+    manutencao_pos_carga,
+    registrar_versao,
+    remover_indices,
+)
+from load.resumos import atualizar_resumos
+from load.watermarks import registrar_watermark
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Identificador comum aos shards de um mesmo FULL. Sem ele, shards
+# disparados no mesmo dia formam a mesma execução
+SHARD_EXECUCAO = os.getenv('SHARD_EXECUCAO')
+# Linhas por leitura da tabela publicada ao calcular o histórico
+CHUNK_HISTORICO = int(os.getenv('SHARD_CHUNK_HISTORICO', '50000'))
+
+
+def execucao_atual(hoje=None):
+    """
+    Retorna o identificador da execução sharded em andamento.
+
+    Args:
+        hoje: Data de referência (padrão: hoje).
+
+    Returns:
+        SHARD_EXECUCAO, se definido, ou 'full_<aaaammdd>'.
+    """
+    if SHARD_EXECUCAO:
+        return SHARD_EXECUCAO
+    return f'full_{hoje or date.today():%Y%m%d}'
+
+
+def tabela_staging(tabela, indice):
+    """Retorna o nome da tabela de staging do shard."""
+    return f'{tabela}_shard_{indice}'
+
+
+def filtrar_dias_do_shard(df, janelas, fim_coleta, coluna='DATA_EXECUCAO'):
+    """
+    Mantém só as linhas dos dias que pertencem às janelas do shard.
+
+    Janelas vizinhas dividem o dia da borda (o fim de uma é o início da
+    próxima), e cada uma pode cair em um shard diferente. Cada dia fica com
+    a janela que começa nele, e o último dia da coleta com a última janela,
+    então nenhuma linha é publicada por dois shards. Linhas sem data ficam
+    com o shard que as baixou.
+
+    Args:
+        df: DataFrame consolidado do shard.
+        janelas: Janelas (data_inicio, data_fim) baixadas pelo shard.
+        fim_coleta: Data final da coleta inteira ('dd/mm/yyyy').
+        coluna: Coluna de data usada na divisão.
+
+    Returns:
+        DataFrame filtrado.
+    """
+    datas = pd.to_datetime(df[coluna], errors='coerce')
+    manter = datas.isna()
+    for data_inicio, data_fim in janelas:
+        inicio = pd.Timestamp(datetime.strptime(data_inicio, '%d/%m/%Y'))
+        fim = pd.Timestamp(datetime.strptime(data_fim, '%d/%m/%Y'))
+        if data_fim == fim_coleta:
+            manter |= (datas >= inicio) & (datas <= fim)
+        else:
+            manter |= (datas >= inicio) & (datas < fim)
+    removidas = int((~manter).sum())
+    if removidas:
+        logger.info(
+            f'[SHARD] {removidas} linha(s) de dias de borda ficam com o '
+            'shard vizinho'
+        )
+    return df[manter]
+
+
+def iniciar_shard(engine, report, tabela, execucao, shard, iniciado_em):
+    """
+    Prepara o staging do shard e o registra como em andamento.
+
+    O staging é esvaziado, então repetir um shard que falhou substitui a
+    parte dele em vez de duplicá-la.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        report: Nome do relatório ('general' ou 'return').
+        tabela: Tabela final do relatório.
+        execucao: Identificador da execução (ver ``execucao_atual``).
+        shard: Tupla (i, N).
+        iniciado_em: Datetime do início da extração do shard.
+    """
+    indice, total = shard
+    staging = tabela_staging(tabela, indice)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{staging}" '
+                f'(LIKE "{tabela}" INCLUDING DEFAULTS)'
+            )
+        )
+        conn.execute(text(f'TRUNCATE TABLE "{staging}"'))
+        conn.execute(
+            text(
+                """
+                INSERT INTO etl_shard_runs
+                    (execucao, report, shard, total_shards, status,
+                     iniciado_em)
+                VALUES
+                    (:execucao, :report, :shard, :total, 'em_andamento',
+                     :iniciado_em)
+                ON CONFLICT (execucao, report, shard) DO UPDATE SET
+                    total_shards = EXCLUDED.total_shards,
+                    status = EXCLUDED.status,
+                    iniciado_em = EXCLUDED.iniciado_em,
+                    concluido_em = NULL,
+                    linhas = NULL
+                """
+            ),
+            {
+                'execucao': execucao,
+                'report': report,
+                'shard': indice,
+                'total': total,
+                'iniciado_em': iniciado_em,
+            },
+        )
+    logger.info(
+        f'[SHARD] {report} {indice}/{total} iniciado (execução {execucao}, '
+        f'staging {staging})'
+    )
+
+
+def concluir_shard(
+    engine, report, tabela, execucao, shard, linhas, inicio_janela, fim_janela
+):
+    """
+    Marca o shard como concluído e, se for o último, publica a tabela.
+
+    A conclusão dos shards de um report é serializada por um advisory lock
+    de transação, então só um deles enxerga todos os outros concluídos.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        report: Nome do relatório ('general' ou 'return').
+        tabela: Tabela final do relatório.
+        execucao: Identificador da execução (ver ``execucao_atual``).
+        shard: Tupla (i, N).
+        linhas: Linhas gravadas no staging do shard.
+        inicio_janela: Data inicial da coleta inteira.
+        fim_janela: Data final da coleta inteira.
+
+    Returns:
+        True se este shard publicou a tabela.
+    """
+    indice, total = shard
+    with engine.begin() as conn:
+        conn.execute(
+            text('SELECT pg_advisory_xact_lock(:chave)'),
+            {'chave': _chave_lock(f'etl_sigos:{report}:shards')},
+        )
+        conn.execute(
+            text(
+                """
+                UPDATE etl_shard_runs
+                SET status = 'concluido', linhas = :linhas,
+                    concluido_em = :agora
+                WHERE execucao = :execucao AND report = :report
+                  AND shard = :shard
+                """
+            ),
+            {
+                'linhas': int(linhas),
+                'agora': datetime.now(),
+                'execucao': execucao,
+                'report': report,
+                'shard': indice,
+            },
+        )
+        shards = (
+            conn.execute(
+                text(
+                    'SELECT shard, status, linhas, iniciado_em '
+                    'FROM etl_shard_runs '
+                    'WHERE execucao = :execucao AND report = :report '
+                    'AND total_shards = :total'
+                ),
+                {'execucao': execucao, 'report': report, 'total': total},
+            )
+            .mappings()
+            .all()
+        )
+        concluidos = [s for s in shards if s['status'] == 'concluido']
+        if len(concluidos) < total:
+            logger.info(
+                f'[SHARD] {report} {indice}/{total} concluído; '
+                f'{len(concluidos)}/{total} prontos para publicar'
+            )
+            return False
+
+        # Espera qualquer carga do report em andamento (incremental, ciclo)
+        conn.execute(
+            text('SELECT pg_advisory_xact_lock(:chave)'),
+            {'chave': _chave_lock(f'etl_sigos:{report}')},
+        )
+        _publicar(conn, tabela, total)
+        # As linhas chegaram por SQL; o delta do histórico relê a tabela
+        # publicada, com os mesmos hashes de uma carga FULL normal. A
+        # leitura usa cursor no servidor e vem em chunks, sem trazer a
+        # tabela inteira para a memória
+        registrar_historico(
+            conn,
+            tabela,
+            pd.read_sql(
+                text(f'SELECT * FROM "{tabela}"').execution_options(
+                    stream_results=True
+                ),
+                conn,
+                chunksize=CHUNK_HISTORICO,
+            ),
+            dtype=_dtype_map_for_table(tabela),
+        )
+        atualizar_resumos(conn, tabela)
+        registrar_versao(conn, tabela)
+        registrar_watermark(
+            conn,
+            report=report,
+            mode='full',
+            ultima_carga=min(s['iniciado_em'] for s in concluidos),
+            inicio_janela=inicio_janela,
+            fim_janela=fim_janela,
+            linhas=sum(s['linhas'] for s in concluidos),
+        )
+        conn.execute(
+            text(
+                "UPDATE etl_shard_runs SET status = 'publicado' "
+                'WHERE execucao = :execucao AND report = :report'
+            ),
+            {'execucao': execucao, 'report': report},
+        )
+    manutencao_pos_carga(engine, tabela)
+    logger.info(
+        f'[SHARD] {report}: último shard ({indice}/{total}) publicou '
+        f'{tabela} com {sum(s["linhas"] for s in concluidos)} linha(s)'
+    )
+    return True
+
+
+def _publicar(conn, tabela, total):
+    """Troca o conteúdo da tabela final pelo dos N stagings."""
+    conn.execute(text(f'TRUNCATE TABLE "{tabela}"'))
+    if RECRIAR_INDICES_FULL:
+        # Na mesma transação: ninguém chega a ver a tabela sem índice
+        remover_indices(conn, tabela)
+    for indice in range(1, total + 1):
+        staging = tabela_staging(tabela, indice)
+        conn.execute(text(f'INSERT INTO "{tabela}" SELECT * FROM "{staging}"'))
+        conn.execute(text(f'DROP TABLE "{staging}"'))
+    garantir_indices(conn, tabela)
@@ -0,0 +1,213 @@
+"""Módulo com as marcas d'água que definem a janela do incremental."""
+
+import logging
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# Dias revisitados antes da última carga bem-sucedida (correções tardias)
+MARGEM_WATERMARK_DIAS = int(os.getenv('MARGEM_WATERMARK_DIAS', '2'))
+# Status do general que não mudam mais; os demais contam como abertos
+STATUS_FECHADOS_GENERAL = [
+    s.strip().upper()
+    for s in os.getenv('STATUS_FECHADOS_GENERAL', 'BAIXADO').split(',')
+    if s.strip()
+]
+
+
+def ler_watermark(conn, report):
+    """
+    Lê a marca d'água do relatório.
+
+    Args:
+        conn: Conexão SQLAlchemy.
+        report: Nome do relatório ('general' ou 'return').
+
+    Returns:
+        Dicionário com a última carga, ou None se o relatório nunca carregou.
+    """
+    linha = (
+        conn.execute(
+            text(
+                'SELECT report, mode, ultima_carga, inicio_janela, '
+                'fim_janela, linhas FROM etl_watermarks WHERE report = :report'
+            ),
+            {'report': report},
+        )
+        .mappings()
+        .first()
+    )
+    return dict(linha) if linha else None
+
+
+def menor_data_aberta(conn, report):
+    """
+    Retorna a ``DATA_EXECUCAO`` mais antiga que ainda pode mudar no SIGOS.
+
+    No general são os serviços fora de STATUS_FECHADOS_GENERAL; no return,
+    os retornos ainda sem ``DATA RESOLVIDO``.
+
+    Args:
+        conn: Conexão SQLAlchemy.
+        report: Nome do relatório ('general' ou 'return').
+
+    Returns:
+        Data mais antiga em aberto, ou None se não houver registro aberto.
+    """
+    if report == 'general':
+        sql = text(
+            'SELECT MIN("DATA_EXECUCAO") FROM general_reports '
+            'WHERE "STATUS" IS NULL OR UPPER("STATUS") <> ALL(:fechados)'
+        )
+        params = {'fechados': STATUS_FECHADOS_GENERAL}
+    else:
+        sql = text(
+            'SELECT MIN("DATA_EXECUCAO") FROM return_reports '
+            'WHERE "DATA RESOLVIDO" IS NULL'
+        )
+        params = {}
+    return conn.execute(sql, params).scalar()
+
+
+def calcular_inicio_janela(
+    hoje, dias_max, ultima_carga=None, menor_aberta=None, margem_dias=None
+):
+    """
+    Calcula o início da janela do incremental a partir das marcas d'água.
+
+    A janela começa no que vier antes entre a última carga (menos a margem)
+    e o registro aberto mais antigo, limitada a ``dias_max`` para trás e
+    cobrindo pelo menos hoje e ontem. Sem histórico de carga, usa a janela
+    máxima.
+
+    Args:
+        hoje: Data de referência.
+        dias_max: Janela máxima do report, em dias para trás.
+        ultima_carga: Datetime da última carga bem-sucedida (ou None).
+        menor_aberta: ``DATA_EXECUCAO`` mais antiga em aberto (ou None).
+        margem_dias: Dias revisitados antes da última carga
+            (padrão: MARGEM_WATERMARK_DIAS).
+
+    Returns:
+        Data inicial da janela.
+    """
+    limite = hoje - timedelta(days=dias_max)
+    if ultima_carga is None:
+        return limite
+
+    if margem_dias is None:
+        margem_dias = MARGEM_WATERMARK_DIAS
+    candidatos = [ultima_carga.date() - timedelta(days=margem_dias)]
+    if menor_aberta is not None:
+        candidatos.append(menor_aberta)
+
+    inicio = min(candidatos)
+    return max(limite, min(inicio, hoje - timedelta(days=1)))
+
+
+def dias_janela_incremental(engine, report, dias_max):
+    """
+    Consulta o banco e devolve o tamanho da janela do incremental.
+
+    Se as tabelas ainda não existirem ou a consulta falhar, volta para a
+    janela máxima, que é o comportamento anterior.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        report: Nome do relatório ('general' ou 'return').
+        dias_max: Janela máxima do report, em dias para trás.
+
+    Returns:
+        Quantidade de dias para trás a partir de hoje.
+    """
+    hoje = date.today()
+    try:
+        with engine.connect() as conn:
+            watermark = ler_watermark(conn, report)
+            menor_aberta = menor_data_aberta(conn, report)
+    except SQLAlchemyError as e:
+        logger.warning(
+            f'[WATERMARK] Falha lendo marcas de {report}, usando '
+            f'{dias_max} dias: {e}'
+        )
+        return dias_max
+
+    inicio = calcular_inicio_janela(
+        hoje,
+        dias_max,
+        ultima_carga=watermark['ultima_carga'] if watermark else None,
+        menor_aberta=menor_aberta,
+    )
+    dias = (hoje - inicio).days
+    logger.info(
+        f'[WATERMARK] {report}: última carga='
+        f'{watermark["ultima_carga"] if watermark else "nunca"}, '
+        f'aberto mais antigo={menor_aberta}, janela={dias} dia(s)'
+    )
+    return dias
+
+
+def registrar_watermark(
+    conn, report, mode, ultima_carga, inicio_janela, fim_janela, linhas
+):
+    """
+    Grava a marca d'água do relatório na transação da carga.
+
+    Args:
+        conn: Conexão SQLAlchemy dentro da transação do insert.
+        report: Nome do relatório ('general' ou 'return').
+        mode: Modo da carga ('full' ou 'incremental').
+        ultima_carga: Datetime do início da extração carregada.
+        inicio_janela: Data inicial da janela carregada.
+        fim_janela: Data final da janela carregada.
+        linhas: Quantidade de linhas inseridas.
+    """
+    conn.execute(
+        text(
+            """
+            INSERT INTO etl_watermarks
+                (report, mode, ultima_carga, inicio_janela, fim_janela, linhas)
+            VALUES
+                (:report, :mode, :ultima_carga, :inicio_janela, :fim_janela,
+                 :linhas)
+            ON CONFLICT (report) DO UPDATE SET
+                mode = EXCLUDED.mode,
+                ultima_carga = EXCLUDED.ultima_carga,
+                inicio_janela = EXCLUDED.inicio_janela,
+                fim_janela = EXCLUDED.fim_janela,
+                linhas = EXCLUDED.linhas
+            """
+        ),
+        {
+            'report': report,
+            'mode': mode,
+            'ultima_carga': ultima_carga,
+            'inicio_janela': inicio_janela,
+            'fim_janela': fim_janela,
+            'linhas': int(linhas),
+        },
+    )
+
+
+def ultima_sincronizacao(engine, report):
+    """
+    Retorna quando a janela completa do relatório foi carregada por último.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        report: Nome do relatório ('general' ou 'return').
+
+    Returns:
+        Datetime da marca d'água, ou None se não houver (ou se falhar).
+    """
+    try:
+        with engine.connect() as conn:
+            watermark = ler_watermark(conn, report)
+    except SQLAlchemyError as e:
+        logger.warning(f'[WATERMARK] Falha lendo marca de {report}: {e}')
+        return None
+    return watermark['ultima_carga'] if watermark else None
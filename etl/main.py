@@ -2,24 +2,40 @@
 
 import argparse
 import glob
+import importlib
 import logging
 import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from logging.handlers import RotatingFileHandler
 
-import schedule
-from extraction.reports.general_report import download_general_report
-from extraction.reports.return_report import download_return_report
-from load.loader import init_database, load_df_to_postgres
-from transformation.transformer import transformar_general, transformar_return
+from env import carregar_env
+
+# Antes de qualquer módulo do ETL: todos leem a configuração no import
+carregar_env()
+
+# Só módulos leves no topo. pandas, Selenium e SQLAlchemy são importados
+# dentro da etapa que os usa, então --help e o scheduler ocioso não pagam
+# esse custo (medido em benchmarks/bench_startup.py)
+import metrics  # noqa: E402
+import profiling  # noqa: E402
+from extraction.core import checkpoint, manifest  # noqa: E402
+from extraction.core.pool import POOL_TAMANHO  # noqa: E402
+from orchestration import probe  # noqa: E402
+from orchestration.scheduler import MotorAgendamento  # noqa: E402
 
 
 def setup_logging():
     """Configura o sistema de logging com rotação de arquivos e console."""
     os.makedirs('logs', exist_ok=True)
     log_filename = f"logs/etl_{datetime.now().strftime('%Y-%m-%d')}.log"
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    formatter = logging.Formatter(
+        '%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s'
+    )
 
     file_handler = RotatingFileHandler(
         log_filename,
@@ -48,9 +64,108 @@ def setup_logging():
     logging.info(f'Logging configurado. Arquivo base: {log_filename}')
 
 
-def cleanup_files(report_type: str) -> None:
-    """Remove arquivos baixados e processados após sucesso do ETL."""
-    downloads_dir = os.path.join(os.getcwd(), 'etl', 'downloads')
+DOWNLOADS_DIR = os.path.join(os.getcwd(), 'etl', 'downloads')
+
+# Ciclos concorrentes no modo scheduler (general e return em paralelo)
+CICLO_CONCORRENTE = os.getenv('CICLO_CONCORRENTE', 'false').lower() == 'true'
+
+
+# Prepara cada CSV assim que a janela termina de baixar
+PIPELINE_JANELAS = os.getenv('PIPELINE_JANELAS', 'true').lower() == 'true'
+TAMANHO_FILA_PIPELINE = int(os.getenv('TAMANHO_FILA_PIPELINE', '4'))
+# No incremental, pula janelas antigas cujo CSV é idêntico ao último carregado
+PULAR_JANELAS_INALTERADAS = (
+    os.getenv('PULAR_JANELAS_INALTERADAS', 'true').lower() == 'true'
+)
+
+# Funções de cada etapa no formato 'módulo:nome', resolvidas por _importar
+EXTRATORES = {
+    'general': 'extraction.reports.general_report:download_general_report',
+    'return': 'extraction.reports.return_report:download_return_report',
+}
+# Motor da transformação: 'pandas' ou 'arrow' (precisa do extra arrow; lê e
+# transforma em Arrow e carrega por COPY)
+MOTOR_TRANSFORMACAO = os.getenv('MOTOR_TRANSFORMACAO', 'pandas').lower()
+TRANSFORMER = (
+    'transformation.transformer_arrow'
+    if MOTOR_TRANSFORMACAO == 'arrow'
+    else 'transformation.transformer'
+)
+TRANSFORMADORES = {
+    'general': f'{TRANSFORMER}:transformar_general',
+    'return': f'{TRANSFORMER}:transformar_return',
+}
+CONSOLIDADORES = {
+    'general': f'{TRANSFORMER}:consolidar_general',
+    'return': f'{TRANSFORMER}:consolidar_return',
+}
+TABELAS = {
+    'general': 'general_reports',
+    'return': 'return_reports',
+}
+
+# Camadas de frescor do scheduler. 'dias' é a janela do incremental em dias
+# para trás a partir de hoje; None usa a janela padrão de cada report (60
+# dias no general, 180 no return).
+JANELA_HOT_DIAS = int(os.getenv('JANELA_HOT_DIAS', '1'))
+INTERVALO_HOT_MIN = int(os.getenv('INTERVALO_HOT_MIN', '15'))
+HORARIOS_WARM = os.getenv('HORARIOS_WARM', '08:30,12:30,17:30').split(',')
+TIERS = {
+    'hot': {'mode': 'incremental', 'dias': JANELA_HOT_DIAS},
+    'warm': {'mode': 'incremental', 'dias': None},
+    'full': {'mode': 'full', 'dias': None},
+}
+
+# Sem janela explícita, o incremental sai das marcas d'água do banco,
+# limitado à janela padrão de cada report
+JANELA_POR_WATERMARK = (
+    os.getenv('JANELA_POR_WATERMARK', 'true').lower() == 'true'
+)
+# Sonda do dia mais recente antes do incremental completo dos ciclos
+SONDA_ATIVA = os.getenv('SONDA_ATIVA', 'true').lower() == 'true'
+# Porta do endpoint /metrics (Prometheus) do scheduler; vazia desliga
+PORTA_METRICAS = os.getenv('PORTA_METRICAS')
+JANELA_MAX_DIAS = {
+    'general': 'extraction.reports.general_report:DIAS_INCREMENTAL',
+    'return': 'extraction.reports.return_report:DIAS_INCREMENTAL',
+}
+
+
+def _importar(caminho: str):
+    """
+    Importa sob demanda um atributo no formato 'módulo:nome'.
+
+    Args:
+        caminho: Caminho do atributo (ex.: EXTRATORES['general']).
+
+    Returns:
+        Função (ou valor) importada.
+    """
+    modulo, nome = caminho.split(':')
+    return getattr(importlib.import_module(modulo), nome)
+
+
+def pasta_download_report(report: str) -> str:
+    """Retorna a pasta de download exclusiva do report (modo concorrente)."""
+    return os.path.join(DOWNLOADS_DIR, report)
+
+
+def cleanup_files(
+    report_type: str,
+    downloads_dir: str | None = None,
+    manter: set[str] | None = None,
+) -> None:
+    """
+    Remove arquivos baixados e processados após sucesso do ETL.
+
+    Args:
+        report_type: Relatório ('general' ou 'return').
+        downloads_dir: Pasta dos CSVs (padrão: etl/downloads).
+        manter: Caminhos que não devem ser apagados (ex.: janelas de um
+            FULL interrompido, ainda no diário de checkpoints).
+    """
+    downloads_dir = downloads_dir or DOWNLOADS_DIR
+    manter = {os.path.abspath(c) for c in manter or ()}
 
     if report_type == 'return':
         patterns = [os.path.join(downloads_dir, 'retorno*.csv')]
@@ -59,6 +174,8 @@ def cleanup_files(report_type: str) -> None:
 
     for pattern in patterns:
         for file_path in glob.glob(pattern):
+            if os.path.abspath(file_path) in manter:
+                continue
             try:
                 os.remove(file_path)
                 logging.info(f'Removido: {file_path}')
@@ -66,118 +183,792 @@ def cleanup_files(report_type: str) -> None:
                 logging.warning(f'Não conseguiu remover {file_path}: {e}')
 
 
-def run_etl(report: str, mode: str, keep_files: bool = False) -> None:
-    """Executa uma rodada completa de ETL para o report/mode informados."""
-    logging.info(f'Iniciando ETL report={report} mode={mode}')
+def _extrair_e_preparar(
+    report: str,
+    mode: str,
+    pasta_download: str | None,
+    dias: int | None,
+    shard: tuple[int, int] | None = None,
+) -> tuple[dict, list, dict]:
+    """
+    Baixa as janelas do report enquanto uma thread prepara cada CSV pronto.
+
+    O extrator é o produtor: cada download concluído vai para uma fila
+    limitada, e o consumidor faz leitura, normalização e parse de datas sem
+    esperar as demais janelas.
+
+    No incremental, o consumidor calcula o BLAKE2b de cada CSV. Enquanto as
+    janelas mais antigas vierem idênticas à última carga (manifesto), elas
+    são puladas; a partir da primeira janela alterada tudo é preparado e
+    recarregado, então o load continua apagando ``>=`` uma única data.
+
+    Args:
+        report: Relatório ('general' ou 'return').
+        mode: Modo ('full' ou 'incremental').
+        pasta_download: Pasta de download do report.
+        dias: Janela do incremental em dias (None usa o padrão do report).
+        shard: Tupla (i, N) do FULL dividido entre containers.
+
+    Returns:
+        Tupla (resumo da extração, lista de DataFrames preparados, controle
+        com 'puladas', 'inicio_carga' e as 'impressoes' das janelas
+        preparadas).
+    """
+    preparar_arquivo = _importar(f'{TRANSFORMER}:preparar_arquivo')
+    extrator = _importar(EXTRATORES[report])
+    fila = queue.Queue(maxsize=TAMANHO_FILA_PIPELINE)
+    preparados = []
+    erros = []
+    pular = mode == 'incremental' and PULAR_JANELAS_INALTERADAS
+    anteriores = manifest.carregar(report) if pular else {}
+    controle = {'puladas': set(), 'inicio_carga': None, 'impressoes': {}}
+
+    def consumidor():
+        while True:
+            item = fila.get()
+            if item is None:
+                return
+            arquivo, data_inicio, data_fim = item
+            chave = manifest.chave(data_inicio, data_fim)
+            try:
+                impressao = manifest.impressao_digital(arquivo)
+                ja_carregados = anteriores.get(chave, {}).get('hashes', [])
+                if (
+                    controle['inicio_carga'] is None
+                    and impressao in ja_carregados
+                ):
+                    controle['puladas'].add(chave)
+                    logging.info(
+                        f'Janela {data_inicio} a {data_fim} inalterada '
+                        f'desde a última carga; pulando'
+                    )
+                    continue
+                if controle['inicio_carga'] is None:
+                    controle['inicio_carga'] = data_inicio
+                controle['impressoes'].setdefault(chave, []).append(impressao)
+                df = preparar_arquivo(report, arquivo)
+                if df is not None:
+                    preparados.append(df)
+            except Exception as e:
+                logging.exception(f'Falha preparando {arquivo}: {e}')
+                erros.append(e)
+
+    thread = threading.Thread(
+        target=consumidor, name=f'preparo-{report}', daemon=True
+    )
+    thread.start()
+    try:
+        resumo_extracao = extrator(
+            mode=mode,
+            pasta_download=pasta_download,
+            ao_concluir=lambda *janela: fila.put(janela),
+            dias=dias,
+            shard=shard,
+        )
+    finally:
+        # Sinaliza o fim mesmo se a extração falhar, para não travar a thread
+        fila.put(None)
+        thread.join()
+
+    if erros:
+        raise erros[0]
+    return resumo_extracao, preparados, controle
+
+
+def run_etl(
+    report: str,
+    mode: str,
+    keep_files: bool = False,
+    pasta_download: str | None = None,
+    dias: int | None = None,
+    shard: tuple[int, int] | None = None,
+) -> dict:
+    """
+    Executa uma rodada completa de ETL para o report/mode informados.
+
+    Args:
+        report: Relatório ('general' ou 'return').
+        mode: Modo ('full' ou 'incremental').
+        keep_files: Se True, mantém os CSVs baixados ao final.
+        pasta_download: Pasta de download do report (padrão: etl/downloads).
+        dias: Janela do incremental em dias para trás a partir de hoje
+            (padrão: janela do report). O load apaga e recarrega só essa
+            janela.
+        shard: Tupla (i, N) do FULL dividido entre containers: este processo
+            carrega só a parte do shard i, e o último shard a terminar
+            publica a tabela (ver load/shards.py).
+
+    Returns:
+        Resumo da execução com o tempo de cada etapa em segundos.
+
+    Raises:
+        ValueError: Se ``shard`` for usado fora do modo FULL.
+    """
+    from load.loader import advisory_lock
+
+    if shard is not None and mode != 'full':
+        raise ValueError('Shards só valem para o modo FULL')
+    janela_log = f' dias={dias}' if dias and mode == 'incremental' else ''
+    if shard is not None:
+        janela_log = f' shard={shard[0]}/{shard[1]}'
+    run_id = f'{datetime.now():%Y%m%d_%H%M%S}_{report}_{mode}'
+    logging.info(
+        f'Iniciando ETL report={report} mode={mode}{janela_log} '
+        f'(run_id={run_id})'
+    )
+    resumo = {
+        'report': report,
+        'mode': mode,
+        'dias': dias,
+        'run_id': run_id,
+        'etapas_s': {},
+    }
+
+    # Um report por vez no banco inteiro (local, ECS, scheduler e CLI). Os
+    # shards do FULL rodam juntos; o lock do report fica só na publicação
+    nome_lock = f'etl_sigos:{report}'
+    if shard is not None:
+        nome_lock = f'etl_sigos:{report}:shard:{shard[0]}'
+        resumo['shard'] = f'{shard[0]}/{shard[1]}'
+    with advisory_lock(nome_lock) as obtido:
+        if not obtido:
+            logging.warning(
+                f'ETL report={report} ignorado: outro processo já está '
+                'carregando este report'
+            )
+            resumo['status'] = 'ignorado_lock'
+            return resumo
+        return _run_etl_locked(
+            report, mode, keep_files, pasta_download, dias, resumo, shard
+        )
+
+
+def _run_etl_locked(
+    report: str,
+    mode: str,
+    keep_files: bool,
+    pasta_download: str | None,
+    dias: int | None,
+    resumo: dict,
+    shard: tuple[int, int] | None = None,
+) -> dict:
+    """Executa o ETL já com o advisory lock do report em mãos."""
+    from load.loader import get_engine, init_database, load_df_to_postgres
+    from load.watermarks import dias_janela_incremental
+
+    inicio = time.perf_counter()
+    nome = report.upper()
+    perfil = None
+
+    def marcar(etapa, desde):
+        resumo['etapas_s'][etapa] = round(time.perf_counter() - desde, 3)
+        perfil.fechar_etapa(etapa)
+        return time.perf_counter()
 
     try:
         init_database()
+        t = time.perf_counter()
+        # Com --profile, cada etapa marcada vira um arquivo em logs/profiles
+        perfil = profiling.SessaoPerfil(resumo['run_id'])
 
-        if report == 'general':
-            download_general_report(mode=mode)
-            logging.info('Extração GENERAL concluída')
-            df = transformar_general(mode)
-            logging.info('Transformação GENERAL concluída')
-            load_df_to_postgres(
-                df,
-                tabela='general_reports',
-                mode=mode,
-                coluna_data_execucao='DATA_EXECUCAO',
+        # Janelas explícitas (hot, --window-days) não cobrem tudo desde a
+        # última carga, então não podem avançar a marca d'água
+        avanca_watermark = dias is None
+        if mode == 'incremental' and dias is None and JANELA_POR_WATERMARK:
+            dias = dias_janela_incremental(
+                get_engine(), report, _importar(JANELA_MAX_DIAS[report])
             )
-            logging.info('Load GENERAL concluído')
-        else:  # return
-            download_return_report(mode=mode)
-            logging.info('Extração RETURN concluída')
-            df = transformar_return(mode)
-            logging.info('Transformação RETURN concluída')
-            load_df_to_postgres(
-                df,
-                tabela='return_reports',
+            resumo['dias'] = dias
+        extraido_em = datetime.now()
+        if shard is not None:
+            from load import shards
+
+            execucao = shards.execucao_atual()
+            resumo['execucao_shards'] = execucao
+            shards.iniciar_shard(
+                get_engine(),
+                report,
+                TABELAS[report],
+                execucao,
+                shard,
+                extraido_em,
+            )
+
+        controle = None
+        if PIPELINE_JANELAS:
+            (
+                resumo['extracao'],
+                preparados,
+                controle,
+            ) = _extrair_e_preparar(
+                report, mode, pasta_download, dias, shard
+            )
+            resumo['janelas_puladas'] = len(controle['puladas'])
+            resumo['janelas_carregadas'] = len(controle['impressoes'])
+            logging.info(
+                f'Extração + preparo {nome} concluídos '
+                f'({len(preparados)} arquivo(s), '
+                f'{resumo["janelas_puladas"]} janela(s) inalterada(s))'
+            )
+            t = marcar('extract_transform', t)
+            if controle['inicio_carga'] is None and controle['puladas']:
+                return _concluir_sem_mudancas(
+                    report,
+                    mode,
+                    keep_files,
+                    pasta_download,
+                    resumo,
+                    extraido_em if avanca_watermark else None,
+                    inicio,
+                )
+            # Um shard pode ficar sem janela nenhuma (mais shards que
+            # janelas); ele só registra a conclusão
+            df = None
+            if preparados or shard is None:
+                df = _importar(CONSOLIDADORES[report])(preparados)
+            logging.info(f'Consolidação {nome} concluída')
+            t = marcar('consolidate', t)
+        else:
+            resumo['extracao'] = _importar(EXTRATORES[report])(
                 mode=mode,
-                coluna_data_execucao='DATA_EXECUCAO',
+                pasta_download=pasta_download,
+                dias=dias,
+                shard=shard,
             )
-            logging.info('Load RETURN concluído')
+            logging.info(f'Extração {nome} concluída')
+            t = marcar('extract', t)
+            df = None
+            if resumo['extracao'].get('janelas') or shard is None:
+                transformar = _importar(TRANSFORMADORES[report])
+                df = transformar(mode, pasta=pasta_download)
+            logging.info(f'Transformação {nome} concluída')
+            t = marcar('transform', t)
+
+        # Qualidade antes de qualquer TRUNCATE/DELETE: uma extração ruim
+        # para aqui, com os dados antigos intactos no banco
+        if df is not None:
+            from transformation import qualidade
+
+            try:
+                relatorio = qualidade.validar(df, TABELAS[report])
+            except ValueError:
+                resumo['status'] = 'bloqueado_qualidade'
+                raise
+            resumo['qualidade'] = {
+                nome: v['quantidade']
+                for nome, v in relatorio['violacoes'].items()
+            }
+            t = marcar('qualidade', t)
+
+        # FULL dividido: a parte do shard vai para o staging, e o último
+        # shard a terminar publica a tabela inteira
+        if shard is not None:
+            resumo['linhas'], resumo['publicado'] = _carregar_shard(
+                report, df, resumo['extracao'], shard, execucao
+            )
+            logging.info(f'Load {nome} (shard {resumo["shard"]}) concluído')
+            t = marcar('load', t)
+            if not keep_files:
+                cleanup_files(report, pasta_download)
+            resumo['status'] = 'sucesso'
+            resumo['total_s'] = round(time.perf_counter() - inicio, 3)
+            situacao = (
+                'publicou a tabela'
+                if resumo['publicado']
+                else 'aguardando os demais shards'
+            )
+            logging.info(
+                f'Shard {resumo["shard"]} de {nome} finalizado em '
+                f'{resumo["total_s"]:.1f}s ({situacao})'
+            )
+            return resumo
+
+        # O incremental recarrega exatamente a janela que foi baixada, a
+        # partir da primeira janela alterada
+        inicio_janela, fim_janela = (
+            datetime.strptime(d, '%d/%m/%Y').date()
+            for d in resumo['extracao']['janela']
+        )
+        data_inicio_carga = inicio_janela
+        if controle is not None and controle['inicio_carga'] is not None:
+            data_inicio_carga = datetime.strptime(
+                controle['inicio_carga'], '%d/%m/%Y'
+            ).date()
+
+        # O FULL trunca a tabela; se o insert falhar, nenhuma janela pode
+        # ser pulada na próxima execução
+        if mode == 'full' or controle is None:
+            manifest.limpar(report)
+
+        load_df_to_postgres(
+            df,
+            tabela=TABELAS[report],
+            mode=mode,
+            coluna_data_execucao='DATA_EXECUCAO',
+            data_inicio_carga=(
+                data_inicio_carga if mode == 'incremental' else None
+            ),
+            watermark=(
+                {
+                    'report': report,
+                    'mode': mode,
+                    'ultima_carga': extraido_em,
+                    'inicio_janela': inicio_janela,
+                    'fim_janela': fim_janela,
+                    'linhas': len(df),
+                }
+                if avanca_watermark
+                else None
+            ),
+        )
+        logging.info(f'Load {nome} concluído')
+        t = marcar('load', t)
+
+        resumo['linhas'] = len(df)
+
+        if controle is not None:
+            manifest.registrar_carregados(report, controle['impressoes'])
 
-        if not keep_files:
-            cleanup_files(report)
-            logging.info('Limpeza de arquivos concluída')
+        _descartar_downloads(report, mode, keep_files, pasta_download)
 
-        logging.info('ETL finalizado com sucesso')
+        resumo['status'] = 'sucesso'
+        resumo['total_s'] = round(time.perf_counter() - inicio, 3)
+        logging.info(
+            f'ETL finalizado com sucesso em {resumo["total_s"]:.1f}s '
+            f'(etapas: {resumo["etapas_s"]})'
+        )
+        return resumo
     except Exception as e:
         logging.exception(f'Falha durante o ETL: {e}')
         raise
+    finally:
+        status = resumo.get('status', 'falha')
+        metrics.incrementar(
+            'etl_execucoes_total', report=report, status=status
+        )
+        metrics.observar(
+            'etl_execucao_seconds', time.perf_counter() - inicio, report=report
+        )
+        # Um shard que não publicou ainda não atualizou a tabela
+        publicou = resumo.get('publicado', True)
+        if status in ('sucesso', 'sem_mudancas') and publicou:
+            metrics.definir(
+                'etl_ultimo_sucesso_timestamp_seconds',
+                time.time(),
+                report=report,
+            )
+        if perfil is not None:
+            if perfil.arquivos:
+                resumo['profiles'] = perfil.arquivos
+            perfil.encerrar()
 
 
-def run_incremental_cycle() -> None:
-    """Roda um ciclo incremental: GENERAL -> RETURN."""
-    logging.info('======== Iniciando ciclo incremental ========')
+def _carregar_shard(
+    report: str,
+    df,
+    extracao: dict,
+    shard: tuple[int, int],
+    execucao: str,
+) -> tuple[int, bool]:
+    """
+    Grava a parte do shard no staging e registra a conclusão.
+
+    Args:
+        report: Relatório ('general' ou 'return').
+        df: DataFrame consolidado do shard (None se ficou sem janelas).
+        extracao: Resumo da extração, com 'janela' e 'janelas'.
+        shard: Tupla (i, N).
+        execucao: Identificador da execução sharded.
+
+    Returns:
+        Tupla (linhas gravadas no staging, se este shard publicou a tabela).
+    """
+    from load import shards
+    from load.loader import get_engine, load_df_to_postgres
+
+    tabela = TABELAS[report]
+    linhas = 0
+    if df is not None:
+        df = shards.filtrar_dias_do_shard(
+            df, extracao['janelas'], extracao['janela'][1]
+        )
+        load_df_to_postgres(
+            df,
+            tabela=shards.tabela_staging(tabela, shard[0]),
+            mode='full',
+            coluna_data_execucao='DATA_EXECUCAO',
+        )
+        linhas = len(df)
+
+    inicio_janela, fim_janela = (
+        datetime.strptime(d, '%d/%m/%Y').date() for d in extracao['janela']
+    )
+    publicado = shards.concluir_shard(
+        get_engine(),
+        report,
+        tabela,
+        execucao,
+        shard,
+        linhas,
+        inicio_janela,
+        fim_janela,
+    )
+    return linhas, publicado
+
+
+def _descartar_downloads(
+    report: str, mode: str, keep_files: bool, pasta_download: str | None
+) -> None:
+    """
+    Descarta o diário de checkpoints e os CSVs depois de uma carga.
+
+    Só o FULL apaga o diário: um hot/warm que roda depois de um FULL
+    interrompido não pode levar embora a retomada dele, nem os CSVs das
+    janelas que o diário ainda aponta.
+    """
+    # Só depois do load as janelas baixadas deixam de ser necessárias
+    if mode == 'full':
+        checkpoint.limpar(report)
+    if not keep_files:
+        manter = {e['arquivo'] for e in checkpoint.entradas_validas(report)}
+        cleanup_files(report, pasta_download, manter=manter)
+        logging.info('Limpeza de arquivos concluída')
+
+
+def _concluir_sem_mudancas(
+    report: str,
+    mode: str,
+    keep_files: bool,
+    pasta_download: str | None,
+    resumo: dict,
+    extraido_em: datetime | None,
+    inicio: float,
+) -> dict:
+    """
+    Finaliza uma execução em que todas as janelas vieram inalteradas.
+
+    Nada é transformado nem carregado; só a marca d'água avança (quando a
+    janela veio das marcas d'água), já que o banco está em dia.
+    """
+    if extraido_em is not None:
+        from load.loader import get_engine
+        from load.watermarks import registrar_watermark
+
+        inicio_janela, fim_janela = (
+            datetime.strptime(d, '%d/%m/%Y').date()
+            for d in resumo['extracao']['janela']
+        )
+        with get_engine().begin() as conn:
+            registrar_watermark(
+                conn,
+                report=report,
+                mode=mode,
+                ultima_carga=extraido_em,
+                inicio_janela=inicio_janela,
+                fim_janela=fim_janela,
+                linhas=0,
+            )
+
+    _descartar_downloads(report, mode, keep_files, pasta_download)
+
+    resumo['linhas'] = 0
+    resumo['status'] = 'sem_mudancas'
+    resumo['total_s'] = round(time.perf_counter() - inicio, 3)
+    logging.info(
+        f'ETL {report.upper()} sem mudanças: {resumo["janelas_puladas"]} '
+        f'janela(s) idêntica(s) à última carga, transform e load pulados '
+        f'({resumo["total_s"]:.1f}s)'
+    )
+    return resumo
+
+
+def _sondar_report(report: str) -> tuple[dict | None, bool]:
+    """
+    Exporta o dia mais recente e decide se o incremental completo é pulado.
+
+    Uma falha na sonda nunca impede o ciclo: o incremental roda normalmente.
+
+    Args:
+        report: Relatório ('general' ou 'return').
+
+    Returns:
+        Tupla (sonda feita ou None, se o incremental pode ser pulado).
+    """
     try:
-        run_etl(report='general', mode='incremental', keep_files=False)
-    except Exception:
-        logging.error('Erro ao executar GENERAL incremental no ciclo')
+        from load.loader import get_engine
+        from load.watermarks import ultima_sincronizacao
+
+        anterior = probe.carregar_sonda(report)
+        atual = probe.sondar(
+            report,
+            _importar(EXTRATORES[report]),
+            os.path.join(DOWNLOADS_DIR, 'sonda', report),
+        )
+        pular, motivo = probe.decidir(
+            anterior, atual, ultima_sincronizacao(get_engine(), report)
+        )
+    except Exception as e:
+        logging.warning(f'[SONDA] {report}: falha na sonda ({e}); rodando')
+        metrics.incrementar(
+            'etl_sonda_decisoes_total', report=report, decisao='falha'
+        )
+        return None, False
 
+    metrics.incrementar(
+        'etl_sonda_decisoes_total',
+        report=report,
+        decisao='pular' if pular else 'rodar',
+    )
+    logging.info(
+        f'[SONDA] {report}: {"pulando" if pular else "rodando"} o '
+        f'incremental completo: {motivo}'
+    )
+    return atual, pular
+
+
+def _run_report_isolado(
+    report: str,
+    mode: str,
+    concorrente: bool,
+    dias: int | None = None,
+    shard: tuple[int, int] | None = None,
+) -> None:
+    """Roda o ETL de um report sem deixar a falha derrubar o ciclo."""
+    pasta = pasta_download_report(report) if concorrente else None
     try:
-        run_etl(report='return', mode='incremental', keep_files=False)
+        # Só o incremental da janela completa passa pela sonda
+        sonda = None
+        if mode == 'incremental' and dias is None and SONDA_ATIVA:
+            sonda, pular = _sondar_report(report)
+            if pular:
+                return
+        resumo = run_etl(
+            report=report,
+            mode=mode,
+            keep_files=False,
+            pasta_download=pasta,
+            dias=dias,
+            shard=shard,
+        )
+        if sonda is not None and resumo.get('status') in (
+            'sucesso',
+            'sem_mudancas',
+        ):
+            probe.salvar_sonda(report, sonda)
     except Exception:
-        logging.error('Erro ao executar RETURN incremental no ciclo')
+        logging.error(f'Erro ao executar {report.upper()} {mode} no ciclo')
+
+
+def _run_cycle(
+    mode: str,
+    concorrente: bool,
+    dias: int | None = None,
+    shard: tuple[int, int] | None = None,
+) -> None:
+    """
+    Roda GENERAL e RETURN no modo informado, em sequência ou em paralelo.
+
+    No modo concorrente cada report baixa em uma pasta própria e segue para
+    transformação e load sem esperar o outro terminar a extração.
+
+    Args:
+        mode: Modo ('full' ou 'incremental').
+        concorrente: Se True, roda os dois reports em threads separadas.
+        dias: Janela do incremental em dias (None usa o padrão do report).
+        shard: Tupla (i, N) do FULL dividido entre containers.
+    """
+    inicio = time.perf_counter()
+    reports = ['general', 'return']
+
+    if concorrente:
+        # Cria as tabelas antes para as threads não disputarem o DDL
+        try:
+            from load.loader import init_database
+
+            init_database()
+        except Exception:
+            logging.exception('Falha inicializando o banco antes do ciclo')
+        with ThreadPoolExecutor(
+            max_workers=len(reports), thread_name_prefix='etl'
+        ) as executor:
+            for report in reports:
+                executor.submit(
+                    _run_report_isolado, report, mode, True, dias, shard
+                )
+    else:
+        for report in reports:
+            _run_report_isolado(report, mode, False, dias, shard)
+
+    duracao = time.perf_counter() - inicio
+    metrics.observar('etl_ciclo_seconds', duracao, mode=mode)
+    logging.info(
+        f'Ciclo {mode} ({"concorrente" if concorrente else "sequencial"}) '
+        f'levou {duracao:.1f}s'
+    )
+
 
+def run_incremental_cycle(concorrente: bool = CICLO_CONCORRENTE) -> None:
+    """Roda um ciclo incremental: GENERAL -> RETURN (ou em paralelo)."""
+    logging.info('======== Iniciando ciclo incremental ========')
+    _run_cycle('incremental', concorrente)
     logging.info('======== Fim do ciclo incremental ========')
 
 
-def run_full_cycle() -> None:
-    """Roda um ciclo FULL: GENERAL -> RETURN."""
+def run_full_cycle(
+    concorrente: bool = CICLO_CONCORRENTE,
+    shard: tuple[int, int] | None = None,
+) -> None:
+    """Roda um ciclo FULL: GENERAL -> RETURN (ou em paralelo)."""
     logging.info('======== Iniciando ciclo FULL ========')
-    try:
-        run_etl(report='general', mode='full', keep_files=False)
-    except Exception:
-        logging.error('Erro ao executar GENERAL full no ciclo')
+    _run_cycle('full', concorrente, shard=shard)
+    logging.info('======== Fim do ciclo FULL ========')
 
-    try:
-        run_etl(report='return', mode='full', keep_files=False)
-    except Exception:
-        logging.error('Erro ao executar RETURN full no ciclo')
 
-    logging.info('======== Fim do ciclo FULL ========')
+def run_tier_cycle(tier: str, concorrente: bool = CICLO_CONCORRENTE) -> None:
+    """
+    Roda o ciclo de uma camada de frescor (ver TIERS).
+
+    Args:
+        tier: 'hot' (hoje e ontem), 'warm' (janela padrão do incremental) ou
+            'full'.
+        concorrente: Se True, roda os dois reports em threads separadas.
+    """
+    config = TIERS[tier]
+    logging.info(f'======== Iniciando ciclo {tier} ========')
+    _run_cycle(config['mode'], concorrente, config['dias'])
+    logging.info(f'======== Fim do ciclo {tier} ========')
+
+
+def _horarios_hot(horarios_warm: list[str]) -> list[str]:
+    """
+    Monta os horários do ciclo hot (08:00 até 17:45) fora dos do warm.
+
+    Args:
+        horarios_warm: Horários 'HH:MM' já ocupados pelo ciclo warm.
+
+    Returns:
+        Lista de horários 'HH:MM' a cada INTERVALO_HOT_MIN minutos.
+    """
+    return [
+        f'{h:02d}:{m:02d}'
+        for h in range(8, 18)
+        for m in range(0, 60, INTERVALO_HOT_MIN)
+        if f'{h:02d}:{m:02d}' not in horarios_warm
+    ]
 
 
 def start_scheduler() -> None:
     """
     Configura e inicia o agendador de tarefas.
 
-    - Segunda a sábado: incrementais de hora em hora (08:30 até 17:30)
+    - Segunda a sábado, a cada 15 minutos (08:00 até 17:45): ciclo hot,
+      só hoje e ontem
+    - Segunda a sábado, em HORARIOS_WARM: ciclo warm, janela completa do
+      incremental (60 dias no general, 180 no return)
     - Domingo às 10:00: full (general + return)
+
+    Os ciclos rodam em threads do MotorAgendamento, então o tick de 10s do
+    loop principal nunca fica bloqueado. Hot, warm e full dividem o mesmo
+    grupo de sobreposição, porque baixam na mesma pasta: um ciclo que ainda
+    está rodando no horário de qualquer um deles faz o disparo ser pulado
+    (ou coalescido, conforme POLITICA_SOBREPOSICAO). Cada report só roda
+    com o advisory lock do Postgres, evitando que dois containers carreguem
+    a mesma tabela.
+
+    Um navegador fica aquecido no pool entre os ciclos; a cada 5 minutos o
+    pool passa por health check, reciclagem por memória e rotação por idade.
+
+    Com PORTA_METRICAS definida, as métricas do processo ficam expostas em
+    ``/metrics`` no formato do Prometheus.
     """
     setup_logging()
     logging.info('Iniciando scheduler de ETL')
 
-    # Ciclo incremental: segunda a sábado, das 08:30 até 17:30
-    horarios = [f'{h:02d}:30' for h in range(8, 18)]
-    for h in horarios:
-        schedule.every().monday.at(h).do(run_incremental_cycle)
-        schedule.every().tuesday.at(h).do(run_incremental_cycle)
-        schedule.every().wednesday.at(h).do(run_incremental_cycle)
-        schedule.every().thursday.at(h).do(run_incremental_cycle)
-        schedule.every().friday.at(h).do(run_incremental_cycle)
-        schedule.every().saturday.at(h).do(run_incremental_cycle)
+    if PORTA_METRICAS:
+        metrics.iniciar_servidor(int(PORTA_METRICAS))
 
+    motor = MotorAgendamento(max_workers=3)
+    dias_uteis = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado']
+
+    # Ciclo warm: janela completa do incremental algumas vezes ao dia
+    motor.agendar(
+        'warm',
+        dias_uteis,
+        HORARIOS_WARM,
+        partial(run_tier_cycle, 'warm'),
+        grupo='ciclo',
+    )
+    logging.info(
+        f"Ciclo warm agendado para segunda a sábado nos horários: {', '.join(HORARIOS_WARM)}"
+    )
+
+    # Ciclo hot: hoje e ontem a cada 15 minutos, fora dos horários do warm
+    horarios_hot = _horarios_hot(HORARIOS_WARM)
+    motor.agendar(
+        'hot',
+        dias_uteis,
+        horarios_hot,
+        partial(run_tier_cycle, 'hot'),
+        grupo='ciclo',
+    )
     logging.info(
-        f"Ciclo incremental agendado para segunda a sábado nos horários: {', '.join(horarios)}"
+        f'Ciclo hot ({JANELA_HOT_DIAS} dia(s)) agendado para segunda a '
+        f'sábado a cada {INTERVALO_HOT_MIN} minutos, das 08:00 às 17:45'
     )
 
     # Ciclo FULL: domingo às 10:00
-    schedule.every().sunday.at('10:00').do(run_full_cycle)
+    motor.agendar(
+        'full', ['domingo'], ['10:00'], run_full_cycle, grupo='ciclo'
+    )
     logging.info('Ciclo FULL agendado para domingo às 10:00')
 
+    # Mantém um Chromium aquecido entre os ciclos. Com POOL_TAMANHO=0 o
+    # scheduler fica sem pool e o Selenium só é importado no primeiro ciclo
+    pool = None
+    if POOL_TAMANHO > 0:
+        from extraction.core.browser import ativar_pool
+
+        pool = ativar_pool(tamanho=2 if CICLO_CONCORRENTE else None)
+        motor.agendar_a_cada('manutencao_pool', 5, pool.aquecer)
+        threading.Thread(target=pool.aquecer, daemon=True).start()
+
     logging.info('Scheduler iniciado. Aguardando horários...')
 
     try:
         while True:
-            schedule.run_pending()
+            motor.tick()
             time.sleep(10)
     except KeyboardInterrupt:
         logging.info(
             'Scheduler interrompido manualmente (Ctrl+C). Encerrando.'
         )
+    finally:
+        motor.encerrar()
+        if pool is not None:
+            from extraction.core.browser import encerrar_pool
+
+            encerrar_pool()
+
+
+def _parse_shard(texto: str) -> tuple[int, int]:
+    """
+    Converte o argumento ``--shard`` ('i/N', com i de 1 a N) em tupla.
+
+    Raises:
+        argparse.ArgumentTypeError: Se o formato ou os números forem
+            inválidos.
+    """
+    try:
+        indice, total = (int(parte) for parte in texto.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Shard inválido: {texto} (use 'i/N', ex.: 2/4)"
+        )
+    if not 1 <= indice <= total:
+        raise argparse.ArgumentTypeError(
+            f'Shard inválido: {texto} (i deve ir de 1 a N)'
+        )
+    return indice, total
 
 
 def parse_args() -> argparse.Namespace:
@@ -214,40 +1005,89 @@ def parse_args() -> argparse.Namespace:
         action='store_true',
         help='Executa o ciclo FULL completo (General + Return)',
     )
+    parser.add_argument(
+        '--tier',
+        choices=list(TIERS),
+        help='Executa o ciclo de uma camada de frescor (hot, warm ou full)',
+    )
+    parser.add_argument(
+        '--window-days',
+        type=int,
+        help='Com --report e --mode incremental, janela em dias para trás',
+    )
+    parser.add_argument(
+        '--concurrent',
+        action='store_true',
+        help='Nos ciclos, roda General e Return em paralelo',
+    )
+    parser.add_argument(
+        '--shard',
+        type=_parse_shard,
+        help='No FULL, roda só o shard i de N (ex.: 2/4) entre containers',
+    )
+    parser.add_argument(
+        '--profile',
+        choices=profiling.PERFIS,
+        help='Perfila cada etapa do ETL (arquivos em logs/profiles)',
+    )
 
     args = parser.parse_args()
 
     # Validação: precisa de pelo menos um modo de execução
-    if not any([args.scheduler, args.cycle_incremental, args.cycle_full, args.report]):
+    if not any(
+        [
+            args.scheduler,
+            args.cycle_incremental,
+            args.cycle_full,
+            args.tier,
+            args.report,
+        ]
+    ):
         parser.error(
-            'Você deve informar --report e --mode, --scheduler, --cycle-incremental ou --cycle-full.'
+            'Você deve informar --report e --mode, --scheduler, --tier, --cycle-incremental ou --cycle-full.'
         )
 
     # Se usar report, precisa de mode
     if args.report and not args.mode:
         parser.error('Ao usar --report, você deve informar --mode também.')
 
+    if args.shard and not (args.cycle_full or args.mode == 'full'):
+        parser.error('--shard só vale com --cycle-full ou --mode full.')
+
     return args
 
 
 def main() -> None:
     """Ponto de entrada principal da aplicação."""
     args = parse_args()
+    if args.profile:
+        profiling.configurar(args.profile)
 
     if args.scheduler:
         start_scheduler()
     elif args.cycle_incremental:
         setup_logging()
-        run_incremental_cycle()
+        run_incremental_cycle(
+            concorrente=args.concurrent or CICLO_CONCORRENTE
+        )
     elif args.cycle_full:
         setup_logging()
-        run_full_cycle()
+        run_full_cycle(
+            concorrente=args.concurrent or CICLO_CONCORRENTE, shard=args.shard
+        )
+    elif args.tier:
+        setup_logging()
+        run_tier_cycle(
+            args.tier, concorrente=args.concurrent or CICLO_CONCORRENTE
+        )
     else:
         setup_logging()
         run_etl(
             report=args.report,
             mode=args.mode,
             keep_files=bool(args.keep_files),
+            dias=args.window_days,
+            shard=args.shard,
         )
 
 
@@ -0,0 +1,242 @@
+"""Módulo com as métricas do ETL (contadores, gauges e histogramas).
+
+As métricas ficam em memória no processo e podem ser expostas no formato
+texto do Prometheus por um endpoint HTTP opcional (``iniciar_servidor``),
+usado no modo ``--scheduler``.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos histogramas de duração
+BUCKETS_PADRAO = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+_lock = threading.Lock()
+_contadores = {}
+_gauges = {}
+_histogramas = {}
+
+
+def _chave(nome, rotulos):
+    """Monta a chave do contador a partir do nome e dos rótulos."""
+    return nome, tuple(sorted(rotulos.items()))
+
+
+def incrementar(nome, valor=1, **rotulos):
+    """
+    Soma ``valor`` ao contador ``nome`` com os rótulos informados.
+
+    Args:
+        nome: Nome da métrica (ex.: 'etl_sonda_decisoes_total').
+        valor: Quanto somar (padrão: 1).
+        **rotulos: Rótulos da série (ex.: report='general').
+    """
+    chave = _chave(nome, rotulos)
+    with _lock:
+        _contadores[chave] = _contadores.get(chave, 0) + valor
+
+
+def valor(nome, **rotulos):
+    """
+    Retorna o valor atual de um contador (0 se nunca incrementado).
+
+    Args:
+        nome: Nome da métrica.
+        **rotulos: Rótulos da série.
+    """
+    with _lock:
+        return _contadores.get(_chave(nome, rotulos), 0)
+
+
+def definir(nome, valor, **rotulos):
+    """
+    Define o valor atual de um gauge.
+
+    Gauges terminados em ``_timestamp_seconds`` também são exportados como
+    ``<prefixo>_idade_seconds``, calculado na hora da coleta (ex.: tempo
+    desde a última carga bem-sucedida).
+
+    Args:
+        nome: Nome da métrica (ex.: 'etl_pool_rss_bytes').
+        valor: Valor atual.
+        **rotulos: Rótulos da série.
+    """
+    with _lock:
+        _gauges[_chave(nome, rotulos)] = valor
+
+
+def remover(nome, **rotulos):
+    """
+    Remove a série de um gauge (ex.: navegador que saiu do pool).
+
+    Args:
+        nome: Nome da métrica.
+        **rotulos: Rótulos da série.
+    """
+    with _lock:
+        _gauges.pop(_chave(nome, rotulos), None)
+
+
+def observar(nome, valor, buckets=BUCKETS_PADRAO, **rotulos):
+    """
+    Registra uma observação em um histograma.
+
+    Args:
+        nome: Nome da métrica (ex.: 'etl_download_janela_seconds').
+        valor: Valor observado.
+        buckets: Limites superiores dos buckets (usados na primeira
+            observação da série).
+        **rotulos: Rótulos da série.
+    """
+    chave = _chave(nome, rotulos)
+    with _lock:
+        hist = _histogramas.get(chave)
+        if hist is None:
+            hist = _histogramas[chave] = {
+                'buckets': tuple(buckets),
+                'contagens': [0] * len(buckets),
+                'soma': 0.0,
+                'total': 0,
+            }
+        for i, limite in enumerate(hist['buckets']):
+            if valor <= limite:
+                hist['contagens'][i] += 1
+        hist['soma'] += valor
+        hist['total'] += 1
+
+
+def snapshot():
+    """
+    Retorna uma cópia de todos os contadores.
+
+    Returns:
+        Dicionário {(nome, ((rótulo, valor), ...)): valor}.
+    """
+    with _lock:
+        return dict(_contadores)
+
+
+def _escapar(valor):
+    """Escapa barra, aspas e quebra de linha no valor de um rótulo."""
+    texto = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+    return texto.replace('\n', '\\n')
+
+
+def _formatar_rotulos(rotulos, extra=()):
+    """Formata os rótulos no padrão do Prometheus ({a="1",b="2"})."""
+    pares = list(rotulos) + list(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+
+def _agrupar(series):
+    """Agrupa {(nome, rótulos): valor} por nome, em ordem alfabética."""
+    grupos = {}
+    for (nome, rotulos), valor in sorted(series.items()):
+        grupos.setdefault(nome, []).append((rotulos, valor))
+    return grupos
+
+
+def exportar_prometheus(agora=None):
+    """
+    Monta o texto das métricas no formato de exposição do Prometheus.
+
+    Args:
+        agora: Epoch de referência para as idades (padrão: agora).
+
+    Returns:
+        Texto pronto para servir em /metrics.
+    """
+    agora = time.time() if agora is None else agora
+    with _lock:
+        contadores = dict(_contadores)
+        gauges = dict(_gauges)
+        histogramas = {
+            k: {**h, 'contagens': list(h['contagens'])}
+            for k, h in _histogramas.items()
+        }
+
+    idades = {
+        (nome[: -len('_timestamp_seconds')] + '_idade_seconds', rotulos): (
+            agora - instante
+        )
+        for (nome, rotulos), instante in gauges.items()
+        if nome.endswith('_timestamp_seconds')
+    }
+
+    linhas = []
+    for tipo, series in (
+        ('counter', contadores),
+        ('gauge', {**gauges, **idades}),
+    ):
+        for nome, valores in _agrupar(series).items():
+            linhas.append(f'# TYPE {nome} {tipo}')
+            for rotulos, valor in valores:
+                linhas.append(
+                    f'{nome}{_formatar_rotulos(rotulos)} {valor:.15g}'
+                )
+
+    for nome, valores in _agrupar(histogramas).items():
+        linhas.append(f'# TYPE {nome} histogram')
+        for rotulos, hist in valores:
+            for limite, qtd in zip(hist['buckets'], hist['contagens']):
+                le = _formatar_rotulos(rotulos, [('le', f'{limite:g}')])
+                linhas.append(f'{nome}_bucket{le} {qtd}')
+            inf = _formatar_rotulos(rotulos, [('le', '+Inf')])
+            linhas.append(f'{nome}_bucket{inf} {hist["total"]}')
+            linhas.append(
+                f'{nome}_sum{_formatar_rotulos(rotulos)} {hist["soma"]:.15g}'
+            )
+            linhas.append(
+                f'{nome}_count{_formatar_rotulos(rotulos)} {hist["total"]}'
+            )
+    return '\n'.join(linhas) + '\n'
+
+
+def iniciar_servidor(porta, endereco='0.0.0.0'):
+    """
+    Sobe o endpoint ``/metrics`` em uma thread daemon.
+
+    Args:
+        porta: Porta TCP (0 escolhe uma livre).
+        endereco: Endereço de escuta (padrão: todas as interfaces).
+
+    Returns:
+        Instância do servidor (``server_address`` tem a porta real).
+    """
+    # Só o scheduler com métricas ligadas paga o import do http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Serve ``/metrics`` no formato texto do Prometheus."""
+
+        def log_message(self, formato, *args):
+            """Silencia o log de acesso padrão do http.server."""
+
+        def do_GET(self):
+            """Responde /metrics; qualquer outro caminho é 404."""
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            corpo = exportar_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header(
+                'Content-Type', 'text/plain; version=0.0.4; charset=utf-8'
+            )
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+    servidor = ThreadingHTTPServer((endereco, porta), MetricsHandler)
+    threading.Thread(
+        target=servidor.serve_forever, name='metrics-http', daemon=True
+    ).start()
+    logger.info(
+        f'[METRICS] Endpoint em http://{endereco}:'
+        f'{servidor.server_address[1]}/metrics'
+    )
+    return servidor
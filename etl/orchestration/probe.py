@@ -0,0 +1,157 @@
+"""Módulo com a sonda barata que decide se o incremental precisa rodar."""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from extraction.core.manifest import impressao_digital
+from extraction.core.utils import contar_linhas_csv
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = os.path.join(os.getcwd(), 'etl', 'state')
+
+# Janela exportada pela sonda (dias para trás a partir de hoje)
+SONDA_DIAS = int(os.getenv('SONDA_DIAS', '1'))
+# Idade máxima da última sincronização da janela completa para pular
+SONDA_MAX_IDADE_MIN = float(os.getenv('SONDA_MAX_IDADE_MIN', '180'))
+
+
+def _caminho_estado(report):
+    """Retorna o caminho do arquivo com a última sonda do relatório."""
+    return os.path.join(STATE_DIR, f'probe_{report}.json')
+
+
+def carregar_sonda(report):
+    """
+    Carrega o resultado da última sonda aceita do relatório.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+
+    Returns:
+        Dicionário com 'hash', 'linhas' e 'sondado_em', ou None.
+    """
+    caminho = _caminho_estado(report)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def salvar_sonda(report, sonda):
+    """
+    Guarda a sonda como referência para a próxima comparação.
+
+    Chamado só depois que o incremental correspondente terminou bem, para
+    uma falha no load não esconder mudanças na próxima sonda.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        sonda: Resultado de ``sondar``.
+    """
+    os.makedirs(STATE_DIR, exist_ok=True)
+    caminho = _caminho_estado(report)
+    tmp = f'{caminho}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(sonda, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, caminho)
+
+
+def sondar(report, extrator, pasta):
+    """
+    Exporta só o dia mais recente e resume o resultado em hash e linhas.
+
+    Args:
+        report: Nome do relatório ('general' ou 'return').
+        extrator: Função de download do report (ex.: download_general_report).
+        pasta: Pasta exclusiva da sonda; os CSVs são apagados no final.
+
+    Returns:
+        Dicionário com 'hash', 'linhas' e 'sondado_em'.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    for antigo in glob.glob(os.path.join(pasta, '*.csv')):
+        os.remove(antigo)
+
+    arquivos = []
+    extrator(
+        mode='incremental',
+        pasta_download=pasta,
+        ao_concluir=lambda arquivo, *_: arquivos.append(arquivo),
+        dias=SONDA_DIAS,
+    )
+
+    h = hashlib.blake2b(digest_size=20)
+    linhas = 0
+    for arquivo in sorted(arquivos):
+        h.update(impressao_digital(arquivo).encode('ascii'))
+        linhas += contar_linhas_csv(arquivo)
+        os.remove(arquivo)
+
+    return {
+        'report': report,
+        'hash': h.hexdigest(),
+        'linhas': linhas,
+        'sondado_em': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def decidir(
+    anterior,
+    atual,
+    ultima_sincronizacao,
+    agora=None,
+    max_idade_min=None,
+):
+    """
+    Decide se o incremental completo pode ser pulado.
+
+    Pula só quando o dia mais recente está idêntico à sonda anterior e a
+    janela completa foi sincronizada há pouco tempo.
+
+    Args:
+        anterior: Última sonda aceita (ou None).
+        atual: Sonda recém-feita.
+        ultima_sincronizacao: Datetime da última carga da janela completa
+            (marca d'água), ou None.
+        agora: Datetime de referência (padrão: agora).
+        max_idade_min: Idade máxima da sincronização, em minutos
+            (padrão: SONDA_MAX_IDADE_MIN).
+
+    Returns:
+        Tupla (pular, motivo).
+    """
+    agora = agora or datetime.now()
+    if max_idade_min is None:
+        max_idade_min = SONDA_MAX_IDADE_MIN
+
+    if anterior is None:
+        return False, 'sem sonda anterior'
+    if (
+        atual['hash'] != anterior['hash']
+        or atual['linhas'] != anterior['linhas']
+    ):
+        return False, (
+            f'dia mais recente mudou ({anterior["linhas"]} -> '
+            f'{atual["linhas"]} linhas)'
+        )
+    if ultima_sincronizacao is None:
+        return False, 'janela completa nunca sincronizada'
+
+    idade_min = (agora - ultima_sincronizacao).total_seconds() / 60
+    if idade_min > max_idade_min:
+        return False, (
+            f'janela completa sincronizada há {idade_min:.0f}min '
+            f'(> {max_idade_min:.0f}min)'
+        )
+    return True, (
+        f'dia mais recente inalterado ({atual["linhas"]} linhas) e janela '
+        f'completa sincronizada há {idade_min:.0f}min'
+    )
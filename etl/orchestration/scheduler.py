@@ -0,0 +1,166 @@
+"""Módulo com o motor de agendamento do modo scheduler."""
+
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import schedule
+
+logger = logging.getLogger(__name__)
+
+# O que fazer quando um job dispara com a execução anterior ainda rodando:
+# 'pular' descarta o disparo; 'coalescer' junta os disparos atrasados em
+# uma única execução logo após a atual terminar.
+POLITICA_SOBREPOSICAO = os.getenv('POLITICA_SOBREPOSICAO', 'pular').lower()
+
+DIAS_SEMANA = {
+    'segunda': 0,
+    'terca': 1,
+    'quarta': 2,
+    'quinta': 3,
+    'sexta': 4,
+    'sabado': 5,
+    'domingo': 6,
+}
+
+
+class MotorAgendamento:
+    """
+    Dispara jobs do ``schedule`` em threads, sem bloquear o loop principal.
+
+    Cada grupo de sobreposição (por padrão, o próprio job) tem no máximo uma
+    execução em andamento. Disparos que chegam durante uma execução do grupo
+    são pulados ou coalescidos conforme a política, e o atraso entre o
+    horário agendado e o início real fica registrado.
+    """
+
+    def __init__(self, max_workers=2, politica=POLITICA_SOBREPOSICAO):
+        """
+        Cria o motor com um pool de threads próprio.
+
+        Args:
+            max_workers: Quantidade de jobs diferentes rodando ao mesmo tempo.
+            politica: 'pular' ou 'coalescer'.
+        """
+        self.politica = politica
+        self.agenda = schedule.Scheduler()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='job'
+        )
+        self._lock = threading.Lock()
+        self._rodando = set()
+        self._pendentes = {}
+        self.atrasos = {}
+        self.contadores = {}
+
+    def agendar(self, nome, dias, horarios, funcao, grupo=None):
+        """
+        Agenda ``funcao`` nos dias da semana e horários informados.
+
+        Registra um único job diário por horário e filtra o dia da semana no
+        disparo, em vez de um job por combinação dia x horário.
+
+        Args:
+            nome: Nome do job (chave das métricas).
+            dias: Dias da semana (ex.: ['segunda', 'terca']).
+            horarios: Horários no formato 'HH:MM'.
+            funcao: Função sem argumentos executada no disparo.
+            grupo: Chave de sobreposição; jobs do mesmo grupo nunca rodam
+                ao mesmo tempo (padrão: o nome do job).
+        """
+        dias_idx = {DIAS_SEMANA[d] for d in dias}
+        for horario in horarios:
+            job = self.agenda.every().day.at(horario)
+            job.do(self._disparar, nome, dias_idx, funcao, job, grupo or nome)
+
+    def agendar_a_cada(self, nome, minutos, funcao):
+        """
+        Agenda ``funcao`` a cada ``minutos``, todos os dias.
+
+        Args:
+            nome: Nome do job.
+            minutos: Intervalo entre disparos, em minutos.
+            funcao: Função sem argumentos executada no disparo.
+        """
+        job = self.agenda.every(minutos).minutes
+        job.do(self._disparar, nome, set(DIAS_SEMANA.values()), funcao, job)
+
+    def _contar(self, nome, evento):
+        """Incrementa o contador de um evento do job."""
+        chave = (nome, evento)
+        self.contadores[chave] = self.contadores.get(chave, 0) + 1
+
+    def _disparar(self, nome, dias_idx, funcao, job, grupo=None):
+        """Callback do ``schedule``: aplica a política e enfileira o job."""
+        agora = datetime.now()
+        if agora.weekday() not in dias_idx:
+            return
+        agendado_para = job.next_run
+        grupo = grupo or nome
+
+        with self._lock:
+            if grupo in self._rodando:
+                if self.politica == 'coalescer':
+                    # Guarda só o disparo mais antigo do grupo
+                    self._pendentes.setdefault(
+                        grupo, (nome, funcao, agendado_para)
+                    )
+                    self._contar(nome, 'coalescido')
+                    logger.warning(
+                        f'[SCHEDULER] {nome} ainda rodando; disparo de '
+                        f'{agendado_para:%H:%M} coalescido'
+                    )
+                else:
+                    self._contar(nome, 'pulado')
+                    logger.warning(
+                        f'[SCHEDULER] {nome} ainda rodando; disparo de '
+                        f'{agendado_para:%H:%M} pulado'
+                    )
+                return
+            self._rodando.add(grupo)
+
+        self._executor.submit(
+            self._executar, nome, funcao, agendado_para, grupo
+        )
+
+    def _executar(self, nome, funcao, agendado_para, grupo=None):
+        """Roda o job e, se houver disparo coalescido no grupo, roda ele."""
+        grupo = grupo or nome
+        while True:
+            atraso = (datetime.now() - agendado_para).total_seconds()
+            historico = self.atrasos.setdefault(nome, deque(maxlen=100))
+            historico.append(atraso)
+            logger.info(
+                f'[SCHEDULER] Iniciando {nome} (agendado para '
+                f'{agendado_para:%H:%M:%S}, atraso de {atraso:.1f}s)'
+            )
+            try:
+                funcao()
+                self._contar(nome, 'sucesso')
+            except Exception:
+                self._contar(nome, 'falha')
+                logger.exception(f'[SCHEDULER] Falha no job {nome}')
+
+            with self._lock:
+                pendente = self._pendentes.pop(grupo, None)
+                if pendente is None:
+                    self._rodando.discard(grupo)
+                    return
+                nome, funcao, agendado_para = pendente
+
+    def tick(self):
+        """Dispara os jobs vencidos (retorna imediatamente)."""
+        self.agenda.run_pending()
+
+    def encerrar(self, esperar=True):
+        """
+        Para de aceitar jobs e, opcionalmente, espera os que estão rodando.
+
+        Args:
+            esperar: Se True, bloqueia até os jobs em andamento terminarem.
+        """
+        self.agenda.clear()
+        self._executor.shutdown(wait=esperar)
@@ -0,0 +1,290 @@
+"""Módulo com o profiling por etapa do ETL (cProfile, amostragem, memória).
+
+Com um perfil ativo (``--profile`` ou ``ETL_PROFILE``), cada etapa de
+``run_etl`` (extract_transform, consolidate, load...) é medida em separado.
+O resultado vai para ``logs/profiles/<run_id>_<etapa>.<ext>`` e um resumo
+com os N pontos mais caros sai no log da execução:
+
+- ``cprofile``: ``.prof`` (abre com ``python -m pstats`` ou snakeviz);
+- ``sampling``: pilhas amostradas no formato collapsed (``.folded``, abre no
+  speedscope ou no flamegraph.pl), sem o custo de instrumentar cada chamada;
+- ``tracemalloc``: snapshot ``.tracemalloc`` e as linhas que mais alocaram.
+
+Os três coletores enxergam o processo inteiro (no Python 3.12 o cProfile
+já mede todas as threads), então só uma execução é perfilada por vez; nos
+ciclos concorrentes o outro report roda sem profiling.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PERFIS = ('cprofile', 'sampling', 'tracemalloc')
+PROFILES_DIR = os.path.join('logs', 'profiles')
+# Quantidade de pontos quentes no resumo do log
+PERFIL_TOP_N = int(os.getenv('PERFIL_TOP_N', '15'))
+# Intervalo entre amostras do perfil 'sampling'
+INTERVALO_AMOSTRAGEM_MS = float(os.getenv('INTERVALO_AMOSTRAGEM_MS', '5'))
+# Frames guardados por alocação no perfil 'tracemalloc'. Cada frame extra
+# custa caro no parse de datas linha a linha (10 frames: ~25x mais lento)
+FRAMES_TRACEMALLOC = int(os.getenv('FRAMES_TRACEMALLOC', '1'))
+
+_perfil_ativo = os.getenv('ETL_PROFILE') or None
+_em_uso = threading.Lock()
+
+
+def configurar(perfil):
+    """
+    Define o perfil usado pelas próximas execuções do ETL.
+
+    Args:
+        perfil: 'cprofile', 'sampling', 'tracemalloc' ou None (desliga).
+
+    Raises:
+        ValueError: Se o perfil não for conhecido.
+    """
+    global _perfil_ativo
+    if perfil is not None and perfil not in PERFIS:
+        raise ValueError(
+            f'Perfil desconhecido: {perfil} (use {", ".join(PERFIS)})'
+        )
+    _perfil_ativo = perfil
+
+
+def _nome_funcao(arquivo, linha, funcao):
+    """Formata uma função como 'nome (arquivo.py:linha)'."""
+    return f'{funcao} ({os.path.basename(arquivo)}:{linha})'
+
+
+class _ColetorCProfile:
+    """Instrumenta todas as chamadas com cProfile."""
+
+    extensao = '.prof'
+
+    def __init__(self):
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+
+    def parar(self, base):
+        self._perfil.disable()
+        caminho = base + self.extensao
+        self._perfil.dump_stats(caminho)
+
+        stats = pstats.Stats(self._perfil, stream=io.StringIO()).stats
+        total = sum(tt for _, _, tt, _, _ in stats.values()) or 1
+        linhas = [f'{"próprio":>9} {"acum.":>9} {"chamadas":>9}  função']
+        mais_caros = sorted(stats.items(), key=lambda i: -i[1][2])
+        for func, (_, ncalls, tt, ct, _) in mais_caros[:PERFIL_TOP_N]:
+            linhas.append(
+                f'{tt:>8.2f}s {ct:>8.2f}s {ncalls:>9}  {_nome_funcao(*func)}'
+                f' [{tt / total:.0%}]'
+            )
+        return caminho, '\n'.join(linhas)
+
+    def descartar(self):
+        self._perfil.disable()
+
+
+class _ColetorAmostragem:
+    """Amostra as pilhas das threads do ETL em intervalos fixos."""
+
+    extensao = '.folded'
+
+    def __init__(self):
+        # Amostra a thread que abriu a sessão e as que surgirem depois
+        # (ex.: preparo do pipeline), ignorando as que já estavam paradas
+        # em outro lugar, como o loop do scheduler
+        self._ignorar = set(sys._current_frames()) - {threading.get_ident()}
+        self._pilhas = Counter()
+        self._amostras = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._amostrar, name='perfil-amostragem', daemon=True
+        )
+        self._thread.start()
+
+    def _amostrar(self):
+        intervalo = INTERVALO_AMOSTRAGEM_MS / 1000
+        while not self._parar.wait(intervalo):
+            for ident, frame in sys._current_frames().items():
+                if ident in self._ignorar or ident == self._thread.ident:
+                    continue
+                pilha = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pilha.append(
+                        _nome_funcao(
+                            codigo.co_filename,
+                            codigo.co_firstlineno,
+                            codigo.co_name,
+                        )
+                    )
+                    frame = frame.f_back
+                self._pilhas[';'.join(reversed(pilha))] += 1
+            self._amostras += 1
+
+    def parar(self, base):
+        self._parar.set()
+        self._thread.join()
+        caminho = base + self.extensao
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, qtd in self._pilhas.most_common():
+                f.write(f'{pilha} {qtd}\n')
+
+        proprio = Counter()
+        acumulado = Counter()
+        for pilha, qtd in self._pilhas.items():
+            funcoes = pilha.split(';')
+            proprio[funcoes[-1]] += qtd
+            for funcao in set(funcoes):
+                acumulado[funcao] += qtd
+        total = sum(self._pilhas.values()) or 1
+        linhas = [
+            f'{self._amostras} amostra(s) a cada '
+            f'{INTERVALO_AMOSTRAGEM_MS:g}ms',
+            f'{"próprio":>8} {"acum.":>8}  função',
+        ]
+        for funcao, qtd in proprio.most_common(PERFIL_TOP_N):
+            linhas.append(
+                f'{qtd / total:>8.1%} {acumulado[funcao] / total:>8.1%}  '
+                f'{funcao}'
+            )
+        return caminho, '\n'.join(linhas)
+
+    def descartar(self):
+        self._parar.set()
+        self._thread.join()
+
+
+class _ColetorTracemalloc:
+    """Mede as alocações que sobraram e o pico de memória da etapa."""
+
+    extensao = '.tracemalloc'
+
+    def __init__(self):
+        self._iniciou = not tracemalloc.is_tracing()
+        if self._iniciou:
+            tracemalloc.start(FRAMES_TRACEMALLOC)
+        tracemalloc.reset_peak()
+        self._inicio = tracemalloc.take_snapshot()
+
+    def parar(self, base):
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*'),
+            ]
+        )
+        atual, pico = tracemalloc.get_traced_memory()
+        if self._iniciou:
+            tracemalloc.stop()
+        caminho = base + self.extensao
+        snapshot.dump(caminho)
+
+        mb = 1024 * 1024
+        linhas = [
+            f'pico {pico / mb:.1f} MB, em uso no fim {atual / mb:.1f} MB'
+        ]
+        for diff in snapshot.compare_to(self._inicio, 'lineno')[:PERFIL_TOP_N]:
+            quadro = diff.traceback[0]
+            linhas.append(
+                f'{diff.size_diff / mb:>+9.1f} MB {diff.count_diff:>+9}  '
+                f'{os.path.basename(quadro.filename)}:{quadro.lineno}'
+            )
+        return caminho, '\n'.join(linhas)
+
+    def descartar(self):
+        if self._iniciou:
+            tracemalloc.stop()
+
+
+_COLETORES = {
+    'cprofile': _ColetorCProfile,
+    'sampling': _ColetorAmostragem,
+    'tracemalloc': _ColetorTracemalloc,
+}
+
+
+class SessaoPerfil:
+    """
+    Perfila uma execução do ETL, uma etapa de cada vez.
+
+    A coleta começa na criação; cada ``fechar_etapa`` grava o que foi
+    coletado com o nome da etapa e já começa a próxima. Sem perfil ativo
+    todos os métodos são no-op.
+
+    Args:
+        run_id: Identificador da execução (prefixo dos arquivos).
+        perfil: Perfil a usar (padrão: o definido em ``configurar``).
+    """
+
+    def __init__(self, run_id, perfil=None):
+        self.run_id = run_id
+        self.perfil = perfil or _perfil_ativo
+        self.arquivos = {}
+        self._coletor = None
+        if self.perfil is None:
+            return
+        if not _em_uso.acquire(blocking=False):
+            logger.warning(
+                f'[PROFILE] Outra execução já está sendo perfilada; '
+                f'{run_id} roda sem profiling'
+            )
+            self.perfil = None
+            return
+        logger.info(f'[PROFILE] Perfilando {run_id} com {self.perfil}')
+        self._iniciar_coleta()
+
+    def _iniciar_coleta(self):
+        """Cria o coletor da próxima etapa; se falhar, desliga a sessão."""
+        try:
+            self._coletor = _COLETORES[self.perfil]()
+        except Exception as e:
+            # Ex.: o processo já roda sob outro profiler (python -m cProfile)
+            logger.warning(
+                f'[PROFILE] Profiling desligado em {self.run_id}: {e}'
+            )
+            self.encerrar()
+
+    def fechar_etapa(self, etapa):
+        """
+        Grava a coleta da etapa que terminou e inicia a da próxima.
+
+        Args:
+            etapa: Nome da etapa (ex.: 'load').
+        """
+        if self._coletor is None:
+            return
+        coletor, self._coletor = self._coletor, None
+        try:
+            os.makedirs(PROFILES_DIR, exist_ok=True)
+            caminho, resumo = coletor.parar(
+                os.path.join(PROFILES_DIR, f'{self.run_id}_{etapa}')
+            )
+            self.arquivos[etapa] = caminho
+            logger.info(
+                f'[PROFILE] {etapa} ({self.perfil}) gravado em {caminho}\n'
+                f'{resumo}'
+            )
+        except Exception as e:
+            # Profiling nunca pode derrubar o ETL
+            logger.warning(f'[PROFILE] Falha gravando a etapa {etapa}: {e}')
+        self._iniciar_coleta()
+
+    def encerrar(self):
+        """Descarta a coleta em andamento e libera o profiling."""
+        if self.perfil is None:
+            return
+        if self._coletor is not None:
+            self._coletor.descartar()
+            self._coletor = None
+        self.perfil = None
+        _em_uso.release()
@@ -1,52 +1,80 @@
--- Tabela para relatórios GENERAL
-CREATE TABLE IF NOT EXISTS general_reports (
-    "UC / MD" TEXT,
-    "STATUS" TEXT,
-    "MUNICIPIO" TEXT,
-    "TIPO SERVICO" TEXT,
+-- As tabelas de relatório (general_reports, return_reports) são criadas
+-- pelo init_database a partir de etl/esquemas.py, antes deste script
+
+-- Marcas d'água do incremental (atualizadas na mesma transação da carga)
+CREATE TABLE IF NOT EXISTS etl_watermarks (
+    report TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    ultima_carga TIMESTAMP NOT NULL,
+    inicio_janela DATE,
+    fim_janela DATE,
+    linhas INTEGER
+);
+
+-- Andamento dos shards do FULL dividido entre containers (--shard i/N)
+CREATE TABLE IF NOT EXISTS etl_shard_runs (
+    execucao TEXT NOT NULL,
+    report TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    total_shards INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    linhas INTEGER,
+    iniciado_em TIMESTAMP NOT NULL,
+    concluido_em TIMESTAMP,
+    PRIMARY KEY (execucao, report, shard)
+);
+
+-- Resumos diários dos dashboards (recalculados pelo loader, ver
+-- load/resumos.py)
+CREATE TABLE IF NOT EXISTS general_resumo_diario (
     "DATA_EXECUCAO" DATE,
-    "COD" TEXT,
-    "DATA AFERICAO" DATE,
-    "TOI" TEXT,
-    "TOI ENTREGUE" TEXT,
-    "AR" TEXT,
-    "DATA AR" DATE,
-    "MD ENCONTRADO" TEXT,
-    "MD INSTALADO" TEXT,
-    "TIPO MEDICAO" TEXT,
-    "EQUIPE" TEXT,
-    "RAMAL MONO" TEXT,
-    "RAMAL BI" TEXT,
-    "RAMAL TRI" TEXT,
-    "SERV DE PEDREIRO" TEXT,
-    "PARCELAMENTO" TEXT,
-    "RS NEGOCIADO" TEXT,
-    "BACKOFFICE" TEXT,
-    "DATA BAIXADO" DATE,
-    "HORA INICIO SERVICO" TIME,
-    "HORA FIM SERVICO" TIME,
-    "COD FINANCIAMENTO" TEXT,
-    "QTD PARCELA(S)" TEXT,
     "REGIONAL" TEXT,
     "GRUPO" TEXT,
-    "DATA_EXTRACAO" TIMESTAMP,
-    "NOTIFICADO" TEXT
+    "EQUIPE" TEXT,
+    "STATUS" TEXT,
+    "TIPO SERVICO" TEXT,
+    "QUANTIDADE" INTEGER NOT NULL
 );
+CREATE INDEX IF NOT EXISTS general_resumo_diario_data_idx
+    ON general_resumo_diario ("DATA_EXECUCAO");
 
--- Tabela para relatórios RETURN
-CREATE TABLE IF NOT EXISTS return_reports (
-    "UC / MD" TEXT,
+CREATE TABLE IF NOT EXISTS return_resumo_diario (
     "DATA_EXECUCAO" DATE,
-    "CODIGO" TEXT,
-    "TOI" TEXT,
-    "MD INSTALADO" TEXT,
-    "EQUIPE" TEXT,
-    "DATA RESOLVIDO" DATE,
-    "MOTIVO" TEXT,
-    "MOTIVO DETALHADO" TEXT,
-    "MOTIVO DETALHADO 2" TEXT,
-    "STATUS" TEXT,
     "REGIONAL" TEXT,
     "GRUPO" TEXT,
-    "DATA_EXTRACAO" TIMESTAMP
-);
\ No newline at end of file
+    "EQUIPE" TEXT,
+    "MOTIVO" TEXT,
+    "QUANTIDADE" INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS return_resumo_diario_data_idx
+    ON return_resumo_diario ("DATA_EXECUCAO");
+
+-- Versão de cada tabela de relatório, trocada a cada carga (cache da API)
+CREATE TABLE IF NOT EXISTS etl_versoes (
+    tabela TEXT PRIMARY KEY,
+    versao TEXT NOT NULL,
+    atualizado_em TIMESTAMP NOT NULL
+);
+
+-- Histórico de versões (SCD2) das tabelas de relatório, mantido pelo loader
+CREATE TABLE IF NOT EXISTS general_reports_history (
+    LIKE general_reports INCLUDING DEFAULTS,
+    "CHAVE_HASH" BIGINT NOT NULL,
+    "LINHA_HASH" BIGINT NOT NULL,
+    "VALIDO_DE" TIMESTAMP NOT NULL,
+    "VALIDO_ATE" TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS general_reports_history_abertas_idx
+    ON general_reports_history ("CHAVE_HASH")
+    WHERE "VALIDO_ATE" IS NULL;
+
+CREATE TABLE IF NOT EXISTS return_reports_history (
+    LIKE return_reports INCLUDING DEFAULTS,
+    "CHAVE_HASH" BIGINT NOT NULL,
+    "LINHA_HASH" BIGINT NOT NULL,
+    "VALIDO_DE" TIMESTAMP NOT NULL,
+    "VALIDO_ATE" TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS return_reports_history_abertas_idx
+    ON return_reports_history ("CHAVE_HASH")
+    WHERE "VALIDO_ATE" IS NULL;
@@ -0,0 +1,297 @@
+"""Módulo com a etapa de qualidade de dados, entre a transformação e o load.
+
+As regras de cada tabela ficam declaradas em ``REGRAS``. Cada regra gera
+uma máscara booleana (True = linha violando) com operações vetorizadas do
+pandas, sem ``apply`` por linha, e todas as máscaras são contadas de uma
+vez. O relatório traz a contagem de cada regra e algumas linhas de
+exemplo. Uma regra que passa do seu ``limite`` (fração das linhas) bloqueia
+a carga antes do TRUNCATE/DELETE, então uma extração ruim nunca apaga os
+dados bons que já estão no banco.
+"""
+
+import logging
+import os
+from datetime import date, timedelta
+
+import esquemas
+import metrics
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Com 'false', as violações só geram aviso (útil para investigar uma base)
+QUALIDADE_BLOQUEIA = os.getenv('QUALIDADE_BLOQUEIA', 'true').lower() == 'true'
+# Linhas de exemplo guardadas por regra violada
+QUALIDADE_EXEMPLOS = int(os.getenv('QUALIDADE_EXEMPLOS', '5'))
+
+# Tabela -> regras. 'limite' é a fração máxima de linhas violando antes de
+# bloquear a carga (None: só avisa). Colunas obrigatórias sempre bloqueiam
+REGRAS = {
+    'general_reports': [
+        {
+            'regra': 'obrigatorias',
+            'colunas': [
+                'UC / MD',
+                'STATUS',
+                'DATA_EXECUCAO',
+                'EQUIPE',
+                'REGIONAL',
+                'GRUPO',
+                'DATA_EXTRACAO',
+            ],
+        },
+        {'regra': 'nao_nulo', 'coluna': 'UC / MD', 'limite': 0.01},
+        {'regra': 'nao_nulo', 'coluna': 'DATA_EXECUCAO', 'limite': 0.05},
+        {'regra': 'nao_nulo', 'coluna': 'EQUIPE', 'limite': 0.05},
+        {
+            'regra': 'unico',
+            'colunas': esquemas.chave('general'),
+            'limite': 0.001,
+        },
+        {'regra': 'data_futura', 'coluna': 'DATA_EXECUCAO', 'limite': 0.01},
+        {
+            'regra': 'derivada',
+            'coluna': 'REGIONAL',
+            'origem': 'EQUIPE',
+            'contem': 'PEL',
+            'valores': ('SUL', 'NORTE'),
+            'limite': 0.0,
+        },
+        {
+            'regra': 'derivada',
+            'coluna': 'GRUPO',
+            'origem': 'EQUIPE',
+            'contem': 'A0',
+            'valores': ('AT', 'BT'),
+            'limite': 0.0,
+        },
+    ],
+    'return_reports': [
+        {
+            'regra': 'obrigatorias',
+            'colunas': [
+                'UC / MD',
+                'DATA_EXECUCAO',
+                'EQUIPE',
+                'MOTIVO',
+                'REGIONAL',
+                'GRUPO',
+                'DATA_EXTRACAO',
+            ],
+        },
+        {'regra': 'nao_nulo', 'coluna': 'UC / MD', 'limite': 0.01},
+        {'regra': 'nao_nulo', 'coluna': 'DATA_EXECUCAO', 'limite': 0.05},
+        {'regra': 'nao_nulo', 'coluna': 'MOTIVO', 'limite': None},
+        {
+            'regra': 'unico',
+            'colunas': esquemas.chave('return'),
+            'limite': 0.001,
+        },
+        {'regra': 'data_futura', 'coluna': 'DATA_EXECUCAO', 'limite': 0.01},
+        {
+            'regra': 'derivada',
+            'coluna': 'REGIONAL',
+            'origem': 'EQUIPE',
+            'contem': 'PEL',
+            'valores': ('SUL', 'NORTE'),
+            'limite': 0.0,
+        },
+        {
+            'regra': 'derivada',
+            'coluna': 'GRUPO',
+            'origem': 'EQUIPE',
+            'contem': 'A0',
+            'valores': ('AT', 'BT'),
+            'limite': 0.0,
+        },
+    ],
+}
+
+
+def _nao_nulo(df, regra):
+    """Valor ausente ou texto vazio (object, string ou texto Arrow)."""
+    serie = df[regra['coluna']]
+    mascara = serie.isna()
+    if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(
+        serie
+    ):
+        mascara |= serie.astype(str).str.strip().eq('')
+    return mascara
+
+
+def _unico(df, regra):
+    """Repetição da chave (a deduplicação já deveria ter removido)."""
+    colunas = [c for c in regra['colunas'] if c in df.columns]
+    return df.duplicated(subset=colunas, keep='first')
+
+
+def _data_futura(df, regra):
+    """Data depois de amanhã (um dia de folga para o fuso do SIGOS)."""
+    datas = pd.to_datetime(df[regra['coluna']], errors='coerce')
+    limite = pd.Timestamp(date.today() + timedelta(days=1))
+    return datas > limite
+
+
+def _derivada(df, regra):
+    """
+    Coluna que não bate com a regra de derivação a partir da origem.
+
+    O texto já chega em maiúsculo, então a busca ignora a caixa, como a
+    derivação do transformer.
+    """
+    sim, nao = regra['valores']
+    contem = (
+        df[regra['origem']]
+        .astype('string')
+        .str.contains(regra['contem'], case=False, regex=False, na=False)
+        .astype(bool)
+    )
+    esperado = contem.map({True: sim, False: nao})
+    return df[regra['coluna']].ne(esperado)
+
+
+AVALIADORES = {
+    'nao_nulo': _nao_nulo,
+    'unico': _unico,
+    'data_futura': _data_futura,
+    'derivada': _derivada,
+}
+
+
+def nome_regra(regra):
+    """Nome legível da regra (ex.: 'nao_nulo:UC / MD')."""
+    if 'coluna' in regra:
+        return f'{regra["regra"]}:{regra["coluna"]}'
+    return regra['regra']
+
+
+def _colunas_da_regra(regra):
+    """Colunas usadas pela regra (as que aparecem nos exemplos)."""
+    if 'coluna' in regra:
+        return [
+            regra['coluna'],
+            *([regra['origem']] if 'origem' in regra else []),
+        ]
+    return list(regra.get('colunas', []))
+
+
+def _exemplos(df, mascara, colunas, quantidade):
+    """Amostra de linhas violando a regra, com os valores como texto."""
+    amostra = df.loc[mascara, [c for c in colunas if c in df.columns]]
+    return [
+        {col: (None if pd.isna(v) else str(v)) for col, v in linha.items()}
+        for linha in amostra.head(quantidade).to_dict('records')
+    ]
+
+
+def avaliar(df, tabela, exemplos=QUALIDADE_EXEMPLOS):
+    """
+    Avalia as regras da tabela sobre o DataFrame.
+
+    Args:
+        df: DataFrame consolidado, pronto para o load.
+        tabela: Tabela de destino (chave de ``REGRAS``).
+        exemplos: Linhas de exemplo guardadas por regra violada.
+
+    Returns:
+        Dicionário com 'linhas', 'violacoes' ({regra: {'quantidade',
+        'fracao', 'limite', 'exemplos'}}, só das regras violadas) e
+        'bloqueantes' (regras que passaram do limite).
+    """
+    linhas = len(df)
+    violacoes = {}
+    bloqueantes = []
+    mascaras = {}
+    regras = {}
+    for regra in REGRAS.get(tabela, []):
+        nome = nome_regra(regra)
+        if regra['regra'] == 'obrigatorias':
+            faltando = [c for c in regra['colunas'] if c not in df.columns]
+            if faltando:
+                violacoes[nome] = {
+                    'quantidade': len(faltando),
+                    'fracao': 1.0,
+                    'limite': 0.0,
+                    'exemplos': faltando,
+                }
+                bloqueantes.append(nome)
+            continue
+        if not set(_colunas_da_regra(regra)) <= set(df.columns):
+            # Já apontado em 'obrigatorias' ou coluna opcional ausente
+            continue
+        mascaras[nome] = AVALIADORES[regra['regra']](df, regra)
+        regras[nome] = regra
+
+    if mascaras and linhas:
+        # Todas as contagens de uma vez sobre a matriz de máscaras
+        contagens = pd.DataFrame(mascaras, index=df.index).sum()
+        for nome, quantidade in contagens.items():
+            if not quantidade:
+                continue
+            regra = regras[nome]
+            fracao = quantidade / linhas
+            violacoes[nome] = {
+                'quantidade': int(quantidade),
+                'fracao': round(fracao, 6),
+                'limite': regra.get('limite'),
+                'exemplos': _exemplos(
+                    df, mascaras[nome], _colunas_da_regra(regra), exemplos
+                ),
+            }
+            if regra.get('limite') is not None and fracao > regra['limite']:
+                bloqueantes.append(nome)
+
+    return {
+        'linhas': linhas,
+        'violacoes': violacoes,
+        'bloqueantes': bloqueantes,
+    }
+
+
+def validar(df, tabela):
+    """
+    Roda a etapa de qualidade e bloqueia a carga se preciso.
+
+    Args:
+        df: DataFrame consolidado, pronto para o load.
+        tabela: Tabela de destino.
+
+    Returns:
+        Relatório de ``avaliar``.
+
+    Raises:
+        ValueError: Se alguma regra passou do limite e QUALIDADE_BLOQUEIA
+            estiver ligado.
+    """
+    relatorio = avaliar(df, tabela)
+    for nome, violacao in relatorio['violacoes'].items():
+        metrics.incrementar(
+            'etl_qualidade_violacoes_total',
+            violacao['quantidade'],
+            tabela=tabela,
+            regra=nome,
+        )
+        logger.warning(
+            f'[QUALIDADE] {tabela} {nome}: {violacao["quantidade"]} '
+            f'violação(ões) ({violacao["fracao"]:.2%}, limite '
+            f'{violacao["limite"]}); exemplos: {violacao["exemplos"]}'
+        )
+
+    if not relatorio['bloqueantes']:
+        logger.info(
+            f'[QUALIDADE] {tabela}: {relatorio["linhas"]} linha(s), '
+            f'{len(relatorio["violacoes"])} regra(s) com violação, '
+            'nenhuma bloqueante'
+        )
+        return relatorio
+
+    mensagem = (
+        f'Carga de {tabela} bloqueada pela qualidade dos dados: '
+        f'{", ".join(relatorio["bloqueantes"])}'
+    )
+    if not QUALIDADE_BLOQUEIA:
+        logger.warning(
+            f'[QUALIDADE] {mensagem} (ignorado: QUALIDADE_BLOQUEIA=false)'
+        )
+        return relatorio
+    raise ValueError(mensagem)
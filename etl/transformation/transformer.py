@@ -9,6 +9,9 @@ from datetime import datetime
 
 import pandas as pd
 
+import esquemas
+import metrics
+
 logger = logging.getLogger(__name__)
 
 # Bases de caminho
@@ -39,7 +42,7 @@ def _sniff_delimiter(path, sample_bytes=8192):
         return None  # deixa o pandas inferir (sep=None com engine='python')
 
 
-def _robust_read_csv(path, force_skip=False, known_columns=None):
+def _robust_read_csv(path, force_skip=False, known_columns=None, usecols=None):
     """
     Lê um arquivo CSV de forma robusta, tentando múltiplas estratégias.
 
@@ -47,6 +50,8 @@ def _robust_read_csv(path, force_skip=False, known_columns=None):
         path: Caminho do arquivo CSV.
         force_skip: Se True, pula linhas malformadas.
         known_columns: Lista de colunas esperadas para realinhamento de header.
+        usecols: Filtro de colunas do ``read_csv`` (ver ``_usecols``); as
+            demais colunas nem são parseadas.
 
     Returns:
         DataFrame lido com sucesso.
@@ -82,6 +87,7 @@ def _robust_read_csv(path, force_skip=False, known_columns=None):
                 dtype=str,
                 keep_default_na=False,
                 quoting=csv.QUOTE_MINIMAL,
+                usecols=usecols,
                 **opts,
             )
             # Se o arquivo tiver "lixo" antes do header, tenta realinhar baseado em colunas conhecidas
@@ -98,13 +104,19 @@ def _robust_read_csv(path, force_skip=False, known_columns=None):
                             header_idx = idx
                             break
                     if header_idx is not None:
+                        # O separador que "funcionou" pode ter vindo do lixo
+                        # (ex.: tab em linhas sem ';'); usa o do header
+                        sep_header = max(
+                            ';,|\t', key=lines[header_idx].count
+                        )
                         df = pd.read_csv(
                             path,
                             encoding='latin1',
                             dtype=str,
                             keep_default_na=False,
                             skiprows=header_idx,
-                            **opts,
+                            usecols=usecols,
+                            **{**opts, 'sep': sep_header},
                         )
             logger.info(
                 f'Lido com sucesso: {os.path.basename(path)} usando opts={opts}'
@@ -112,6 +124,9 @@ def _robust_read_csv(path, force_skip=False, known_columns=None):
             return df
         except Exception as e:
             last_exc = e
+            metrics.incrementar(
+                'etl_retentativas_total', etapa='leitura_csv'
+            )
             logger.warning(
                 f'Falha lendo {os.path.basename(path)} com opts={opts}: {e}'
             )
@@ -122,14 +137,17 @@ def _robust_read_csv(path, force_skip=False, known_columns=None):
             f"Tentativas padrão falharam para {os.path.basename(path)}. Repetindo com on_bad_lines='skip'."
         )
         return _robust_read_csv(
-            path, force_skip=True, known_columns=known_columns
+            path,
+            force_skip=True,
+            known_columns=known_columns,
+            usecols=usecols,
         )
 
     # Se nada deu, estoura
     raise last_exc
 
 
-def _read_all_csvs(folder, pattern, known_columns=None):
+def _read_all_csvs(folder, pattern, known_columns=None, usecols=None):
     """
     Lê todos os arquivos CSV que correspondem ao pattern na pasta.
 
@@ -137,6 +155,7 @@ def _read_all_csvs(folder, pattern, known_columns=None):
         folder: Caminho da pasta.
         pattern: Pattern glob para busca de arquivos.
         known_columns: Lista de colunas esperadas para realinhamento.
+        usecols: Filtro de colunas do ``read_csv``.
 
     Returns:
         Lista de DataFrames lidos.
@@ -150,7 +169,9 @@ def _read_all_csvs(folder, pattern, known_columns=None):
     dfs = []
     for p in paths:
         try:
-            df = _robust_read_csv(p, known_columns=known_columns)
+            df = _robust_read_csv(
+                p, known_columns=known_columns, usecols=usecols
+            )
             dfs.append(df)
         except Exception as e:
             logger.exception(
@@ -186,36 +207,61 @@ def _norm_col(s: str) -> str:
     return s
 
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+def _usecols(report: str):
+    """
+    Monta o filtro de colunas do ``read_csv`` a partir do esquema do report.
+
+    Args:
+        report: 'general' ou 'return'.
+
+    Returns:
+        Função que aceita um cabeçalho do CSV se ele, normalizado, estiver
+        no esquema (ver esquemas.py).
+    """
+    origens = set(esquemas.renomeacoes(report))
+    return lambda coluna: str(_norm_col(coluna)).upper() in origens
+
+
+def _aplicar_esquema(df: pd.DataFrame, report: str) -> pd.DataFrame:
     """
-    Normaliza os nomes das colunas do DataFrame.
+    Normaliza os cabeçalhos e renomeia as colunas para os nomes da tabela.
+
+    Colunas fora do esquema (quando o CSV foi lido sem ``usecols``) são
+    descartadas.
 
     Args:
-        df: DataFrame a ser normalizado.
+        df: DataFrame cru lido de um CSV.
+        report: 'general' ou 'return'.
 
     Returns:
-        DataFrame com colunas normalizadas.
+        DataFrame só com as colunas do esquema, já com os nomes finais.
     """
+    renomear = esquemas.renomeacoes(report)
     df = df.copy()
-    df.columns = [_norm_col(c) for c in df.columns]
-    return df
+    df.columns = [str(_norm_col(c)).upper() for c in df.columns]
+    df = df[[c for c in df.columns if c in renomear]]
+    return df.rename(columns=renomear)
 
 
-def _normalize_date_columns(df: pd.DataFrame) -> pd.DataFrame:
+def _normalize_date_columns(
+    df: pd.DataFrame, colunas: list[str] | None = None
+) -> pd.DataFrame:
     """
-    Converte colunas com 'DATA' no nome para datetime.date.
+    Converte colunas de data para datetime.date.
 
     Faz parse manual de dd/mm/yyyy para yyyy-mm-dd evitando ambiguidade.
 
     Args:
         df: DataFrame a ser processado.
+        colunas: Colunas de data (padrão: as que têm 'DATA' no nome).
 
     Returns:
         DataFrame com colunas de data convertidas.
     """
     df = df.copy()
     for col in df.columns:
-        if 'DATA' in col.upper():
+        eh_data = 'DATA' in col.upper() if colunas is None else col in colunas
+        if eh_data:
             logger.info(f'Convertendo coluna de data: {col}')
 
             # Limpa valores inválidos
@@ -286,24 +332,6 @@ def _add_audit_cols(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _drop_cols_safe(df: pd.DataFrame, cols_to_drop: list[str]) -> pd.DataFrame:
-    """
-    Remove colunas do DataFrame de forma segura (ignora se não existirem).
-
-    Args:
-        df: DataFrame a ser processado.
-        cols_to_drop: Lista de colunas a remover.
-
-    Returns:
-        DataFrame sem as colunas especificadas.
-    """
-    df = df.copy()
-    existing = [c for c in cols_to_drop if c in df.columns]
-    if existing:
-        df = df.drop(columns=existing)
-    return df
-
-
 def _deduplicate_df(df: pd.DataFrame, subset_keys: list[str]) -> pd.DataFrame:
     """
     Remove duplicatas mantendo a versão mais recente (baseado em data_extracao).
@@ -350,6 +378,9 @@ def _add_regional_grupo(df: pd.DataFrame, equipe_col: str) -> pd.DataFrame:
     """
     Adiciona colunas REGIONAL e GRUPO baseadas na coluna de equipe.
 
+    A busca ignora maiúsculas/minúsculas, como a regra 'derivada' da
+    qualidade, que roda depois do texto já estar em maiúsculo.
+
     Args:
         df: DataFrame a ser processado.
         equipe_col: Nome da coluna de equipe.
@@ -359,10 +390,14 @@ def _add_regional_grupo(df: pd.DataFrame, equipe_col: str) -> pd.DataFrame:
     """
     if equipe_col in df.columns:
         df['REGIONAL'] = df[equipe_col].apply(
-            lambda x: 'SUL' if isinstance(x, str) and 'PEL' in x else 'NORTE'
+            lambda x: 'SUL'
+            if isinstance(x, str) and 'PEL' in x.upper()
+            else 'NORTE'
         )
         df['GRUPO'] = df[equipe_col].apply(
-            lambda x: 'AT' if isinstance(x, str) and 'A0' in x else 'BT'
+            lambda x: 'AT'
+            if isinstance(x, str) and 'A0' in x.upper()
+            else 'BT'
         )
     return df
 
@@ -372,149 +407,209 @@ def _add_regional_grupo(df: pd.DataFrame, equipe_col: str) -> pd.DataFrame:
 # ====
 
 
-def transformar_return(mode: str) -> pd.DataFrame:
+KNOWN_COLS_RETURN = [
+    'REGIONAL',
+    'UC / MD',
+    'TIPO SERVICO',
+    'DATA EXECUCAO',
+    'CODIGO',
+]
+KNOWN_COLS_GENERAL = ['UC / MD', 'Status', 'Motivo nao baixado']
+
+
+def _preparar(df: pd.DataFrame, report: str) -> pd.DataFrame:
+    """Aplica o esquema do report, converte datas e horas e audita."""
+    df = _aplicar_esquema(df, report)
+    df = _normalize_date_columns(df, esquemas.colunas_do_tipo(report, 'DATE'))
+    for tcol in esquemas.colunas_do_tipo(report, 'TIME'):
+        if tcol in df.columns:
+            df[tcol] = _parse_time_series(df[tcol])
+    return _add_audit_cols(df)
+
+
+def _maiusculas(df: pd.DataFrame) -> pd.DataFrame:
+    """Coloca nomes de colunas e conteúdo textual em maiúsculo."""
+    # Colunas em maiúsculo
+    df.columns = df.columns.str.upper()
+
+    # Conteúdo textual em maiúsculo, sem quebrar datas/nums
+    for col in df.columns:
+        if pd.api.types.is_object_dtype(df[col]):
+            df[col] = df[col].apply(
+                lambda v: v.upper() if isinstance(v, str) else v
+            )
+    return df
+
+
+def preparar_return(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Lê e transforma todos os arquivos de retorno em um único DataFrame.
+    Normaliza um CSV de retorno já lido (colunas, datas, auditoria).
+
+    Essa etapa é independente por arquivo, então pode rodar enquanto as
+    próximas janelas ainda estão sendo baixadas.
 
     Args:
-        mode: Modo de execução ('full' ou 'incremental').
+        df: DataFrame cru lido de um CSV de retorno.
+
+    Returns:
+        DataFrame normalizado, pronto para consolidar.
+    """
+    metrics.incrementar('etl_linhas_lidas_total', len(df), report='return')
+    return _preparar(df, 'return')
+
+
+def consolidar_return(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Junta os retornos preparados, deduplica e deriva REGIONAL/GRUPO.
+
+    Args:
+        dfs: Lista de DataFrames saídos de ``preparar_return``.
 
     Returns:
         DataFrame consolidado e transformado.
 
     Raises:
-        FileNotFoundError: Se nenhum arquivo de retorno for encontrado.
+        FileNotFoundError: Se nenhum arquivo de retorno foi preparado.
     """
-    known_cols = [
-        'REGIONAL',
-        'UC / MD',
-        'TIPO SERVICO',
-        'DATA EXECUCAO',
-        'CODIGO',
-    ]
-    dfs = _read_all_csvs(
-        DOWNLOADS_DIR, 'retorno*.csv', known_columns=known_cols
-    )
     if not dfs:
         raise FileNotFoundError(
             'Nenhum CSV de retorno encontrado para processar.'
         )
-
     df = pd.concat(dfs, ignore_index=True)
-    df = _normalize_columns(df)
-    df = _normalize_date_columns(df)
-
-    # Padroniza nome da coluna de data de execução
-    if 'DATA EXECUCAO' in df.columns:
-        df = df.rename(columns={'DATA EXECUCAO': 'data_execucao'})
-    elif 'Data execucao' in df.columns:
-        df = df.rename(columns={'Data execucao': 'data_execucao'})
-
-    # Remove colunas desnecessárias
-    cols_para_remover = [
-        'REGIONAL',
-        'TIPO SERVICO',
-        'FISCAL',
-        'EMPRESA',
-        'DATA ENTREGA',
-        'RETORNO DE',
-    ]
-    df = _drop_cols_safe(df, cols_para_remover)
-
-    # Auditoria
-    df = _add_audit_cols(df)
 
     # Deduplicação
-    dedup_keys = ['UC / MD', 'data_execucao', 'CODIGO', 'TOI', 'EQUIPE']
+    dedup_keys = esquemas.chave('return')
+    antes = len(df)
     df = _deduplicate_df(df, dedup_keys)
+    metrics.incrementar(
+        'etl_duplicadas_removidas_total', antes - len(df), report='return'
+    )
 
     # Adiciona colunas REGIONAL e GRUPO
     df = _add_regional_grupo(df, 'EQUIPE')
 
-    # Colunas em maiúsculo
-    df.columns = df.columns.str.upper()
+    return _maiusculas(df)
 
-    # Conteúdo textual em maiúsculo, sem quebrar datas/nums
-    for col in df.columns:
-        if pd.api.types.is_object_dtype(df[col]):
-            df[col] = df[col].apply(
-                lambda v: v.upper() if isinstance(v, str) else v
-            )
 
-    return df
+def preparar_general(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza um CSV de relatório geral já lido (colunas, datas, horas).
+
+    Essa etapa é independente por arquivo, então pode rodar enquanto as
+    próximas janelas ainda estão sendo baixadas.
 
+    Args:
+        df: DataFrame cru lido de um CSV de relatório geral.
 
-def transformar_general(mode: str) -> pd.DataFrame:
+    Returns:
+        DataFrame normalizado, pronto para consolidar.
     """
-    Lê e transforma todos os arquivos de relatório geral em um único DataFrame.
+    metrics.incrementar('etl_linhas_lidas_total', len(df), report='general')
+    return _preparar(df, 'general')
+
+
+def consolidar_general(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Junta os relatórios gerais preparados, deduplica e deriva REGIONAL/GRUPO.
 
     Args:
-        mode: Modo de execução ('full' ou 'incremental').
+        dfs: Lista de DataFrames saídos de ``preparar_general``.
 
     Returns:
         DataFrame consolidado e transformado.
 
     Raises:
-        FileNotFoundError: Se nenhum arquivo de relatório geral for encontrado.
+        FileNotFoundError: Se nenhum arquivo de relatório geral foi preparado.
     """
-    known_cols = ['UC / MD', 'Status', 'Motivo nao baixado']
-    dfs = _read_all_csvs(
-        DOWNLOADS_DIR, 'relatorio_prot_geral*.csv', known_columns=known_cols
-    )
     if not dfs:
         raise FileNotFoundError(
             "Nenhum CSV 'relatorio_prot_geral*.csv' encontrado para processar."
         )
-
     df = pd.concat(dfs, ignore_index=True)
-    df = _normalize_columns(df)
-    df = _normalize_date_columns(df)
-
-    # Padroniza nome da coluna de data de execução
-    if 'DATA EXECUCAO' in df.columns:
-        df = df.rename(columns={'DATA EXECUCAO': 'data_execucao'})
-    elif 'Data execucao' in df.columns:
-        df = df.rename(columns={'Data execucao': 'data_execucao'})
-
-    # Remove colunas desnecessárias
-    cols_para_remover = [
-        'Motivo nao baixado',
-        'Regional',
-        'Empresa',
-        'Sit deixada',
-        'Fiscal',
-        'tipo_servico_comercial',
-        'obs_at',
-        'RS Entrada',
-        'Lancado por',
-        'Data lancado',
-        'Hora',
-    ]
-    df = _drop_cols_safe(df, cols_para_remover)
-
-    # Converte colunas de hora para TIME
-    for tcol in ['Hora inicio servico', 'Hora fim servico']:
-        if tcol in df.columns:
-            df[tcol] = _parse_time_series(df[tcol])
-
-    # Auditoria
-    df = _add_audit_cols(df)
 
     # Deduplicação
-    dedup_keys = ['UC / MD', 'data_execucao', 'Cod', 'TOI', 'Equipe']
+    dedup_keys = esquemas.chave('general')
+    antes = len(df)
     df = _deduplicate_df(df, dedup_keys)
+    metrics.incrementar(
+        'etl_duplicadas_removidas_total', antes - len(df), report='general'
+    )
 
     # Adiciona colunas REGIONAL e GRUPO
-    df = _add_regional_grupo(df, 'Equipe')
+    df = _add_regional_grupo(df, 'EQUIPE')
 
-    # Colunas em maiúsculo
-    df.columns = df.columns.str.upper()
+    return _maiusculas(df)
 
-    # Conteúdo textual em maiúsculo, sem quebrar datas/nums
-    for col in df.columns:
-        if pd.api.types.is_object_dtype(df[col]):
-            df[col] = df[col].apply(
-                lambda v: v.upper() if isinstance(v, str) else v
-            )
 
-    return df
+def preparar_arquivo(report: str, path: str) -> pd.DataFrame | None:
+    """
+    Lê e prepara um único CSV baixado (usado no pipeline por janela).
+
+    Args:
+        report: Relatório do arquivo ('general' ou 'return').
+        path: Caminho do CSV.
+
+    Returns:
+        DataFrame preparado, ou None se o arquivo não pôde ser lido.
+    """
+    known_cols = (
+        KNOWN_COLS_GENERAL if report == 'general' else KNOWN_COLS_RETURN
+    )
+    try:
+        df = _robust_read_csv(
+            path, known_columns=known_cols, usecols=_usecols(report)
+        )
+    except Exception as e:
+        logger.exception(
+            f'Falha definitiva ao ler {os.path.basename(path)}: {e}'
+        )
+        return None
+    if report == 'general':
+        return preparar_general(df)
+    return preparar_return(df)
+
+
+def transformar_return(mode: str, pasta: str | None = None) -> pd.DataFrame:
+    """
+    Lê e transforma todos os arquivos de retorno em um único DataFrame.
+
+    Args:
+        mode: Modo de execução ('full' ou 'incremental').
+        pasta: Pasta com os CSVs baixados (padrão: DOWNLOADS_DIR).
+
+    Returns:
+        DataFrame consolidado e transformado.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo de retorno for encontrado.
+    """
+    dfs = _read_all_csvs(
+        pasta or DOWNLOADS_DIR,
+        'retorno*.csv',
+        known_columns=KNOWN_COLS_RETURN,
+        usecols=_usecols('return'),
+    )
+    return consolidar_return([preparar_return(df) for df in dfs])
+
+
+def transformar_general(mode: str, pasta: str | None = None) -> pd.DataFrame:
+    """
+    Lê e transforma todos os arquivos de relatório geral em um único DataFrame.
+
+    Args:
+        mode: Modo de execução ('full' ou 'incremental').
+        pasta: Pasta com os CSVs baixados (padrão: DOWNLOADS_DIR).
+
+    Returns:
+        DataFrame consolidado e transformado.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo de relatório geral for encontrado.
+    """
+    dfs = _read_all_csvs(
+        pasta or DOWNLOADS_DIR,
+        'relatorio_prot_geral*.csv',
+        known_columns=KNOWN_COLS_GENERAL,
+        usecols=_usecols('general'),
+    )
+    return consolidar_general([preparar_general(df) for df in dfs])
@@ -0,0 +1,339 @@
+"""Módulo com o motor Arrow da transformação (MOTOR_TRANSFORMACAO=arrow).
+
+Mesmo contrato do transformer.py (``preparar_arquivo``, ``consolidar_*`` e
+``transformar_*``), mas sem passar por objetos Python célula a célula: o
+CSV é lido pelo ``pyarrow.csv`` (só as colunas do esquema), datas, horas e
+maiúsculas saem dos kernels do ``pyarrow.compute`` e a deduplicação é um
+group-by do Arrow. O resultado é um DataFrame com colunas ``ArrowDtype``,
+que aponta para os mesmos buffers; o loader reconhece esse formato e manda
+os lotes direto para o ``COPY`` do Postgres.
+
+Precisa do pacote ``pyarrow``, instalado pelo extra ``arrow`` do Poetry.
+"""
+
+import csv
+import glob
+import logging
+import os
+from datetime import datetime
+
+import esquemas
+import metrics
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
+from transformation.transformer import DOWNLOADS_DIR, _norm_col
+
+logger = logging.getLogger(__name__)
+
+# Linhas olhadas atrás do cabeçalho (o SIGOS põe lixo antes dele)
+LINHAS_PROCURA_CABECALHO = 100
+# Formatos aceitos nas colunas de data e hora, na ordem de tentativa
+FORMATOS_DATA = ['%d/%m/%Y', '%Y-%m-%d']
+FORMATOS_HORA = ['%H:%M:%S', '%H:%M']
+
+PADROES = {
+    'general': 'relatorio_prot_geral*.csv',
+    'return': 'retorno*.csv',
+}
+
+
+def _localizar_cabecalho(path, report):
+    """
+    Procura a linha do cabeçalho e o separador do CSV.
+
+    O cabeçalho é a primeira linha com alguma coluna do esquema do report.
+
+    Args:
+        path: Caminho do CSV.
+        report: 'general' ou 'return'.
+
+    Returns:
+        Tupla (índice da linha, separador, colunas do CSV a ler).
+
+    Raises:
+        ValueError: Se nenhuma das primeiras linhas tiver colunas do esquema.
+    """
+    origens = set(esquemas.renomeacoes(report))
+    with open(path, 'r', encoding='latin1', errors='ignore') as f:
+        for idx, linha in enumerate(f):
+            if idx >= LINHAS_PROCURA_CABECALHO:
+                break
+            sep = max(';,|\t', key=linha.count)
+            colunas = next(csv.reader([linha.rstrip('\r\n')], delimiter=sep))
+            ler = [c for c in colunas if str(_norm_col(c)).upper() in origens]
+            if ler:
+                return idx, sep, ler
+    raise ValueError(
+        f'Cabeçalho do {report} não encontrado em {os.path.basename(path)}'
+    )
+
+
+def ler_csv(path, report):
+    """
+    Lê um CSV do SIGOS direto para uma tabela Arrow.
+
+    Só as colunas do esquema são convertidas, todas como texto; texto vazio
+    continua vazio (como ``keep_default_na=False`` no pandas). Linhas
+    malformadas são puladas com aviso.
+
+    Args:
+        path: Caminho do CSV.
+        report: 'general' ou 'return'.
+
+    Returns:
+        pyarrow.Table com as colunas do CSV que estão no esquema.
+    """
+    inicio, sep, colunas = _localizar_cabecalho(path, report)
+    puladas = []
+
+    def pular(linha):
+        puladas.append(linha.number)
+        return 'skip'
+
+    tabela = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(encoding='latin1', skip_rows=inicio),
+        parse_options=pacsv.ParseOptions(
+            delimiter=sep, invalid_row_handler=pular
+        ),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=colunas,
+            column_types={c: pa.string() for c in colunas},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    if puladas:
+        metrics.incrementar('etl_retentativas_total', etapa='leitura_csv')
+        logger.warning(
+            f'{len(puladas)} linha(s) malformada(s) puladas em '
+            f'{os.path.basename(path)}'
+        )
+    logger.info(
+        f'Lido com sucesso (arrow): {os.path.basename(path)} sep={sep!r}'
+    )
+    return tabela
+
+
+def _parse(coluna, formatos, tipo):
+    """Converte texto para ``tipo`` pelo primeiro formato que casar."""
+    texto = pc.utf8_trim_whitespace(coluna)
+    tentativas = [
+        pc.strptime(texto, format=f, unit='s', error_is_null=True)
+        for f in formatos
+    ]
+    return pc.coalesce(*tentativas).cast(tipo)
+
+
+def _preparar(tabela, report):
+    """Aplica o esquema do report, converte datas e horas e audita."""
+    renomear = esquemas.renomeacoes(report)
+    tabela = tabela.rename_columns(
+        [renomear[str(_norm_col(c)).upper()] for c in tabela.column_names]
+    )
+    tipos = {
+        **dict.fromkeys(
+            esquemas.colunas_do_tipo(report, 'DATE'),
+            (FORMATOS_DATA, pa.date32()),
+        ),
+        **dict.fromkeys(
+            esquemas.colunas_do_tipo(report, 'TIME'),
+            (FORMATOS_HORA, pa.time32('s')),
+        ),
+    }
+    for i, nome in enumerate(tabela.column_names):
+        if nome in tipos:
+            formatos, tipo = tipos[nome]
+            tabela = tabela.set_column(
+                i, nome, _parse(tabela.column(i), formatos, tipo)
+            )
+    agora = pa.scalar(datetime.now(), pa.timestamp('us'))
+    return tabela.append_column(
+        'DATA_EXTRACAO', pa.repeat(agora, tabela.num_rows)
+    )
+
+
+def _deduplicar(tabela, chaves):
+    """
+    Remove duplicatas mantendo a ocorrência da extração mais recente.
+
+    As tabelas chegam concatenadas na ordem de extração, então a última
+    linha de cada chave é a mais nova.
+
+    Args:
+        tabela: pyarrow.Table consolidada.
+        chaves: Colunas-chave (as ausentes são ignoradas).
+
+    Returns:
+        pyarrow.Table deduplicada, na ordem original.
+    """
+    chaves = [c for c in chaves if c in tabela.column_names]
+    if not chaves:
+        logger.warning('Nenhuma chave de deduplicação encontrada')
+        return tabela
+    ultimas = (
+        tabela.select(chaves)
+        .append_column('__linha', pa.array(np.arange(tabela.num_rows)))
+        .group_by(chaves, use_threads=False)
+        .aggregate([('__linha', 'max')])
+        .column('__linha_max')
+    )
+    return tabela.take(ultimas.sort())
+
+
+def _regional_grupo(tabela):
+    """Deriva REGIONAL e GRUPO da coluna EQUIPE (como no transformer)."""
+    if 'EQUIPE' not in tabela.column_names:
+        return tabela
+    equipe = tabela.column('EQUIPE')
+    for nome, trecho, sim, nao in (
+        ('REGIONAL', 'PEL', 'SUL', 'NORTE'),
+        ('GRUPO', 'A0', 'AT', 'BT'),
+    ):
+        contem = pc.fill_null(
+            pc.match_substring(equipe, trecho, ignore_case=True), False
+        )
+        tabela = tabela.append_column(nome, pc.if_else(contem, sim, nao))
+    return tabela
+
+
+def _maiusculas(tabela):
+    """Coloca o conteúdo textual em maiúsculo."""
+    for i, campo in enumerate(tabela.schema):
+        if pa.types.is_string(campo.type):
+            tabela = tabela.set_column(
+                i, campo.name, pc.utf8_upper(tabela.column(i))
+            )
+    return tabela
+
+
+def preparar_arquivo(report, path):
+    """
+    Lê e prepara um único CSV baixado (usado no pipeline por janela).
+
+    Args:
+        report: Relatório do arquivo ('general' ou 'return').
+        path: Caminho do CSV.
+
+    Returns:
+        pyarrow.Table preparada, ou None se o arquivo não pôde ser lido.
+    """
+    try:
+        tabela = ler_csv(path, report)
+    except Exception as e:
+        logger.exception(
+            f'Falha definitiva ao ler {os.path.basename(path)}: {e}'
+        )
+        return None
+    metrics.incrementar(
+        'etl_linhas_lidas_total', tabela.num_rows, report=report
+    )
+    return _preparar(tabela, report)
+
+
+def _consolidar(tabelas, report):
+    """Junta as tabelas preparadas, deduplica, deriva e converte."""
+    tabela = pa.concat_tables(tabelas, promote_options='default')
+    antes = tabela.num_rows
+    tabela = _deduplicar(tabela, esquemas.chave(report))
+    removidas = antes - tabela.num_rows
+    metrics.incrementar(
+        'etl_duplicadas_removidas_total', removidas, report=report
+    )
+    logger.info(
+        f'Deduplicação (arrow): removidas {removidas} linhas duplicadas '
+        f'de {antes}'
+    )
+    tabela = _maiusculas(_regional_grupo(tabela))
+    return tabela.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def consolidar_return(tabelas):
+    """
+    Junta os retornos preparados, deduplica e deriva REGIONAL/GRUPO.
+
+    Args:
+        tabelas: Lista de tabelas saídas de ``preparar_arquivo``.
+
+    Returns:
+        DataFrame consolidado, com colunas ``ArrowDtype``.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo de retorno foi preparado.
+    """
+    if not tabelas:
+        raise FileNotFoundError(
+            'Nenhum CSV de retorno encontrado para processar.'
+        )
+    return _consolidar(tabelas, 'return')
+
+
+def consolidar_general(tabelas):
+    """
+    Junta os relatórios gerais preparados, deduplica e deriva REGIONAL/GRUPO.
+
+    Args:
+        tabelas: Lista de tabelas saídas de ``preparar_arquivo``.
+
+    Returns:
+        DataFrame consolidado, com colunas ``ArrowDtype``.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo de relatório geral foi preparado.
+    """
+    if not tabelas:
+        raise FileNotFoundError(
+            "Nenhum CSV 'relatorio_prot_geral*.csv' encontrado para processar."
+        )
+    return _consolidar(tabelas, 'general')
+
+
+def _preparar_pasta(report, pasta):
+    """Prepara todos os CSVs do report na pasta, em ordem de nome."""
+    caminhos = sorted(glob.glob(os.path.join(pasta, PADROES[report])))
+    if not caminhos:
+        logger.warning(
+            f'Nenhum arquivo encontrado em {pasta} com pattern '
+            f'{PADROES[report]}'
+        )
+    tabelas = [preparar_arquivo(report, p) for p in caminhos]
+    return [t for t in tabelas if t is not None]
+
+
+def transformar_return(mode, pasta=None):
+    """
+    Lê e transforma todos os arquivos de retorno em um único DataFrame.
+
+    Args:
+        mode: Modo de execução ('full' ou 'incremental').
+        pasta: Pasta com os CSVs baixados (padrão: DOWNLOADS_DIR).
+
+    Returns:
+        DataFrame consolidado, com colunas ``ArrowDtype``.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo de retorno for encontrado.
+    """
+    return consolidar_return(_preparar_pasta('return', pasta or DOWNLOADS_DIR))
+
+
+def transformar_general(mode, pasta=None):
+    """
+    Lê e transforma todos os arquivos de relatório geral em um único DataFrame.
+
+    Args:
+        mode: Modo de execução ('full' ou 'incremental').
+        pasta: Pasta com os CSVs baixados (padrão: DOWNLOADS_DIR).
+
+    Returns:
+        DataFrame consolidado, com colunas ``ArrowDtype``.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo de relatório geral for encontrado.
+    """
+    return consolidar_general(
+        _preparar_pasta('general', pasta or DOWNLOADS_DIR)
+    )
@@ -0,0 +1,27 @@
+# tests/conftest.py
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# Os módulos do ETL importam uns aos outros a partir de etl/ (como no
+# `python etl/main.py`), então a pasta precisa estar no sys.path
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'etl')
+)
+
+from devtools.synthetic import gerar_arquivos  # noqa: E402
+
+
+@pytest.fixture
+def csvs_sinteticos(tmp_path):
+    """Fábrica de exports sintéticos do SIGOS em uma pasta temporária."""
+
+    def _gerar(report, total_linhas=200, dias=5, **opcoes):
+        opcoes.setdefault('data_fim', date(2025, 11, 30))
+        return gerar_arquivos(
+            str(tmp_path), report, total_linhas, dias, **opcoes
+        )
+
+    return _gerar
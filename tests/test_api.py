@@ -0,0 +1,228 @@
+# tests/test_api.py
+from datetime import date
+
+import io
+
+import pytest
+
+from etl import api
+
+
+def test_cursor_ida_e_volta():
+    """O cursor devolve a versão, a data e o ctid da última linha."""
+    cursor = api.codificar_cursor('v1', date(2025, 11, 3), '(12,4)')
+
+    assert api.decodificar_cursor(cursor) == (
+        'v1',
+        date(2025, 11, 3),
+        '(12,4)',
+    )
+    with pytest.raises(ValueError):
+        api.decodificar_cursor('nao-e-cursor')
+
+
+def test_consulta_paginada_por_keyset_com_filtros():
+    """Filtros viram parâmetros e a página seguinte parte do cursor."""
+    cursor = api.codificar_cursor('v1', date(2025, 11, 3), '(12,4)')
+
+    sql, params = api.montar_consulta(
+        'general',
+        {'inicio': '2025-11-01', 'regional': 'NORTE, SUL'},
+        cursor=cursor,
+        limite=50,
+        versao='v1',
+    )
+
+    assert 'FROM "general_reports"' in sql
+    assert '"REGIONAL" = ANY(:regional)' in sql
+    assert '("DATA_EXECUCAO", ctid) > ' in sql
+    assert 'OFFSET' not in sql
+    assert sql.endswith('ORDER BY "DATA_EXECUCAO", ctid LIMIT :limite')
+    assert params['regional'] == ['NORTE', 'SUL']
+    assert params['inicio'] == date(2025, 11, 1)
+    assert params['cursor_ctid'] == '(12,4)'
+    assert params['limite'] == 50
+
+
+def test_cursor_de_outra_versao_e_recusado():
+    """Depois de uma recarga o ctid do cursor não vale mais."""
+    cursor = api.codificar_cursor('v1', date(2025, 11, 3), '(12,4)')
+
+    with pytest.raises(ValueError, match='Cursor expirado'):
+        api.montar_consulta('general', {}, cursor=cursor, versao='v2')
+
+
+class _ResultadoFalso:
+    def __init__(self, colunas, linhas):
+        self._colunas = colunas
+        self._linhas = linhas
+
+    def keys(self):
+        return self._colunas
+
+    def all(self):
+        return self._linhas
+
+
+class _ConexaoLeitura:
+    """Conexão falsa: uma versão da tabela e páginas de um general com 3
+    linhas."""
+
+    def __init__(self, engine, versao):
+        self.engine = engine
+        self.versao = versao
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, comando, params=None):
+        sql = str(comando)
+        self.engine.sql.append(sql)
+        if params is None:
+            return None
+        if 'etl_versoes' in sql:
+            return _ResultadoFalso(['versao'], [(self.versao,)])
+        linhas = [
+            ('(0,1)', date(2025, 11, 1), '1'),
+            ('(0,2)', date(2025, 11, 1), '2'),
+            ('(0,3)', date(2025, 11, 2), '3'),
+        ]
+        if 'cursor_ctid' in params:
+            linhas = linhas[2:]
+        return _ResultadoFalso(
+            ['_ctid', 'DATA_EXECUCAO', 'UC / MD'], linhas[: params['limite']]
+        )
+
+
+class _EngineLeitura:
+    """Engine falsa; ``versoes`` é a versão vista em cada conexão."""
+
+    def __init__(self, versoes=('v1',)):
+        self.versoes = versoes
+        self.conexoes = 0
+        self.sql = []
+
+    def connect(self):
+        versao = self.versoes[min(self.conexoes, len(self.versoes) - 1)]
+        self.conexoes += 1
+        return _ConexaoLeitura(self, versao)
+
+
+def test_exportacao_le_cada_pagina_em_uma_transacao_curta(monkeypatch):
+    """Cada página abre e fecha a sua transação REPEATABLE READ."""
+    engine = _EngineLeitura()
+    monkeypatch.setattr(api, '_engine', engine)
+    monkeypatch.setattr(api, 'API_PAGINA_EXPORT', 2)
+
+    paginas = list(api.percorrer_paginas('general', {}))
+
+    assert engine.conexoes == 2
+    assert engine.sql[0] == (
+        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY'
+    )
+    assert [linha for p in paginas for linha in p['linhas']] == [
+        (date(2025, 11, 1), '1'),
+        (date(2025, 11, 1), '2'),
+        (date(2025, 11, 2), '3'),
+    ]
+    assert api.decodificar_cursor(paginas[0]['proximo'])[0] == 'v1'
+
+
+def test_exportacao_para_se_a_tabela_for_recarregada(monkeypatch):
+    """Uma carga entre duas páginas invalida o cursor da exportação."""
+    monkeypatch.setattr(api, '_engine', _EngineLeitura(('v1', 'v2')))
+    monkeypatch.setattr(api, 'API_PAGINA_EXPORT', 2)
+    paginas = api.percorrer_paginas('general', {})
+
+    next(paginas)
+    with pytest.raises(ValueError, match='Cursor expirado'):
+        next(paginas)
+
+
+class _HandlerExportacao(api.LeituraHandler):
+    """Handler sem socket: os cabeçalhos já saíram e o corpo vai para um
+    buffer."""
+
+    def __init__(self):
+        self.wfile = io.BytesIO()
+        self.close_connection = False
+
+    def _iniciar_exportacao(self, *args):
+        pass
+
+
+def test_falha_no_meio_da_exportacao_fecha_a_conexao(monkeypatch):
+    """Depois do 200 não sai JSON de erro no meio do CSV."""
+    monkeypatch.setattr(api, '_engine', _EngineLeitura(('v1', 'v2')))
+    monkeypatch.setattr(api, 'API_PAGINA_EXPORT', 2)
+    handler = _HandlerExportacao()
+
+    handler._exportar_csv('general', {})
+
+    assert handler.close_connection
+    assert handler.wfile.getvalue().decode('utf-8').splitlines() == [
+        'DATA_EXECUCAO;UC / MD',
+        '2025-11-01;1',
+        '2025-11-01;2',
+    ]
+
+
+def test_entradas_invalidas_viram_value_error():
+    """Report, data e agrupamento inválidos são erros do cliente (400)."""
+    with pytest.raises(ValueError):
+        api.montar_consulta('outro', {})
+    with pytest.raises(ValueError):
+        api.montar_consulta('general', {'inicio': '01/11/2025'})
+    for limite in (0, -5):
+        with pytest.raises(ValueError, match='limite'):
+            api.montar_consulta('general', {}, limite=limite)
+    with pytest.raises(ValueError):
+        # MOTIVO só existe no resumo do return
+        api.montar_resumo('general', {'agrupar': 'MOTIVO'})
+
+
+def test_resumo_agrega_a_tabela_de_resumo():
+    """O resumo soma QUANTIDADE agrupando pelas colunas pedidas."""
+    sql, params = api.montar_resumo(
+        'return', {'agrupar': 'regional,motivo', 'fim': '2025-11-30'}
+    )
+
+    assert 'FROM "return_resumo_diario"' in sql
+    assert 'SUM("QUANTIDADE")' in sql
+    assert 'GROUP BY "REGIONAL", "MOTIVO"' in sql
+    assert params == {'fim': date(2025, 11, 30)}
+
+
+def test_cache_lru_descarta_o_menos_usado_e_versoes_antigas():
+    """Limite de itens por uso recente e invalidação por versão."""
+    cache = api.CacheLRU(max_itens=2)
+    cache.guardar(('general_reports', 'v1', 'a'), 1)
+    cache.guardar(('general_reports', 'v1', 'b'), 2)
+    cache.obter(('general_reports', 'v1', 'a'))
+    cache.guardar(('return_reports', 'v1', 'c'), 3)
+
+    assert cache.obter(('general_reports', 'v1', 'b')) is None
+    assert cache.obter(('general_reports', 'v1', 'a')) == 1
+
+    cache.invalidar('general_reports', 'v2')
+
+    assert cache.obter(('general_reports', 'v1', 'a')) is None
+    assert cache.obter(('return_reports', 'v1', 'c')) == 3
+
+
+def test_parquet_interrompido_sai_sem_rodape(monkeypatch):
+    """O Parquet incompleto não termina com o rodapé de um arquivo válido."""
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(api, '_engine', _EngineLeitura(('v1', 'v2')))
+    monkeypatch.setattr(api, 'API_PAGINA_EXPORT', 2)
+    handler = _HandlerExportacao()
+
+    handler._exportar_parquet('general', {})
+
+    corpo = handler.wfile.getvalue()
+    assert handler.close_connection
+    assert corpo.startswith(b'PAR1')
+    assert not corpo.endswith(b'PAR1')
@@ -0,0 +1,148 @@
+# tests/test_historico.py
+from datetime import date, time
+
+import pandas as pd
+
+from etl.load.historico import (
+    calcular_delta,
+    calcular_delta_em_partes,
+    hash_linhas,
+)
+
+CHAVE = ['UC / MD', 'DATA_EXECUCAO', 'COD']
+
+
+def _carga(status):
+    """Carga sanitizada do general com um serviço por status."""
+    return pd.DataFrame(
+        {
+            'UC / MD': [str(100 + i) for i in range(len(status))],
+            'DATA_EXECUCAO': ['2025-11-01'] * len(status),
+            'COD': [str(i) for i in range(len(status))],
+            'STATUS': status,
+        }
+    )
+
+
+def _com_hashes(df):
+    return df.assign(
+        CHAVE_HASH=hash_linhas(df, CHAVE),
+        LINHA_HASH=hash_linhas(df, list(df.columns)),
+    )
+
+
+def _abertas(df):
+    """Versões abertas do histórico correspondentes a uma carga."""
+    entrada = _com_hashes(df)
+    return pd.DataFrame(
+        {
+            'chave': entrada['CHAVE_HASH'],
+            'linha': entrada['LINHA_HASH'],
+            'sem_data': False,
+        }
+    )
+
+
+def test_hash_igual_para_dataframe_e_linhas_lidas_do_banco():
+    """Ordem das colunas, tipos de data/hora e coluna ausente não mudam."""
+    transformado = pd.DataFrame(
+        {
+            'UC / MD': ['123'],
+            'DATA_EXECUCAO': ['2025-11-01'],
+            'HORA INICIO SERVICO': ['07:40:00'],
+            'NOTIFICADO': [None],
+        }
+    )
+    do_banco = pd.DataFrame(
+        {
+            'HORA INICIO SERVICO': [time(7, 40)],
+            'DATA_EXECUCAO': [date(2025, 11, 1)],
+            'UC / MD': ['123'],
+        }
+    )
+    colunas = ['UC / MD', 'DATA_EXECUCAO', 'HORA INICIO SERVICO', 'NOTIFICADO']
+
+    assert (
+        hash_linhas(transformado, colunas)[0]
+        == hash_linhas(do_banco, colunas)[0]
+    )
+    outro = transformado.assign(NOTIFICADO=['SIM'])
+    assert (
+        hash_linhas(outro, colunas)[0] != hash_linhas(transformado, colunas)[0]
+    )
+
+
+def test_delta_grava_so_novas_e_alteradas_e_fecha_removidas():
+    """PENDENTE -> BAIXADO abre versão nova; sumiço da janela só fecha."""
+    anterior = _carga(['PENDENTE', 'PENDENTE', 'BAIXADO'])
+    # 100 mudou de status, 101 sumiu, 102 continua igual, 103 é novo
+    atual = _carga(['BAIXADO', 'PENDENTE', 'BAIXADO', 'PENDENTE'])
+    atual = atual.drop(index=[1])
+
+    gravar, fechar, contagens = calcular_delta(
+        _com_hashes(atual), _abertas(anterior)
+    )
+
+    assert sorted(gravar['UC / MD']) == ['100', '103']
+    assert contagens == {'novas': 1, 'alteradas': 1, 'removidas': 1}
+    assert len(fechar) == 2
+
+
+def _sem_data_sumiu():
+    """Versão aberta sem DATA_EXECUCAO que não veio na carga atual."""
+    anterior = _carga(['PENDENTE', 'PENDENTE'])
+    anterior.loc[1, 'DATA_EXECUCAO'] = None
+    abertas = _abertas(anterior).assign(sem_data=[False, True])
+    return _com_hashes(anterior.drop(index=[1])), abertas
+
+
+def test_full_fecha_versao_sem_data_que_sumiu():
+    """O TRUNCATE do FULL apaga a linha sem data, então o histórico fecha."""
+    entrada, abertas = _sem_data_sumiu()
+
+    _, fechar, contagens = calcular_delta(entrada, abertas)
+
+    assert contagens == {'novas': 0, 'alteradas': 0, 'removidas': 1}
+    assert fechar.tolist() == [abertas['chave'].iloc[1]]
+
+
+def test_incremental_mantem_versao_sem_data_aberta():
+    """O DELETE do incremental não apaga linhas sem data."""
+    entrada, abertas = _sem_data_sumiu()
+
+    _, fechar, contagens = calcular_delta(
+        entrada, abertas, desde=date(2025, 11, 1)
+    )
+
+    assert contagens == {'novas': 0, 'alteradas': 0, 'removidas': 0}
+    assert fechar.empty
+
+
+def test_delta_sem_mudancas_nao_grava_nada():
+    """Recarregar a mesma janela não gera versão nova."""
+    carga = _carga(['PENDENTE', 'BAIXADO'])
+
+    gravar, fechar, contagens = calcular_delta(
+        _com_hashes(carga), _abertas(carga)
+    )
+
+    assert gravar.empty
+    assert fechar.empty
+    assert contagens == {'novas': 0, 'alteradas': 0, 'removidas': 0}
+
+
+def test_delta_em_partes_igual_ao_da_carga_inteira():
+    """Ler a tabela publicada em chunks não muda o delta."""
+    anterior = _carga(['PENDENTE', 'PENDENTE', 'BAIXADO', 'PENDENTE'])
+    atual = _carga(['BAIXADO', 'PENDENTE', 'BAIXADO', 'PENDENTE', 'NOVO'])
+    atual = atual.drop(index=[3]).reset_index(drop=True)
+    partes = [atual.iloc[:2], atual.iloc[2:3], atual.iloc[3:]]
+
+    gravar, fechar, contagens = calcular_delta_em_partes(
+        iter(partes), CHAVE, _abertas(anterior)
+    )
+    esperado = calcular_delta(_com_hashes(atual), _abertas(anterior))
+
+    assert gravar['UC / MD'].tolist() == esperado[0]['UC / MD'].tolist()
+    assert sorted(fechar) == sorted(esperado[1])
+    assert contagens == esperado[2]
@@ -1,7 +1,15 @@
 # tests/test_loader.py
-import pytest 
-from etl.load.loader import get_engine
+from contextlib import contextmanager
+from datetime import date
+
+import pandas as pd
+import pytest
 from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from etl.load import loader
+from etl.load.loader import get_engine
+
 
 def test_db_connection():
     """Verifica se a conexão com o PostgreSQL está ativa."""
@@ -9,8 +17,137 @@ def test_db_connection():
     try:
         with engine.connect() as conn:
             # scalar() é mais limpo que fetchone()[0]
-            result = conn.execute(text("SELECT 1")).scalar()
+            result = conn.execute(text('SELECT 1')).scalar()
             assert result == 1
     except Exception as e:
         # Agora o pytest.fail vai funcionar porque o import está lá em cima
-        pytest.fail(f"Falha ao conectar no banco de dados: {e}")
\ No newline at end of file
+        pytest.fail(f'Falha ao conectar no banco de dados: {e}')
+
+
+class _ConexaoGravada:
+    """Conexão falsa que só guarda o SQL executado."""
+
+    def __init__(self):
+        self.sql = []
+
+    def execute(self, comando, *args):
+        self.sql.append(str(comando))
+
+
+def test_indices_das_tabelas_de_relatorio(monkeypatch):
+    """Data, UC / MD, TOI e EQUIPE indexados; staging dos shards fica sem."""
+    monkeypatch.setattr(loader, 'INDICE_DATA_EXECUCAO', 'brin')
+    conn = _ConexaoGravada()
+    loader.garantir_indices(conn, 'general_reports')
+    loader.garantir_indices(conn, 'general_reports_shard_1')
+
+    assert [sql for sql in conn.sql if sql.startswith('CREATE')] == [
+        'CREATE INDEX IF NOT EXISTS "general_reports_data_execucao_brin_idx" '
+        'ON "general_reports" USING brin ("DATA_EXECUCAO")',
+        'CREATE INDEX IF NOT EXISTS "general_reports_uc_md_btree_idx" '
+        'ON "general_reports" USING btree ("UC / MD")',
+        'CREATE INDEX IF NOT EXISTS "general_reports_toi_btree_idx" '
+        'ON "general_reports" USING btree ("TOI")',
+        'CREATE INDEX IF NOT EXISTS "general_reports_equipe_btree_idx" '
+        'ON "general_reports" USING btree ("EQUIPE")',
+    ]
+
+
+def test_troca_de_metodo_apaga_o_indice_anterior(monkeypatch):
+    """Ao passar para brin, o btree e o nome antigo da coluna são apagados."""
+    monkeypatch.setattr(loader, 'INDICE_DATA_EXECUCAO', 'brin')
+    conn = _ConexaoGravada()
+    loader.garantir_indices(conn, 'general_reports')
+
+    removidos = [sql for sql in conn.sql if sql.startswith('DROP')]
+    assert any(
+        '"general_reports_data_execucao_idx"' in sql for sql in removidos
+    )
+    assert any('data_execucao_btree_idx' in sql for sql in removidos)
+    assert not any('data_execucao_brin_idx' in sql for sql in removidos)
+
+
+class _EngineTransacional:
+    """Engine falsa: o SQL de ``begin()`` só é confirmado sem exceção."""
+
+    def __init__(self):
+        self.confirmado = []
+        self.conexoes = []
+
+    @contextmanager
+    def begin(self):
+        conn = _ConexaoGravada()
+        self.conexoes.append(conn)
+        yield conn
+        self.confirmado.extend(conn.sql)
+
+    def dispose(self):
+        pass
+
+
+@pytest.mark.parametrize('mode', ['full', 'incremental'])
+def test_falha_no_insert_nao_apaga_a_tabela(monkeypatch, mode):
+    """TRUNCATE/DELETE e resumos voltam atrás junto com o insert que falhou."""
+    engine = _EngineTransacional()
+    monkeypatch.setattr(loader, 'get_engine', lambda: engine)
+
+    def falhar(*args, **kwargs):
+        raise SQLAlchemyError('insert falhou')
+
+    monkeypatch.setattr(pd.DataFrame, 'to_sql', falhar)
+    df = pd.DataFrame({'DATA_EXECUCAO': [date(2025, 11, 1)], 'UC / MD': ['1']})
+
+    with pytest.raises(SQLAlchemyError):
+        loader.load_df_to_postgres(
+            df,
+            'general_reports',
+            mode,
+            'DATA_EXECUCAO',
+            data_inicio_carga=date(2025, 11, 1),
+        )
+
+    assert engine.confirmado == []
+
+
+def test_falha_no_insert_mantem_os_indices(monkeypatch):
+    """Com RECRIAR_INDICES_FULL, o DROP INDEX volta atrás junto com o insert."""
+    engine = _EngineTransacional()
+    monkeypatch.setattr(loader, 'get_engine', lambda: engine)
+    monkeypatch.setattr(loader, 'RECRIAR_INDICES_FULL', True)
+
+    def falhar(*args, **kwargs):
+        raise SQLAlchemyError('insert falhou')
+
+    monkeypatch.setattr(pd.DataFrame, 'to_sql', falhar)
+    df = pd.DataFrame({'DATA_EXECUCAO': [date(2025, 11, 1)], 'UC / MD': ['1']})
+
+    with pytest.raises(SQLAlchemyError):
+        loader.load_df_to_postgres(
+            df, 'general_reports', 'full', 'DATA_EXECUCAO'
+        )
+
+    assert any('DROP INDEX' in sql for sql in engine.conexoes[0].sql)
+    assert engine.confirmado == []
+
+
+def test_falha_ao_recriar_indices_desfaz_a_carga(monkeypatch):
+    """Com RECRIAR_INDICES_FULL, os índices voltam antes do commit."""
+    engine = _EngineTransacional()
+    monkeypatch.setattr(loader, 'get_engine', lambda: engine)
+    monkeypatch.setattr(loader, 'RECRIAR_INDICES_FULL', True)
+    monkeypatch.setattr(
+        pd.DataFrame, 'to_sql', lambda self, *args, **kwargs: len(self)
+    )
+
+    def falhar(conn, tabela):
+        raise SQLAlchemyError('create index falhou')
+
+    monkeypatch.setattr(loader, 'garantir_indices', falhar)
+    df = pd.DataFrame({'DATA_EXECUCAO': [date(2025, 11, 1)], 'UC / MD': ['1']})
+
+    with pytest.raises(SQLAlchemyError):
+        loader.load_df_to_postgres(
+            df, 'general_reports', 'full', 'DATA_EXECUCAO'
+        )
+
+    assert engine.confirmado == []
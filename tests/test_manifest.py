@@ -0,0 +1,32 @@
+# tests/test_manifest.py
+import pytest
+from etl.extraction.core import manifest
+
+
+@pytest.fixture(autouse=True)
+def state_dir_temporario(tmp_path, monkeypatch):
+    """Isola o manifesto em uma pasta temporária."""
+    monkeypatch.setattr(manifest, 'STATE_DIR', str(tmp_path))
+
+
+def test_impressao_digital_muda_com_o_conteudo(tmp_path):
+    """CSVs idênticos têm o mesmo hash; qualquer byte diferente muda o hash."""
+    a = tmp_path / 'a.csv'
+    b = tmp_path / 'b.csv'
+    a.write_text('UC;STATUS\n1;BAIXADO\n', encoding='utf-8')
+    b.write_text('UC;STATUS\n1;BAIXADO\n', encoding='utf-8')
+    assert manifest.impressao_digital(a) == manifest.impressao_digital(b)
+
+    b.write_text('UC;STATUS\n1;PENDENTE\n', encoding='utf-8')
+    assert manifest.impressao_digital(a) != manifest.impressao_digital(b)
+
+
+def test_registrar_e_limpar_manifesto():
+    """As janelas carregadas ficam no manifesto até um FULL limpar."""
+    chave = manifest.chave('01/01/2025', '31/01/2025')
+    manifest.registrar_carregados('general', {chave: ['abc', 'abc']})
+
+    assert manifest.carregar('general')[chave]['hashes'] == ['abc']
+
+    manifest.limpar('general')
+    assert manifest.carregar('general') == {}
@@ -0,0 +1,79 @@
+# tests/test_metrics.py
+import urllib.error
+import urllib.request
+
+import pytest
+
+from etl import metrics
+from etl.extraction.core import pool
+
+
+def test_exposicao_de_contador_gauge_e_histograma():
+    """Séries no formato texto do Prometheus, com a idade derivada."""
+    metrics.incrementar('teste_linhas_total', 10, report='general')
+    metrics.incrementar('teste_linhas_total', 5, report='general')
+    metrics.definir('teste_sucesso_timestamp_seconds', 1_000, report='general')
+    for segundos in (0.2, 3, 40):
+        metrics.observar(
+            'teste_download_seconds', segundos, buckets=(1, 10), report='g'
+        )
+
+    linhas = metrics.exportar_prometheus(agora=1_060).splitlines()
+
+    assert '# TYPE teste_linhas_total counter' in linhas
+    assert 'teste_linhas_total{report="general"} 15' in linhas
+    assert 'teste_sucesso_idade_seconds{report="general"} 60' in linhas
+    assert '# TYPE teste_download_seconds histogram' in linhas
+    # Buckets acumulados: cada um conta as observações <= limite
+    assert 'teste_download_seconds_bucket{report="g",le="1"} 1' in linhas
+    assert 'teste_download_seconds_bucket{report="g",le="10"} 2' in linhas
+    assert 'teste_download_seconds_bucket{report="g",le="+Inf"} 3' in linhas
+    assert 'teste_download_seconds_sum{report="g"} 43.2' in linhas
+    assert 'teste_download_seconds_count{report="g"} 3' in linhas
+
+
+def test_servidor_responde_metrics_e_404():
+    """O endpoint serve /metrics e recusa outros caminhos."""
+    metrics.incrementar('teste_servidor_total')
+    servidor = metrics.iniciar_servidor(0, endereco='127.0.0.1')
+    base = f'http://127.0.0.1:{servidor.server_address[1]}'
+    try:
+        with urllib.request.urlopen(f'{base}/metrics', timeout=5) as resp:
+            corpo = resp.read().decode('utf-8')
+            assert resp.headers['Content-Type'].startswith('text/plain')
+        assert 'teste_servidor_total 1' in corpo.splitlines()
+
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            urllib.request.urlopen(f'{base}/outro', timeout=5)
+        assert erro.value.code == 404
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+class _DriverFalso:
+    """WebDriver falso que sempre passa no health check."""
+
+    def execute_script(self, script):
+        return 'complete'
+
+    def quit(self):
+        pass
+
+
+def test_pool_exporta_rss_por_navegador(monkeypatch):
+    """O health check do pool publica o RSS e remove a série ao reciclar."""
+    rss = {'mb': 100.0}
+    monkeypatch.setattr(pool, 'rss_navegador_mb', lambda d: rss['mb'])
+    navegadores = pool.PoolNavegadores(_DriverFalso, 'about:blank', 1, 500)
+    driver = navegadores._abrir()
+
+    assert navegadores._motivo_para_reciclar(driver) is None
+    # O pool usa o módulo metrics carregado a partir de etl/
+    linhas = pool.metrics.exportar_prometheus().splitlines()
+    assert 'etl_pool_rss_bytes{navegador="1"} 104857600' in linhas
+
+    rss['mb'] = 600.0
+    motivo = navegadores._motivo_para_reciclar(driver)
+    navegadores._descartar(driver, motivo)
+    assert 'etl_pool_rss_bytes' not in pool.metrics.exportar_prometheus()
@@ -0,0 +1,44 @@
+# tests/test_planner.py
+import pytest
+from etl.extraction.core import planner
+from etl.extraction.core.utils import gerar_intervalos
+
+
+@pytest.fixture(autouse=True)
+def state_dir_temporario(tmp_path, monkeypatch):
+    """Isola o armazenamento de estatísticas em uma pasta temporária."""
+    monkeypatch.setattr(planner, 'STATE_DIR', str(tmp_path))
+
+
+def test_sem_historico_igual_a_janela_fixa():
+    """Sem estatísticas, o planejador reproduz as janelas fixas de 30 dias."""
+    esperado = list(gerar_intervalos('01/01/2025', '15/05/2025', 30))
+    planejado = planner.planejar_intervalos(
+        'general', '01/01/2025', '15/05/2025', dias_padrao=30
+    )
+    assert planejado == esperado
+
+
+def test_periodo_esparso_vira_uma_janela():
+    """Meses com poucas linhas são agrupados em uma única exportação."""
+    planner.registrar_janela('general', '01/01/2025', '31/03/2025', 300, 5)
+
+    planejado = planner.planejar_intervalos(
+        'general', '01/01/2025', '31/03/2025', dias_padrao=30, alvo_linhas=1000
+    )
+    assert planejado == [('01/01/2025', '31/03/2025')]
+
+
+def test_periodo_denso_e_quebrado():
+    """Janelas com muitas linhas são divididas para respeitar o alvo."""
+    # 100 linhas por dia => alvo de 1000 linhas cabe em janelas de 10 dias
+    planner.registrar_janela('general', '01/01/2025', '31/01/2025', 3000, 5)
+
+    planejado = planner.planejar_intervalos(
+        'general', '01/01/2025', '31/01/2025', dias_padrao=30, alvo_linhas=1000
+    )
+    assert planejado == [
+        ('01/01/2025', '11/01/2025'),
+        ('11/01/2025', '21/01/2025'),
+        ('21/01/2025', '31/01/2025'),
+    ]
@@ -0,0 +1,45 @@
+# tests/test_probe.py
+from datetime import datetime
+
+from etl.orchestration.probe import decidir
+
+AGORA = datetime(2025, 6, 30, 14, 30)
+SONDA = {'hash': 'abc', 'linhas': 120}
+
+
+def test_dia_inalterado_e_sincronizacao_recente_pula():
+    """Sem mudança no dia mais recente e janela fresca, o ciclo é pulado."""
+    pular, motivo = decidir(
+        SONDA,
+        dict(SONDA),
+        datetime(2025, 6, 30, 12, 30),
+        agora=AGORA,
+        max_idade_min=180,
+    )
+    assert pular
+    assert 'inalterado' in motivo
+
+
+def test_mudanca_no_dia_mais_recente_roda():
+    """Qualquer diferença de hash ou de linhas força o incremental."""
+    pular, motivo = decidir(
+        SONDA,
+        {'hash': 'abc', 'linhas': 121},
+        datetime(2025, 6, 30, 12, 30),
+        agora=AGORA,
+        max_idade_min=180,
+    )
+    assert not pular
+    assert '120 -> 121' in motivo
+
+
+def test_sincronizacao_antiga_roda_mesmo_sem_mudanca():
+    """Mudanças em dias antigos só aparecem na janela completa."""
+    pular, _ = decidir(
+        SONDA,
+        dict(SONDA),
+        datetime(2025, 6, 30, 8, 30),
+        agora=AGORA,
+        max_idade_min=180,
+    )
+    assert not pular
@@ -0,0 +1,60 @@
+# tests/test_profiling.py
+import os
+import threading
+import time
+
+import pytest
+
+from etl import profiling
+
+
+def _trabalho():
+    """Carga pequena de CPU e memória para os coletores enxergarem."""
+    dados = [str(i) * 10 for i in range(50_000)]
+    time.sleep(0.05)
+    return sorted(dados)
+
+
+@pytest.mark.parametrize('perfil', profiling.PERFIS)
+def test_sessao_grava_um_arquivo_por_etapa(perfil, tmp_path, monkeypatch):
+    """Cada etapa fechada vira um arquivo <run_id>_<etapa> com resumo no log."""
+    monkeypatch.setattr(profiling, 'PROFILES_DIR', str(tmp_path))
+
+    sessao = profiling.SessaoPerfil('20250630_120000_general', perfil)
+    try:
+        _trabalho()
+        sessao.fechar_etapa('extract_transform')
+        _trabalho()
+        sessao.fechar_etapa('load')
+    finally:
+        sessao.encerrar()
+
+    assert set(sessao.arquivos) == {'extract_transform', 'load'}
+    for caminho in sessao.arquivos.values():
+        assert os.path.basename(caminho).startswith('20250630_120000_general_')
+        assert os.path.getsize(caminho) > 0
+
+
+def test_so_uma_execucao_perfilada_por_vez(tmp_path, monkeypatch):
+    """Uma segunda sessão simultânea roda sem profiling, sem erro."""
+    monkeypatch.setattr(profiling, 'PROFILES_DIR', str(tmp_path))
+    primeira = profiling.SessaoPerfil('run_a', 'sampling')
+    segunda = []
+    try:
+        t = threading.Thread(
+            target=lambda: segunda.append(
+                profiling.SessaoPerfil('run_b', 'sampling')
+            )
+        )
+        t.start()
+        t.join()
+        assert segunda[0].perfil is None
+        segunda[0].fechar_etapa('load')
+        assert segunda[0].arquivos == {}
+    finally:
+        primeira.encerrar()
+
+    # Liberado, a próxima execução volta a ser perfilada
+    terceira = profiling.SessaoPerfil('run_c', 'sampling')
+    assert terceira.perfil == 'sampling'
+    terceira.encerrar()
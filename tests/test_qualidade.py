@@ -0,0 +1,92 @@
+# tests/test_qualidade.py
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from etl.transformation import qualidade, transformer
+
+
+def _general(linhas=4):
+    """DataFrame consolidado do general, sem nenhuma violação."""
+    return pd.DataFrame(
+        {
+            'UC / MD': [str(100 + i) for i in range(linhas)],
+            'STATUS': ['BAIXADO'] * linhas,
+            'DATA_EXECUCAO': [date(2025, 11, 1)] * linhas,
+            'COD': [str(i) for i in range(linhas)],
+            'TOI': ['1234567'] * linhas,
+            'EQUIPE': ['RS-PEL-F001M', 'POA2A001'] * (linhas // 2),
+            'REGIONAL': ['SUL', 'NORTE'] * (linhas // 2),
+            'GRUPO': ['BT', 'AT'] * (linhas // 2),
+            'DATA_EXTRACAO': [datetime(2025, 11, 2)] * linhas,
+        }
+    )
+
+
+def test_dados_limpos_passam_sem_violacoes():
+    """Nenhuma regra violada: relatório vazio e carga liberada."""
+    relatorio = qualidade.validar(_general(), 'general_reports')
+
+    assert relatorio['linhas'] == 4
+    assert relatorio['violacoes'] == {}
+    assert relatorio['bloqueantes'] == []
+
+
+def test_equipe_em_minusculo_nao_bloqueia_a_derivada():
+    """REGIONAL/GRUPO derivados no transformer batem depois das maiúsculas."""
+    df = _general().drop(columns=['REGIONAL', 'GRUPO'])
+    df['EQUIPE'] = ['rs-pel-a001', 'poa2f107', 'RS-PEL-F001M', 'POA2A001']
+    df = transformer._maiusculas(transformer._add_regional_grupo(df, 'EQUIPE'))
+
+    relatorio = qualidade.validar(df, 'general_reports')
+
+    assert df['REGIONAL'].tolist() == ['SUL', 'NORTE', 'SUL', 'NORTE']
+    assert df['GRUPO'].tolist() == ['AT', 'BT', 'BT', 'AT']
+    assert relatorio['violacoes'] == {}
+
+
+def test_violacoes_contadas_com_exemplos():
+    """Cada regra conta as linhas violadas e guarda linhas de exemplo."""
+    df = _general(100)
+    df.loc[0, 'DATA_EXECUCAO'] = None
+    df.loc[4, 'REGIONAL'] = 'NORTE'  # equipe PEL deveria ser SUL
+    df.loc[2, 'DATA_EXECUCAO'] = date.today() + timedelta(days=10)
+
+    relatorio = qualidade.avaliar(df, 'general_reports', exemplos=1)
+    violacoes = relatorio['violacoes']
+
+    assert violacoes['nao_nulo:DATA_EXECUCAO']['quantidade'] == 1
+    assert violacoes['data_futura:DATA_EXECUCAO']['quantidade'] == 1
+    assert violacoes['derivada:REGIONAL']['exemplos'] == [
+        {'REGIONAL': 'NORTE', 'EQUIPE': 'RS-PEL-F001M'}
+    ]
+    # 1% de datas nulas fica abaixo do limite; derivação errada não
+    assert 'nao_nulo:DATA_EXECUCAO' not in relatorio['bloqueantes']
+    assert 'derivada:REGIONAL' in relatorio['bloqueantes']
+
+
+def test_texto_vazio_em_colunas_arrow():
+    """Com o motor Arrow, texto em branco também conta como nulo."""
+    pa = pytest.importorskip('pyarrow')
+    df = _general(100)
+    df.loc[[0, 1], 'UC / MD'] = ['', '  ']
+    df = pa.Table.from_pandas(df).to_pandas(types_mapper=pd.ArrowDtype)
+
+    relatorio = qualidade.avaliar(df, 'general_reports')
+
+    assert isinstance(df['UC / MD'].dtype, pd.ArrowDtype)
+    assert relatorio['violacoes']['nao_nulo:UC / MD']['quantidade'] == 2
+    assert 'nao_nulo:UC / MD' in relatorio['bloqueantes']
+
+
+def test_limite_estourado_bloqueia_a_carga():
+    """Coluna obrigatória ausente ou duplicadas acima do limite: erro."""
+    with pytest.raises(ValueError, match='obrigatorias'):
+        qualidade.validar(
+            _general().drop(columns=['GRUPO']), 'general_reports'
+        )
+
+    duplicado = pd.concat([_general(), _general()], ignore_index=True)
+    with pytest.raises(ValueError, match='unico'):
+        qualidade.validar(duplicado, 'general_reports')
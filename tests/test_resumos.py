@@ -0,0 +1,94 @@
+# tests/test_resumos.py
+from sqlalchemy import create_engine, text
+
+from etl.load.resumos import atualizar_resumos
+
+LINHAS = [
+    ('2025-06-01', 'PEL', 'A012', 'MOTIVO 1'),
+    ('2025-06-01', 'PEL', 'A012', 'MOTIVO 1'),
+    ('2025-06-02', 'PEL', 'A012', 'MOTIVO 2'),
+    ('2025-06-03', 'RGR', 'B107', 'MOTIVO 1'),
+    (None, 'RGR', 'B107', 'MOTIVO 1'),
+]
+
+
+def _banco():
+    """Banco SQLite em memória com a tabela base e o resumo do return."""
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                'CREATE TABLE return_reports ("DATA_EXECUCAO" TEXT, '
+                '"REGIONAL" TEXT, "GRUPO" TEXT, "EQUIPE" TEXT, "MOTIVO" TEXT)'
+            )
+        )
+        conn.execute(
+            text(
+                'CREATE TABLE return_resumo_diario ("DATA_EXECUCAO" TEXT, '
+                '"REGIONAL" TEXT, "GRUPO" TEXT, "EQUIPE" TEXT, '
+                '"MOTIVO" TEXT, "QUANTIDADE" INTEGER)'
+            )
+        )
+        _inserir(conn, LINHAS)
+    return engine
+
+
+def _inserir(conn, linhas):
+    """Insere linhas (data, regional, equipe, motivo) na tabela base."""
+    conn.execute(
+        text(
+            'INSERT INTO return_reports VALUES '
+            "(:data, :regional, 'G', :equipe, :motivo)"
+        ),
+        [
+            dict(zip(('data', 'regional', 'equipe', 'motivo'), linha))
+            for linha in linhas
+        ],
+    )
+
+
+def _resumo(conn):
+    """Lê o resumo ordenado por data e motivo."""
+    return conn.execute(
+        text(
+            'SELECT "DATA_EXECUCAO", "MOTIVO", "QUANTIDADE" '
+            'FROM return_resumo_diario ORDER BY 1, 2'
+        )
+    ).all()
+
+
+def test_resumo_vazio_e_reconstruido_inteiro():
+    """Na primeira carga o resumo cobre a tabela toda, mesmo com desde."""
+    engine = _banco()
+    with engine.begin() as conn:
+        atualizar_resumos(conn, 'return_reports', desde='2025-06-03')
+        assert _resumo(conn) == [
+            (None, 'MOTIVO 1', 1),
+            ('2025-06-01', 'MOTIVO 1', 2),
+            ('2025-06-02', 'MOTIVO 2', 1),
+            ('2025-06-03', 'MOTIVO 1', 1),
+        ]
+
+
+def test_incremental_recalcula_so_as_datas_recarregadas():
+    """Datas antes de desde ficam como estavam; as demais batem com a base."""
+    engine = _banco()
+    with engine.begin() as conn:
+        atualizar_resumos(conn, 'return_reports')
+        # O incremental apaga >= 02/06 e recarrega com dados novos
+        conn.execute(
+            text(
+                'DELETE FROM return_reports '
+                'WHERE "DATA_EXECUCAO" >= \'2025-06-02\''
+            )
+        )
+        _inserir(conn, [('2025-06-02', 'PEL', 'A012', 'MOTIVO 3')])
+        # Uma linha antiga mexida por fora não é recalculada
+        _inserir(conn, [('2025-06-01', 'PEL', 'A012', 'MOTIVO 1')])
+
+        atualizar_resumos(conn, 'return_reports', desde='2025-06-02')
+        assert _resumo(conn) == [
+            (None, 'MOTIVO 1', 1),
+            ('2025-06-01', 'MOTIVO 1', 2),
+            ('2025-06-02', 'MOTIVO 3', 1),
+        ]
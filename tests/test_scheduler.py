@@ -0,0 +1,94 @@
+# tests/test_scheduler.py
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+from etl.orchestration.scheduler import DIAS_SEMANA, MotorAgendamento
+
+TODOS_OS_DIAS = set(DIAS_SEMANA.values())
+
+
+def _job(horario):
+    """Simula o job do schedule, que expõe o horário agendado em next_run."""
+    return SimpleNamespace(next_run=horario)
+
+
+def test_disparo_durante_execucao_e_pulado():
+    """Com a política 'pular', um ciclo ainda rodando descarta o novo disparo."""
+    motor = MotorAgendamento(politica='pular')
+    liberar = threading.Event()
+    execucoes = []
+
+    def ciclo():
+        execucoes.append(datetime.now())
+        liberar.wait(5)
+
+    motor._disparar('incremental', TODOS_OS_DIAS, ciclo, _job(datetime.now()))
+    motor._disparar('incremental', TODOS_OS_DIAS, ciclo, _job(datetime.now()))
+    liberar.set()
+    motor.encerrar()
+
+    assert len(execucoes) == 1
+    assert motor.contadores[('incremental', 'pulado')] == 1
+    assert len(motor.atrasos['incremental']) == 1
+
+
+def test_disparos_atrasados_sao_coalescidos():
+    """Com 'coalescer', vários disparos atrasados viram uma única execução."""
+    motor = MotorAgendamento(politica='coalescer')
+    liberar = threading.Event()
+    execucoes = []
+
+    def ciclo():
+        execucoes.append(datetime.now())
+        liberar.wait(5)
+
+    for _ in range(3):
+        motor._disparar(
+            'incremental', TODOS_OS_DIAS, ciclo, _job(datetime.now())
+        )
+    liberar.set()
+    motor.encerrar()
+
+    assert len(execucoes) == 2
+    assert motor.contadores[('incremental', 'coalescido')] == 2
+
+
+def test_jobs_do_mesmo_grupo_nao_se_sobrepoem():
+    """Hot disparado durante o warm é pulado quando dividem o grupo."""
+    motor = MotorAgendamento(politica='pular')
+    liberar = threading.Event()
+    execucoes = []
+
+    def ciclo(tier):
+        execucoes.append(tier)
+        liberar.wait(5)
+
+    agora = _job(datetime.now())
+    motor._disparar('warm', TODOS_OS_DIAS, lambda: ciclo('warm'), agora, 'c')
+    motor._disparar('hot', TODOS_OS_DIAS, lambda: ciclo('hot'), agora, 'c')
+    liberar.set()
+    motor.encerrar()
+
+    assert execucoes == ['warm']
+    assert motor.contadores[('hot', 'pulado')] == 1
+
+
+def test_disparo_coalescido_roda_o_job_do_grupo_que_disparou():
+    """Com 'coalescer', o hot atrasado roda depois do warm, não o warm."""
+    motor = MotorAgendamento(politica='coalescer')
+    liberar = threading.Event()
+    execucoes = []
+
+    def ciclo(tier):
+        execucoes.append(tier)
+        liberar.wait(5)
+
+    agora = _job(datetime.now())
+    motor._disparar('warm', TODOS_OS_DIAS, lambda: ciclo('warm'), agora, 'c')
+    motor._disparar('hot', TODOS_OS_DIAS, lambda: ciclo('hot'), agora, 'c')
+    liberar.set()
+    motor.encerrar()
+
+    assert execucoes == ['warm', 'hot']
+    assert len(motor.atrasos['hot']) == 1
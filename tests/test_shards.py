@@ -0,0 +1,45 @@
+# tests/test_shards.py
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from etl.extraction.core.utils import gerar_intervalos, janelas_do_shard
+from etl.load.shards import filtrar_dias_do_shard
+
+JANELAS = list(gerar_intervalos('01/03/2022', '30/06/2025', 30))
+FIM = '30/06/2025'
+
+
+def _baixar(janelas):
+    """Simula os exports: cada janela traz todos os dias, bordas inclusive."""
+    dias = []
+    for data_inicio, data_fim in janelas:
+        dia = datetime.strptime(data_inicio, '%d/%m/%Y').date()
+        fim = datetime.strptime(data_fim, '%d/%m/%Y').date()
+        while dia <= fim:
+            dias.append(dia)
+            dia += timedelta(days=1)
+    return pd.DataFrame({'DATA_EXECUCAO': dias})
+
+
+@pytest.mark.parametrize('total', [1, 3, 7])
+def test_cada_janela_fica_com_um_shard(total):
+    """Os shards dividem as janelas sem sobra nem repetição."""
+    partes = [janelas_do_shard(JANELAS, i, total) for i in range(1, total + 1)]
+
+    assert sorted(j for parte in partes for j in parte) == sorted(JANELAS)
+    assert max(map(len, partes)) - min(map(len, partes)) <= 1
+
+
+def test_dias_de_borda_nao_sao_publicados_duas_vezes():
+    """Cada dia da coleta fica em exatamente um shard, inclusive as bordas."""
+    publicados = []
+    for indice in range(1, 4):
+        janelas = janelas_do_shard(JANELAS, indice, 3)
+        parte = filtrar_dias_do_shard(_baixar(janelas), janelas, FIM)
+        publicados += list(parte['DATA_EXECUCAO'])
+
+    esperado = _baixar(JANELAS)['DATA_EXECUCAO'].drop_duplicates()
+    assert sorted(publicados) == sorted(esperado)
+    assert publicados.count(date(2022, 3, 31)) == 1
@@ -0,0 +1,45 @@
+# tests/test_synthetic.py
+from datetime import date
+
+from etl.transformation.transformer import (
+    consolidar_general,
+    consolidar_return,
+    preparar_arquivo,
+)
+
+
+def test_general_sintetico_passa_pelo_transformer(csvs_sinteticos):
+    """Garante que preâmbulo, duplicadas e datas 00/00/0000 são tratados."""
+    arquivos = csvs_sinteticos(
+        'general', total_linhas=500, arquivos=2, taxa_duplicadas=0.1
+    )
+
+    dfs = [preparar_arquivo('general', p) for p in arquivos]
+    assert sum(len(df) for df in dfs) == 500
+
+    df = consolidar_general(dfs)
+    assert 0 < len(df) < 500
+    assert not df.duplicated(
+        ['UC / MD', 'DATA_EXECUCAO', 'COD', 'TOI', 'EQUIPE']
+    ).any()
+    assert (
+        df['DATA_EXECUCAO']
+        .between(date(2025, 11, 26), date(2025, 11, 30))
+        .all()
+    )
+    assert df['DATA AFERICAO'].isna().any()
+    assert df['HORA INICIO SERVICO'].notna().all()
+    assert set(df['REGIONAL']) == {'SUL', 'NORTE'}
+
+
+def test_return_sintetico_deterministico(csvs_sinteticos):
+    """Valida que o mesmo período gera o mesmo arquivo e que o retorno consolida."""
+    primeiro = csvs_sinteticos('return', taxa_duplicadas=0)
+    with open(primeiro[0], 'rb') as f:
+        conteudo = f.read()
+    segundo = csvs_sinteticos('return', taxa_duplicadas=0)
+    with open(segundo[0], 'rb') as f:
+        assert f.read() == conteudo
+
+    df = consolidar_return([preparar_arquivo('return', primeiro[0])])
+    assert len(df) == 200
@@ -2,7 +2,17 @@
 import pytest
 import pandas as pd
 from datetime import date
-from etl.transformation.transformer import _norm_col, _normalize_date_columns
+from etl import esquemas
+from etl.devtools import synthetic
+from etl.load.historico import HISTORICO
+from etl.transformation.qualidade import REGRAS
+from etl.transformation.transformer import (
+    _norm_col,
+    _normalize_date_columns,
+    _robust_read_csv,
+    _usecols,
+    preparar_return,
+)
 
 def test_norm_col_limpeza_strings():
     """Garante que a normalização de colunas remove acentos e espaços extras."""
@@ -33,4 +43,50 @@ def test_normalize_date_columns_invalidas():
     
     assert df_clean['DATA_BAIXADO'].iloc[0] is None
     assert df_clean['DATA_BAIXADO'].iloc[1] is None
-    assert df_clean['DATA_BAIXADO'].iloc[2] is None
\ No newline at end of file
+    assert df_clean['DATA_BAIXADO'].iloc[2] is None
+
+def test_leitura_so_parseia_colunas_do_esquema(tmp_path):
+    """Colunas fora do esquema nem são lidas; as demais ganham o nome final."""
+    caminho = tmp_path / 'retorno.csv'
+    caminho.write_text(
+        'REGIONAL;UC / MD;DATA EXECUÇÃO;FISCAL;EQUIPE;DATA RESOLVIDO\n'
+        'X;123;01/11/2025;JOAO;RS-PEL-A001M;00/00/0000\n',
+        encoding='latin1',
+    )
+
+    lido = _robust_read_csv(str(caminho), usecols=_usecols('return'))
+    assert list(lido.columns) == [
+        'UC / MD',
+        'DATA EXECUÇÃO',
+        'EQUIPE',
+        'DATA RESOLVIDO',
+    ]
+
+    df = preparar_return(lido)
+    assert list(df.columns) == [
+        'UC / MD',
+        'DATA_EXECUCAO',
+        'EQUIPE',
+        'DATA RESOLVIDO',
+        'data_extracao',
+    ]
+    assert df['DATA_EXECUCAO'].iloc[0] == date(2025, 11, 1)
+    assert df['DATA RESOLVIDO'].iloc[0] is None
+
+def test_chave_de_negocio_vem_do_esquema():
+    """Histórico, qualidade e CSVs sintéticos usam a chave do esquema."""
+    for report, cabecalho in (
+        ('general', synthetic.CABECALHO_GENERAL),
+        ('return', synthetic.CABECALHO_RETURN),
+    ):
+        tabela = esquemas.ESQUEMAS[report]['tabela']
+        chave = esquemas.chave(report)
+        unico = [r for r in REGRAS[tabela] if r['regra'] == 'unico']
+
+        assert HISTORICO[tabela] == chave
+        assert unico[0]['colunas'] == chave
+        posicoes = synthetic._posicoes_da_chave(report, cabecalho)
+        assert [
+            esquemas.renomeacoes(report)[_norm_col(cabecalho[p]).upper()]
+            for p in posicoes
+        ] == chave
@@ -0,0 +1,91 @@
+# tests/test_transformer_arrow.py
+from datetime import date, time
+
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+from etl.load import loader  # noqa: E402
+from etl.load.historico import hash_linhas  # noqa: E402
+from etl.transformation import transformer, transformer_arrow  # noqa: E402
+
+
+def test_motor_arrow_igual_ao_pandas(csvs_sinteticos, tmp_path):
+    """Sem duplicatas, os dois motores geram as mesmas linhas e valores."""
+    csvs_sinteticos('general', 300, arquivos=2, taxa_duplicadas=0)
+    esperado = transformer.transformar_general('full', pasta=str(tmp_path))
+    df = transformer_arrow.transformar_general('full', pasta=str(tmp_path))
+
+    assert set(df.columns) == set(esperado.columns)
+    assert all(isinstance(t, pd.ArrowDtype) for t in df.dtypes)
+    colunas = [c for c in esperado.columns if c != 'DATA_EXTRACAO']
+    assert sorted(hash_linhas(df, colunas)) == sorted(
+        hash_linhas(esperado, colunas)
+    )
+
+
+def test_motor_arrow_cabecalho_datas_e_deduplicacao(tmp_path):
+    """Pula o lixo antes do cabeçalho, converte datas/horas e fica com a última."""
+    caminho = tmp_path / 'relatorio_prot_geral_1.csv'
+    caminho.write_text(
+        'Relatório exportado do SIGOS\n'
+        'UC / MD;Status;Data execução;Cod;TOI;Equipe;Data baixado;'
+        'Hora início serviço;Fiscal\n'
+        '1;pendente;01/11/2025;10;7;rs-pel-a001;00/00/0000;07:40;X\n'
+        '1;baixado;01/11/2025;10;7;rs-pel-a001;03/11/2025;07:40:12;X\n'
+        '2;;;11;8;RGR-B100;;;X\n',
+        encoding='latin1',
+    )
+
+    df = transformer_arrow.transformar_general('full', pasta=str(tmp_path))
+
+    assert 'FISCAL' not in df.columns
+    assert df['UC / MD'].tolist() == ['1', '2']
+    assert df['STATUS'].tolist() == ['BAIXADO', '']
+    assert df['DATA_EXECUCAO'].iloc[0] == date(2025, 11, 1)
+    assert pd.isna(df['DATA_EXECUCAO'].iloc[1])
+    assert df['DATA BAIXADO'].iloc[0] == date(2025, 11, 3)
+    assert df['HORA INICIO SERVICO'].iloc[0] == time(7, 40, 12)
+    # Equipe em minúsculo deriva igual à em maiúsculo
+    assert df['REGIONAL'].tolist() == ['SUL', 'NORTE']
+    assert df['GRUPO'].tolist() == ['AT', 'BT']
+
+
+class _ConexaoCopia:
+    """Conexão (e cursor) falsa que guarda o conteúdo enviado ao COPY."""
+
+    def __init__(self):
+        self.connection = self
+        self.copias = []
+
+    def cursor(self):
+        return self
+
+    def copy_expert(self, comando, arquivo):
+        self.copias.append((comando, arquivo.read().decode()))
+
+    def close(self):
+        pass
+
+
+def test_copiar_arrow_distingue_vazio_de_nulo():
+    """Texto vazio vai entre aspas e nulo vai vazio, em lotes de COPY."""
+    df = pa.table(
+        {
+            'UC / MD': ['1', '', None],
+            'DATA_EXECUCAO': pa.array(
+                [date(2025, 11, 1), None, None], pa.date32()
+            ),
+        }
+    ).to_pandas(types_mapper=pd.ArrowDtype)
+    conn = _ConexaoCopia()
+
+    assert loader._eh_arrow(df)
+    loader.copiar_arrow(conn, 'general_reports', df, lote=2)
+
+    assert [c for c, _ in conn.copias] == [
+        'COPY "general_reports" ("UC / MD", "DATA_EXECUCAO") '
+        'FROM STDIN WITH (FORMAT csv)'
+    ] * 2
+    assert ''.join(d for _, d in conn.copias) == '"1",2025-11-01\n"",\n,\n'
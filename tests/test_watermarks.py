@@ -0,0 +1,38 @@
+# tests/test_watermarks.py
+from datetime import date, datetime
+
+from etl.load.watermarks import calcular_inicio_janela
+
+HOJE = date(2025, 6, 30)
+
+
+def test_sem_carga_anterior_usa_janela_maxima():
+    """Sem marca d'água, o incremental baixa a janela padrão do report."""
+    assert calcular_inicio_janela(HOJE, 60) == date(2025, 5, 1)
+
+
+def test_inicio_no_registro_aberto_mais_antigo():
+    """Um serviço ainda aberto puxa o início da janela para trás."""
+    inicio = calcular_inicio_janela(
+        HOJE,
+        60,
+        ultima_carga=datetime(2025, 6, 30, 8, 30),
+        menor_aberta=date(2025, 6, 10),
+        margem_dias=2,
+    )
+    assert inicio == date(2025, 6, 10)
+
+
+def test_janela_limitada_entre_ontem_e_o_maximo():
+    """A janela nunca passa do máximo nem fica menor que hoje e ontem."""
+    antiga = calcular_inicio_janela(
+        HOJE,
+        60,
+        ultima_carga=datetime(2025, 6, 30, 8, 30),
+        menor_aberta=date(2023, 1, 1),
+    )
+    recente = calcular_inicio_janela(
+        HOJE, 60, ultima_carga=datetime(2025, 6, 30, 8, 30), margem_dias=0
+    )
+    assert antiga == date(2025, 5, 1)
+    assert recente == date(2025, 6, 29)